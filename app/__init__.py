@@ -5,24 +5,74 @@ from flask_mail import Mail
 from flask_migrate import Migrate
 from flask_wtf.csrf import CSRFProtect
 from config import config
+from app.utils.ratelimit import RateLimiter
+from app.utils.admission import AdmissionController
+from app.utils.idempotency import Idempotency
+from app.utils.otp import OTPService
+from app.utils.sharding import ShardRouter, ShardedSession
+from app.utils.compression import Compressor
 
 # Initialize extensions
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': ShardedSession})
 login_manager = LoginManager()
 mail = Mail()
 migrate = Migrate()
 csrf = CSRFProtect()
+limiter = RateLimiter()
+admission = AdmissionController()
+idempotency = Idempotency()
+otp_service = OTPService()
+shards = ShardRouter()
+compressor = Compressor()
+
+# Imported once `db` exists, as they pull in the models
+from app.utils.payments import PaymentProcessor
+from app.utils.availability import AvailabilityIndex
+from app.utils.locations import Serviceability
+from app.utils.search import OrderSearchIndex
+from app.utils.notifications import Notifier
+from app.utils.inventory import Inventory
+from app.utils.forecast import DemandForecaster
+from app.utils.tracking import LocationTracker
+from app.utils.eta import EtaService
+from app.utils.invoices import Invoicer
+payments = PaymentProcessor()
+availability = AvailabilityIndex()
+serviceability = Serviceability()
+order_search = OrderSearchIndex()
+notifier = Notifier()
+inventory = Inventory()
+forecaster = DemandForecaster()
+tracker = LocationTracker()
+eta_service = EtaService()
+invoicer = Invoicer()
 
 def create_app(config_name='default'):
     app = Flask(__name__)
     app.config.from_object(config[config_name])
     
-    # Initialize extensions with app
+    # Initialize extensions with app (shards first: they add database binds)
+    shards.init_app(app)
     db.init_app(app)
     login_manager.init_app(app)
     mail.init_app(app)
     migrate.init_app(app, db)
     csrf.init_app(app)
+    compressor.init_app(app)  # registered early so it runs after every other after_request
+    limiter.init_app(app)
+    admission.init_app(app)
+    idempotency.init_app(app)
+    otp_service.init_app(app)
+    payments.init_app(app)
+    availability.init_app(app)
+    serviceability.init_app(app)
+    order_search.init_app(app)
+    notifier.init_app(app)
+    inventory.init_app(app)
+    forecaster.init_app(app)
+    tracker.init_app(app)
+    eta_service.init_app(app)
+    invoicer.init_app(app)
     
     # Configure login manager
     login_manager.login_view = 'auth.login'
@@ -48,4 +98,14 @@ def create_app(config_name='default'):
     from app.routes.fuel_station import bp as owner_bp
     app.register_blueprint(owner_bp)
 
+    from app.routes.delivery import bp as delivery_bp
+    app.register_blueprint(delivery_bp)
+
+    from app.routes.assets import bp as assets_bp
+    app.register_blueprint(assets_bp)
+
+    # Fingerprinted static URLs for templates
+    from app.utils.assets import asset_url
+    app.jinja_env.globals['asset_url'] = asset_url
+
     return app
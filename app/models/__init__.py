@@ -4,7 +4,11 @@ from app.models.user import User
 # Importing new customer dashboard models
 from app.models.fuel import FuelType
 from app.models.address import Address
-from app.models.order import Order, OrderTracking, OrderStatus
+from app.models.order import Order, OrderTracking, OrderStatus, StatusConflict
+from app.models.payment import Payment, PaymentStatus
+from app.models.inventory import FuelStock, StockMovement
+from app.models.delivery import DeliveryPartner, LocationPoint
+from app.models.backfill import BackfillCheckpoint
 
 __all__ = [
     'db',
@@ -13,5 +17,13 @@ __all__ = [
     'Address', 
     'Order',
     'OrderTracking',
-    'OrderStatus'
+    'OrderStatus',
+    'StatusConflict',
+    'Payment',
+    'PaymentStatus',
+    'FuelStock',
+    'StockMovement',
+    'DeliveryPartner',
+    'LocationPoint',
+    'BackfillCheckpoint'
 ]
\ No newline at end of file
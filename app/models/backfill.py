@@ -0,0 +1,24 @@
+from datetime import datetime
+from app import db
+
+
+class BackfillCheckpoint(db.Model):
+    """How far a chunked backfill (app.utils.backfill) has got.
+
+    Written in the same transaction as each batch, so a resumed run picks
+    up exactly after the last committed range. Created on first use as
+    well, since backfills can run from revisions older than the one that
+    adds this table.
+    """
+    __tablename__ = 'backfill_checkpoints'
+
+    name = db.Column(db.String(100), primary_key=True)
+    last_key = db.Column(db.BigInteger, nullable=False)  # keys up to here are done
+    end_key = db.Column(db.BigInteger, nullable=False)  # highest key when the run started
+    rows = db.Column(db.BigInteger, nullable=False, default=0)
+    started_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return f'<BackfillCheckpoint {self.name}: {self.last_key}/{self.end_key}>'
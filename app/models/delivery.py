@@ -0,0 +1,43 @@
+from datetime import datetime
+from app import db
+
+
+class DeliveryPartner(db.Model):
+    """Dispatch details for a `delivery_partner` user: home station and vehicle"""
+    __tablename__ = 'delivery_partners'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, unique=True)
+    station_id = db.Column(db.Integer, db.ForeignKey('fuel_stations.id'), nullable=False, index=True)
+    vehicle_capacity_liters = db.Column(db.Float, nullable=False, default=1000.0)
+    max_stops_per_slot = db.Column(db.Integer, nullable=False, default=4)
+    is_active = db.Column(db.Boolean, default=True)
+
+    # Last known position; the station's coordinates are used until there is one
+    latitude = db.Column(db.Float)
+    longitude = db.Column(db.Float)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    user = db.relationship('User', backref=db.backref('partner_profile', uselist=False), lazy=True)
+    station = db.relationship('FuelStation', backref='delivery_partners', lazy=True)
+
+    def __repr__(self):
+        return f'<DeliveryPartner {self.user_id} @ {self.station_id}>'
+
+
+class LocationPoint(db.Model):
+    """Persisted (downsampled) GPS trail of a delivery partner"""
+    __tablename__ = 'partner_locations'
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    partner_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    recorded_at = db.Column(db.DateTime, nullable=False)
+    latitude = db.Column(db.Float, nullable=False)
+    longitude = db.Column(db.Float, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_partner_locations_partner_recorded', 'partner_id', 'recorded_at'),
+    )
+
+    def __repr__(self):
+        return f'<LocationPoint {self.partner_id} @ {self.recorded_at}>'
@@ -1,4 +1,6 @@
 from datetime import datetime
+import hashlib
+from sqlalchemy import func
 from app import db
 
 class FuelType(db.Model):
@@ -25,6 +27,31 @@ class FuelType(db.Model):
     def get_available_fuels(cls):
         """Get all available fuel types"""
         return cls.query.filter_by(is_available=True).all()
+
+    @classmethod
+    def catalog_query(cls, station_ids=None):
+        """Fuel types in scope for a catalog, optionally limited to stations"""
+        query = cls.query
+        if station_ids is not None:
+            query = query.filter(cls.station_id.in_(station_ids))
+        return query
+
+    @classmethod
+    def catalog_version(cls, station_ids=None):
+        """Cheap fingerprint of the catalog: one aggregate, no row fetch.
+
+        Counts every fuel in scope (available or not) so that toggling
+        availability or changing a price always bumps `updated_at`/the count.
+        """
+        query = cls.catalog_query(station_ids).with_entities(
+            func.count(cls.id), func.max(cls.id), func.max(cls.updated_at),
+            func.sum(cls.price_per_liter)
+        ).order_by(None)
+        # Price sum catches edits landing within the same DATETIME second
+        count, max_id, last_updated, price_sum = query.one()
+        scope = ','.join(str(s) for s in sorted(station_ids)) if station_ids is not None else '*'
+        raw = f"{scope}|{count}|{max_id}|{last_updated.isoformat() if last_updated else ''}|{price_sum}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
     
     def __repr__(self):
         return f'<FuelType {self.name} - {self.formatted_price}/L>'
\ No newline at end of file
@@ -9,6 +9,11 @@ class FuelStation(db.Model):
     address = db.Column(db.String(200))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Delivery coverage; without coordinates it isn't enforced for the station
+    latitude = db.Column(db.Float)
+    longitude = db.Column(db.Float)
+    service_radius_km = db.Column(db.Float, default=15.0, server_default='15')
+    
     owner_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     
     owner = db.relationship('User', back_populates='stations', lazy=True)
@@ -0,0 +1,46 @@
+from datetime import datetime
+from app import db
+
+
+class FuelStock(db.Model):
+    """Litres on hand for one station's fuel (FuelType rows are per station).
+
+    Fuels without a row are untracked and never run out, so stations can
+    adopt the ledger one fuel at a time.
+    """
+    __tablename__ = 'fuel_stock'
+
+    id = db.Column(db.Integer, primary_key=True)
+    fuel_type_id = db.Column(db.Integer, db.ForeignKey('fuel_types.id'), nullable=False, unique=True)
+    station_id = db.Column(db.Integer, db.ForeignKey('fuel_stations.id'), index=True)
+    available_liters = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    fuel_type = db.relationship('FuelType', backref=db.backref('stock', uselist=False), lazy=True)
+
+    def __repr__(self):
+        return f'<FuelStock {self.fuel_type_id}: {self.available_liters} L>'
+
+
+class StockMovement(db.Model):
+    """Append-only record of every change to a FuelStock level"""
+    __tablename__ = 'stock_movements'
+
+    RESERVE = 'reserve'
+    RELEASE = 'release'
+    RESTOCK = 'restock'
+
+    id = db.Column(db.Integer, primary_key=True)
+    fuel_type_id = db.Column(db.Integer, db.ForeignKey('fuel_types.id'), nullable=False, index=True)
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'))
+    change_liters = db.Column(db.Float, nullable=False)  # negative when stock goes out
+    reason = db.Column(db.String(20), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # An order is reserved at most once and released at most once
+    __table_args__ = (
+        db.UniqueConstraint('order_id', 'reason', name='uq_stock_movements_order_reason'),
+    )
+
+    def __repr__(self):
+        return f'<StockMovement {self.reason} {self.change_liters} L>'
@@ -14,6 +14,10 @@ class OrderStatus(Enum):
     CANCELLED = "cancelled"
 
 
+class StatusConflict(Exception):
+    """Raised when an order is no longer in the status a transition expects"""
+
+
 class Order(db.Model):
     __tablename__ = 'orders'
     
@@ -43,6 +47,10 @@ class Order(db.Model):
     status = db.Column(db.Enum(OrderStatus), default=OrderStatus.PENDING)
     status_updated_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Delivery assignment (see app.utils.assignment)
+    delivery_partner_id = db.Column(db.Integer, db.ForeignKey('users.id'), index=True)
+    assigned_at = db.Column(db.DateTime)
+    
     # Special Instructions
     special_instructions = db.Column(db.Text)
     
@@ -51,8 +59,23 @@ class Order(db.Model):
     confirmed_at = db.Column(db.DateTime)
     delivered_at = db.Column(db.DateTime)
     
+    # Optimistic locking: every UPDATE is "... WHERE version = <loaded version>"
+    # and bumps it, so a concurrent writer gets StaleDataError instead of
+    # silently overwriting (see app.utils.concurrency.retry_on_conflict)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    __mapper_args__ = {'version_id_col': version}
+    
+    # Keysets for delta sync ("this user's orders changed after (ts, id)") and
+    # for streaming a user's history newest first
+    __table_args__ = (
+        db.Index('ix_orders_user_sync', 'user_id', 'status_updated_at', 'id'),
+        db.Index('ix_orders_user_id', 'user_id', 'id'),
+        db.Index('ix_orders_delivery_slot', 'delivery_date', 'delivery_time_slot'),
+    )
+    
     # Relationships
     user = db.relationship('User', backref='orders', lazy=True, foreign_keys=[user_id])
+    delivery_partner = db.relationship('User', backref='deliveries', lazy=True, foreign_keys=[delivery_partner_id])
     tracking_history = db.relationship('OrderTracking', backref='order', lazy=True, cascade='all, delete-orphan')
     
     def __init__(self, **kwargs):
@@ -107,26 +130,39 @@ class Order(db.Model):
         """Return formatted delivery date"""
         return self.delivery_date.strftime('%d %b %Y')
     
-    def update_status(self, new_status, message=None):
-        """Update order status and create tracking entry"""
+    def update_status(self, new_status, message=None, expected_status=None, commit=True):
+        """Update order status and create tracking entry.
+        
+        Pass `expected_status` (one status or a list) to make this a
+        compare-and-set: StatusConflict is raised if the order has moved on.
+        Batch callers can pass `commit=False` and commit once themselves.
+        """
+        if expected_status is not None:
+            expected = expected_status if isinstance(expected_status, (list, tuple, set)) else [expected_status]
+            if self.status not in expected:
+                raise StatusConflict(f"Order {self.order_number} is {self.status.value}")
         old_status = self.status
+        now = datetime.utcnow()
         self.status = new_status
-        self.status_updated_at = datetime.utcnow()
+        self.status_updated_at = now
         
         # Set specific timestamps
         if new_status == OrderStatus.CONFIRMED:
-            self.confirmed_at = datetime.utcnow()
+            self.confirmed_at = now
         elif new_status == OrderStatus.DELIVERED:
-            self.delivered_at = datetime.utcnow()
+            self.delivered_at = now
         
-        # Create tracking entry
+        # Create tracking entry, stamped with the same instant as the order so
+        # delta sync can pick both up with one cursor
         tracking = OrderTracking(
             order_id=self.id,
             status=new_status,
+            created_at=now,
             message=message or f"Order status changed from {old_status.value} to {new_status.value}"
         )
         db.session.add(tracking)
-        db.session.commit()
+        if commit:
+            db.session.commit()
     
     def __repr__(self):
         return f'<Order {self.order_number} - {self.status.value}>'
@@ -141,6 +177,10 @@ class OrderTracking(db.Model):
     message = db.Column(db.String(200))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('ix_order_tracking_order_created', 'order_id', 'created_at'),
+    )
+    
     @property
     def formatted_time(self):
         """Return formatted timestamp"""
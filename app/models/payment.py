@@ -3,10 +3,20 @@ from enum import Enum
 from app import db
 
 class PaymentStatus(Enum):
-    PENDING = "pending"
+    PENDING = "pending"          # intent created locally, not yet sent to the gateway
+    PROCESSING = "processing"    # gateway accepted the intent, waiting for its webhook
     COMPLETED = "completed"
     FAILED = "failed"
 
+# Allowed moves of the payment intent state machine. The gateway's webhook may
+# overtake our own submission, so PENDING can settle directly.
+PAYMENT_TRANSITIONS = {
+    PaymentStatus.PENDING: {PaymentStatus.PROCESSING, PaymentStatus.COMPLETED, PaymentStatus.FAILED},
+    PaymentStatus.PROCESSING: {PaymentStatus.COMPLETED, PaymentStatus.FAILED},
+    PaymentStatus.COMPLETED: set(),
+    PaymentStatus.FAILED: set(),
+}
+
 class Payment(db.Model):
     __tablename__ = 'payments'
     
@@ -16,10 +26,26 @@ class Payment(db.Model):
     payment_mode = db.Column(db.String(20), nullable=False)  # e.g., 'COD', 'Online'
     status = db.Column(db.Enum(PaymentStatus), default=PaymentStatus.PENDING)
     transaction_id = db.Column(db.String(50), unique=True)  # For online payments
+    failure_reason = db.Column(db.String(200))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Optimistic locking, so the submit worker and webhook batches can't clobber each other
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    __mapper_args__ = {'version_id_col': version}
+    
     order = db.relationship('Order', backref='payment', uselist=False)
     
+    def can_transition(self, new_status):
+        return new_status in PAYMENT_TRANSITIONS[self.status or PaymentStatus.PENDING]
+    
+    def transition(self, new_status, reason=None):
+        """Move the intent to `new_status`, rejecting illegal jumps"""
+        if not self.can_transition(new_status):
+            raise ValueError(f"Payment {self.id}: cannot go from {self.status.value} to {new_status.value}")
+        self.status = new_status
+        if reason:
+            self.failure_reason = reason[:200]
+    
     def __repr__(self):
         return f'<Payment {self.order_id} - {self.status.value} - {self.amount}>'
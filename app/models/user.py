@@ -9,7 +9,7 @@ class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False, index=True)
     email = db.Column(db.String(120), unique=True, nullable=False, index=True)
-    phone = db.Column(db.String(15), nullable=False)
+    phone = db.Column(db.String(15), nullable=False, index=True)
     password_hash = db.Column(db.String(255), nullable=False)
     role = db.Column(
         db.Enum('customer', 'delivery_partner', 'station_owner', 'admin'),
@@ -18,8 +18,7 @@ class User(UserMixin, db.Model):
     )
     is_verified = db.Column(db.Boolean, default=False)
     is_active = db.Column(db.Boolean, default=True)
-    otp_code = db.Column(db.String(6), nullable=True)
-    otp_expiry = db.Column(db.DateTime, nullable=True)
+    home_shard = db.Column(db.String(32))  # database holding this user's orders; NULL = primary
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -1,5 +1,10 @@
-from flask import Blueprint, render_template
+from flask import Blueprint, render_template, jsonify, abort, request
 from flask_login import login_required, current_user
+from datetime import datetime, timedelta
+from app import db, limiter, admission, order_search, notifier, eta_service, shards
+from app.models.order import Order
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
 
 bp = Blueprint('admin', __name__)
 
@@ -7,4 +12,87 @@ bp = Blueprint('admin', __name__)
 @login_required
 def dashboard():
     """Admin dashboard"""
-    return render_template('admin/dashboard.html')
\ No newline at end of file
+    return render_template('admin/dashboard.html')
+
+@bp.route('/api/rate-limits')
+@login_required
+def rate_limits():
+    """Allowed/rejected counters per rate limit scope"""
+    if not current_user.is_admin():
+        abort(403)
+    return jsonify(limiter.stats())
+
+@bp.route('/api/admission')
+@login_required
+def admission_stats():
+    """In-flight requests, DB latency and per-tier admission counters"""
+    if not current_user.is_admin():
+        abort(403)
+    return jsonify(admission.stats())
+
+@bp.route('/api/notifications')
+@login_required
+def notification_stats():
+    """Queued, coalesced and delivered status notifications"""
+    if not current_user.is_admin():
+        abort(403)
+    return jsonify(notifier.status())
+
+@bp.route('/api/eta')
+@login_required
+def eta_stats():
+    """Cached partner routes and travel-cache hit rate"""
+    if not current_user.is_admin():
+        abort(403)
+    return jsonify(eta_service.status())
+
+@bp.route('/api/orders/search')
+@login_required
+def search_orders():
+    """Support lookup by order number, customer, phone, city or pincode"""
+    if not current_user.is_admin():
+        abort(403)
+    station_id = request.args.get('station_id', type=int)
+    limit = min(request.args.get('limit', 50, type=int), 200)
+    ids = order_search.search(request.args.get('q', ''),
+                              station_ids=[station_id] if station_id else None, limit=limit)
+    orders = Order.query.options(joinedload(Order.user), joinedload(Order.delivery_address))\
+        .filter(Order.id.in_(ids)).order_by(Order.id.desc()).all() if ids else []
+    return jsonify([{
+        'id': order.id,
+        'order_number': order.order_number,
+        'customer': order.user.username,
+        'phone': order.user.phone,
+        'city': order.delivery_address.city,
+        'status': order.status.value,
+        'total_amount': order.total_amount,
+        'created_at': order.created_at.isoformat() if order.created_at else None,
+    } for order in orders])
+
+def _daily_order_totals(since):
+    """(day, status, orders, revenue) rows of the current shard"""
+    return [(str(day), status.value, count, revenue or 0.0) for day, status, count, revenue in db.session.query(
+        func.date(Order.created_at), Order.status, func.count(Order.id), func.sum(Order.total_amount)
+    ).filter(Order.created_at >= since).group_by(func.date(Order.created_at), Order.status).all()]
+
+@bp.route('/api/reports/orders')
+@login_required
+def order_report():
+    """Orders and revenue per day and status, merged across every shard"""
+    if not current_user.is_admin():
+        abort(403)
+    days = min(request.args.get('days', 30, type=int), 366)
+    since = datetime.utcnow() - timedelta(days=days)
+    per_shard = shards.fan_out(_daily_order_totals, since)
+
+    merged = {}
+    for rows in per_shard.values():
+        for day, status, count, revenue in rows:
+            entry = merged.setdefault(day, {'date': day, 'orders': 0, 'revenue': 0.0, 'by_status': {}})
+            entry['orders'] += count
+            entry['revenue'] += revenue
+            entry['by_status'][status] = entry['by_status'].get(status, 0) + count
+    return jsonify({
+        'days': [merged[day] for day in sorted(merged)],
+        'shards': {shard or 'primary': sum(row[2] for row in rows) for shard, rows in per_shard.items()},
+    })
@@ -0,0 +1,30 @@
+import mimetypes
+from flask import Blueprint, current_app, request, send_from_directory
+from werkzeug.exceptions import NotFound
+from app.utils.assets import dist_folder
+
+bp = Blueprint('assets', __name__, url_prefix='/assets')
+
+@bp.route('/<path:filename>')
+def serve(filename):
+    """Serve a fingerprinted asset, precompressed when the client allows it"""
+    folder = dist_folder(current_app)
+    max_age = current_app.config['ASSETS_MAX_AGE']
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+    gzipped = 'gzip' in request.headers.get('Accept-Encoding', '').lower()
+    if gzipped:
+        try:
+            response = send_from_directory(folder, filename + '.gz', mimetype=mimetype, max_age=max_age)
+            response.headers['Content-Encoding'] = 'gzip'
+            response.headers.pop('Content-Disposition', None)
+        except NotFound:
+            gzipped = False
+
+    if not gzipped:
+        response = send_from_directory(folder, filename, mimetype=mimetype, max_age=max_age)
+
+    # File names change whenever content does, so browsers never need to revalidate
+    response.headers['Cache-Control'] = f'public, max-age={max_age}, immutable'
+    response.vary.add('Accept-Encoding')
+    return response
@@ -1,12 +1,13 @@
 from flask import current_app
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify, abort
 from flask_login import login_user, logout_user, login_required, current_user
 from app.models import db, User
 from app.utils.forms import LoginForm, RegistrationForm, AddressForm, OrderFuelForm   
-from app import mail
+from app import mail, limiter, otp_service, availability
+from app.utils import otp as otp_results
+from app.utils.ratelimit import client_ip, request_email
 from flask_mail import Message
-from datetime import datetime, timedelta
-import random
+from datetime import datetime
 from app.models.fuel import FuelType
 from app.models.address import Address
 from app.models.order import Order, OrderStatus
@@ -57,6 +58,8 @@ def logout():
 
 # ----------- REGISTER -----------
 @bp.route("/register", methods=["GET", "POST"])
+@limiter.limit("10/hour", key=client_ip, scope="register-ip", methods=("POST",))
+@limiter.limit("3/hour", key=request_email, scope="register-email", methods=("POST",))
 def register():
     print("\n" + "="*50)
     print(f"REGISTER ROUTE HIT - Method: {request.method}")
@@ -74,23 +77,20 @@ def register():
         
         if form.validate_on_submit():
             print("✅ Form validation passed!")
-            # Your existing OTP and user creation code...
-            otp = f"{random.randint(100000, 999999)}"
-            otp_expiry = datetime.utcnow() + timedelta(minutes=10)
-
             user = User(
                 username=form.username.data,
                 email=form.email.data,
                 phone=form.phone.data,
                 role=form.role.data,
-                otp_code=otp,
-                otp_expiry=otp_expiry,
                 is_verified=False
             )
             user.set_password(form.password.data)
             db.session.add(user)
             db.session.commit()
 
+            # The code lives in the OTP store, not on the users row
+            otp = otp_service.issue(user.email)
+
             print(f"👤 User created: {user.email}")
             
             # Send OTP Email
@@ -99,7 +99,7 @@ def register():
     "Verify Your Account - FuelExpress",
     sender=current_app.config['MAIL_USERNAME'],  # This line is crucial!
     recipients=[user.email],
-    body=f"Hello {user.username},\n\nYour OTP is: {otp}\nIt expires in 10 minutes.\n\nThank you,\nFuelExpress Team"
+    body=f"Hello {user.username},\n\nYour OTP is: {otp}\nIt expires in {otp_service.ttl // 60} minutes.\n\nThank you,\nFuelExpress Team"
 )
                 mail.send(msg)
                 print("📧 Email sent successfully!")
@@ -115,6 +115,17 @@ def register():
     print("📄 Rendering register.html")
     return render_template("auth/register.html", form=form)
 
+# ----------- LIVE AVAILABILITY CHECK -----------
+@bp.route("/check-availability")
+@limiter.limit("60/minute", key=client_ip, scope="availability-ip")
+def check_availability():
+    """?field=username|email|phone&value=... -> {"available": bool}"""
+    field = request.args.get("field")
+    value = request.args.get("value", "").strip()
+    if field not in ("username", "email", "phone") or not value:
+        abort(400)
+    return jsonify({"field": field, "available": availability.is_available(field, value)})
+
 # ----------- SEED DATA FOR CUSTOMER DASHBOARD -----------
 @bp.route("/seed-data")
 def seed_data():
@@ -254,11 +265,14 @@ def seed_data():
 
 # ----------- DEBUG ROUTES (Remove in production) -----------
 @bp.route("/get-otp/<email>")
+@limiter.limit("20/minute", key=client_ip, scope="get-otp-ip")
+@limiter.limit("10/minute", key=request_email, scope="get-otp-email")
 def get_otp(email):
-    user = User.query.filter_by(email=email).first()
-    if user:
-        return f"<h1>OTP: {user.otp_code}</h1><p>Expires: {user.otp_expiry}</p>"
-    return "User not found"
+    pending = otp_service.pending(email)
+    if pending:
+        code, expires_at = pending
+        return f"<h1>OTP: {code}</h1><p>Expires: {datetime.utcfromtimestamp(expires_at)}</p>"
+    return "No pending OTP for this email"
 
 @bp.route("/list-users")
 def list_users():
@@ -295,17 +309,16 @@ def list_users():
     return result
 
 @bp.route("/refresh-otp/<email>")
+@limiter.limit("10/minute", key=client_ip, scope="refresh-otp-ip")
+@limiter.limit("3/minute", key=request_email, scope="refresh-otp-email")
 def refresh_otp(email):
-    user = User.query.filter_by(email=email).first()
+    # Read-only check; issuing the code writes to the OTP store only
+    user = User.query.with_entities(User.id).filter_by(email=email, is_verified=False).first()
     if user:
-        # Generate new OTP with fresh expiry
-        new_otp = f"{random.randint(100000, 999999)}"
-        user.otp_code = new_otp
-        user.otp_expiry = datetime.utcnow() + timedelta(minutes=10)
-        db.session.commit()
-        
-        return f"<h1>New OTP: {new_otp}</h1><p>Expires: {user.otp_expiry}</p><p><a href='/auth/verify?email={email}'>Go to verification page</a></p>"
-    return "User not found"
+        new_otp = otp_service.issue(email)
+        expires_at = datetime.utcfromtimestamp(otp_service.pending(email)[1])
+        return f"<h1>New OTP: {new_otp}</h1><p>Expires: {expires_at}</p><p><a href='/auth/verify?email={email}'>Go to verification page</a></p>"
+    return "User not found or already verified"
 
 @bp.route("/delete-user/<email>")
 def delete_user(email):
@@ -326,24 +339,30 @@ def clear_all_users():
 
 # ----------- VERIFY OTP -----------
 @bp.route("/verify", methods=["GET", "POST"])
+@limiter.limit("30/minute", key=client_ip, scope="verify-ip")
+@limiter.limit("5/minute", key=request_email, scope="verify-email")
 def verify():
     email = request.args.get("email")
-    user = User.query.filter_by(email=email).first()
-    if not user:
-        flash("User not found!", "danger")
+    if not email or not otp_service.pending(email):
+        flash("No pending verification for this email. Please register or request a new OTP.", "danger")
         return redirect(url_for("auth.register"))
 
     if request.method == "POST":
-        otp_input = request.form.get("otp")
-        if user.otp_code == otp_input and datetime.utcnow() <= user.otp_expiry:
-            user.is_verified = True
-            user.otp_code = None
-            user.otp_expiry = None
+        result = otp_service.verify(email, request.form.get("otp"))
+        if result == otp_results.VERIFIED:
+            # The only write to users in the whole OTP flow
+            User.query.filter_by(email=email).update({'is_verified': True})
             db.session.commit()
             flash("Account verified! You can now log in.", "success")
             return redirect(url_for("auth.login"))
+        elif result == otp_results.LOCKED:
+            flash("Too many incorrect attempts. Please request a new OTP.", "danger")
+            return redirect(url_for("auth.register"))
+        elif result == otp_results.EXPIRED:
+            flash("Your OTP has expired. Please request a new one.", "danger")
+            return redirect(url_for("auth.register"))
         else:
-            flash("Invalid or expired OTP. Please try again.", "danger")
+            flash("Invalid OTP. Please try again.", "danger")
 
     return render_template("auth/verify.html", email=email)
 
@@ -1,51 +1,68 @@
-from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify
+from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify, current_app, abort, Response
 from flask_login import login_required, current_user
 from flask_wtf.csrf import generate_csrf, validate_csrf
-from app.models import db, User, FuelType, Address, Order, OrderStatus
+from app.models import db, User, FuelType, Address, Order, OrderStatus, StatusConflict
 from datetime import datetime, timedelta
-from sqlalchemy import desc
+from sqlalchemy import desc, func, case
+from sqlalchemy.orm import selectinload
 from decimal import Decimal
 from app.utils.forms import OrderFuelForm
+from app import idempotency, serviceability, inventory, eta_service, invoicer
+from app.utils.widgets import Dashboard, Widget
+from app.utils.sync import order_changes, InvalidCursor
+from app.utils.inventory import InsufficientStock
+from app.utils.concurrency import retry_on_conflict
+from app.utils.streaming import chunked, stream_page
 
 
 bp = Blueprint('customer', __name__, url_prefix='/customer')
 
+def _order_stats(user_id):
+    """Order counts and spend in one aggregate instead of four queries"""
+    delivered = case((Order.status == OrderStatus.DELIVERED, 1), else_=0)
+    total, pending, completed, spent = db.session.query(
+        func.count(Order.id),
+        func.sum(case((Order.status == OrderStatus.PENDING, 1), else_=0)),
+        func.sum(delivered),
+        func.sum(delivered * Order.total_amount)
+    ).filter(Order.user_id == user_id).one()
+    return {
+        'total_orders': total or 0,
+        'pending_orders': pending or 0,
+        'completed_orders': completed or 0,
+        'total_spent': spent or 0.0,
+    }
+
+
+customer_dashboard = Dashboard(
+    Widget('stats', _order_stats,
+           fallback=lambda: {'total_orders': 0, 'pending_orders': 0, 'completed_orders': 0, 'total_spent': 0.0}),
+    Widget('recent_orders',
+           lambda user_id: Order.query.options(selectinload(Order.fuel_type))
+               .filter_by(user_id=user_id).order_by(desc(Order.created_at)).limit(5).all(),
+           fallback=list),
+    Widget('fuel_types', lambda user_id: FuelType.query.all(), fallback=list),
+    Widget('default_address',
+           lambda user_id: Address.query.filter_by(user_id=user_id, is_default=True).first()),
+)
+
+
 @bp.route('/dashboard')
 @login_required
 def dashboard():
     """Customer dashboard overview"""
-    total_orders = Order.query.filter_by(user_id=current_user.id).count()
-    pending_orders = Order.query.filter_by(user_id=current_user.id, status=OrderStatus.PENDING).count()
-    completed_orders = Order.query.filter_by(user_id=current_user.id, status=OrderStatus.DELIVERED).count()
-
-    completed_orders_list = Order.query.filter_by(
-        user_id=current_user.id, 
-        status=OrderStatus.DELIVERED
-    ).all()
-    total_spent = sum(order.total_amount for order in completed_orders_list)
-
-    recent_orders = Order.query.filter_by(user_id=current_user.id)\
-        .order_by(desc(Order.created_at)).limit(5).all()
-
-    fuel_types = FuelType.query.all()
-
-    default_address = Address.query.filter_by(
-        user_id=current_user.id, 
-        is_default=True
-    ).first()
+    widgets = customer_dashboard.load(user_id=current_user.id)
 
     return render_template('customer/dashboard.html',
-                           total_orders=total_orders,
-                           pending_orders=pending_orders,
-                           completed_orders=completed_orders,
-                           total_spent=total_spent,
-                           recent_orders=recent_orders,
-                           fuel_types=fuel_types,
-                           default_address=default_address)
+                           recent_orders=widgets['recent_orders'],
+                           fuel_types=widgets['fuel_types'],
+                           default_address=widgets['default_address'],
+                           **widgets['stats'])
 
 
 @bp.route('/order-fuel', methods=['GET', 'POST'])
 @login_required
+@idempotency.idempotent
 def order_fuel():
     fuels = FuelType.query.all()
     addresses = Address.query.filter_by(user_id=current_user.id).all()
@@ -66,6 +83,10 @@ def order_fuel():
                 flash("Invalid fuel or address selection", "error")
                 return redirect(url_for("customer.order_fuel"))
 
+            if not quantity.is_finite() or quantity <= 0:
+                flash("Please enter a quantity above 0 litres", "error")
+                return redirect(url_for("customer.order_fuel"))
+
             # Ensure valid datetime
             delivery_datetime = datetime.combine(
                 datetime.strptime(delivery_date, "%Y-%m-%d").date(),
@@ -76,6 +97,11 @@ def order_fuel():
                 flash("Delivery must be scheduled at least 2 hours from now!", "error")
                 return redirect(url_for("customer.order_fuel"))
 
+            if current_app.config['SERVICEABILITY_ENFORCED'] and \
+                    not serviceability.is_serviceable(address.pincode, fuel.station_id):
+                flash(f"Sorry, {fuel.name} can't be delivered to pincode {address.pincode}.", "error")
+                return redirect(url_for("customer.order_fuel"))
+
             # Price calculations
             price_per_liter = Decimal(fuel.price_per_liter)
             total_fuel_cost = quantity * price_per_liter
@@ -103,23 +129,96 @@ def order_fuel():
             )
 
             db.session.add(new_order)
+            db.session.flush()
+            # Takes the litres out of the station's tank in this same transaction
+            inventory.reserve(fuel.id, quantity, order_id=new_order.id)
             db.session.commit()
 
             flash(f"Order placed successfully! Total: ₹{total_amount:.2f}", "success")
             # Redirect directly to payment page
             return redirect(url_for("payment.pay", order_id=new_order.order_number))
 
+        except InsufficientStock as e:
+            db.session.rollback()
+            flash(f"Sorry, not enough {fuel.name} at the station. {e}.", "error")
+            return redirect(url_for("customer.order_fuel"))
+
         except Exception as e:
             db.session.rollback()
             print("Order Error:", e)
             flash("Failed to place order. Please try again.", "error")
 
-    return render_template("customer/order_fuel.html", fuels=fuels, addresses=addresses)
+    return render_template("customer/order_fuel.html", fuels=fuels, addresses=addresses,
+                           stock=inventory.snapshot())
 @bp.route('/order/<int:order_id>', methods=['GET'])
 @login_required
 def order_details(order_id):
     order = Order.query.filter_by(id=order_id, user_id=current_user.id).first_or_404()
-    return render_template("customer/order_details.html", order=order)
+    return render_template("customer/order_details.html", order=order, eta=eta_service.for_order(order))
+
+
+@bp.route('/api/orders/<int:order_id>/eta')
+@login_required
+def order_eta(order_id):
+    """Estimated arrival for polling from the order page"""
+    order = Order.query.filter_by(id=order_id, user_id=current_user.id).first_or_404()
+    eta = eta_service.for_order(order)
+    if eta is None:
+        return jsonify({'order_id': order.id, 'status': order.status.value, 'eta': None})
+    return jsonify({'order_id': order.id, 'status': order.status.value, 'eta': eta['eta'].isoformat(),
+                    'minutes': eta['minutes'], 'stops_ahead': eta['stops_ahead'], 'source': eta['source']})
+
+
+def _document(content, fmt, filename):
+    if fmt == 'pdf':
+        return Response(content, mimetype='application/pdf',
+                        headers={'Content-Disposition': f'attachment; filename="{filename}.pdf"'})
+    return Response(content, mimetype='text/html')
+
+
+@bp.route('/order/<int:order_id>/invoice')
+@login_required
+def order_invoice(order_id):
+    """Invoice as HTML, or PDF with ?format=pdf; served from the invoice cache"""
+    order = Order.query.filter_by(id=order_id, user_id=current_user.id).first_or_404()
+    if order.status == OrderStatus.CANCELLED:
+        abort(404)
+    fmt = 'pdf' if request.args.get('format') == 'pdf' else 'html'
+    return _document(invoicer.order_invoice(order, fmt), fmt, f"invoice-{order.order_number}")
+
+
+@bp.route('/statements/<int:year>/<int:month>')
+@login_required
+def monthly_statement(year, month):
+    """All of a month's orders on one statement (?format=pdf for PDF)"""
+    # The month's end is 1 <month+1>, so December 9999 is out of datetime's range too
+    if not 1 <= month <= 12 or not 1 <= year < 9999:
+        abort(404)
+    fmt = 'pdf' if request.args.get('format') == 'pdf' else 'html'
+    content = invoicer.statement(current_user.id, year, month, fmt)
+    if content is None:
+        abort(404)
+    return _document(content, fmt, f"statement-{year:04d}-{month:02d}")
+
+
+@bp.route('/order/<int:order_id>/cancel', methods=['POST'])
+@login_required
+def cancel_order(order_id):
+    """Cancel a pending/confirmed order; its reserved litres go back in stock"""
+    order = Order.query.filter_by(id=order_id, user_id=current_user.id).first_or_404()
+
+    def cancel():
+        current = db.session.get(Order, order.id)
+        current.update_status(OrderStatus.CANCELLED, message="Cancelled by customer",
+                              expected_status=[OrderStatus.PENDING, OrderStatus.CONFIRMED])
+
+    try:
+        retry_on_conflict(cancel)
+        flash("Order cancelled.", "success")
+    except StatusConflict:
+        db.session.rollback()
+        flash("This order can no longer be cancelled.", "error")
+    return redirect(url_for('customer.order_details', order_id=order.id))
 
 
 @bp.route('/addresses')
@@ -130,6 +229,19 @@ def addresses():
     return render_template('customer/addresses.html', addresses=user_addresses)
 
 
+def _apply_location(address):
+    """Fill coordinates from the bundled pincode dataset when we know it"""
+    location = serviceability.index.lookup(address.pincode)
+    if location:
+        address.latitude = location.latitude
+        address.longitude = location.longitude
+
+
+def _warn_if_unserviceable(address):
+    if not serviceability.is_serviceable(address.pincode):
+        flash(f"Heads up: we don't deliver to pincode {address.pincode} yet.", 'warning')
+
+
 @bp.route('/addresses/add', methods=['GET', 'POST'])
 @login_required
 def add_address():
@@ -166,11 +278,13 @@ def add_address():
                 label=label,
                 is_default=is_default
             )
+            _apply_location(new_address)
 
             db.session.add(new_address)
             db.session.commit()
 
             flash('Address added successfully!', 'success')
+            _warn_if_unserviceable(new_address)
             return redirect(url_for('customer.addresses'))
 
         except Exception as e:
@@ -198,6 +312,7 @@ def edit_address(address_id):
             address.pincode = request.form.get('pincode').strip()
             address.label = request.form.get('label', 'Home').strip()
             address.is_default = request.form.get('is_default') == 'on'
+            _apply_location(address)
 
             if address.is_default:
                 Address.query.filter_by(user_id=current_user.id, is_default=True)\
@@ -205,6 +320,7 @@ def edit_address(address_id):
 
             db.session.commit()
             flash('Address updated successfully!', 'success')
+            _warn_if_unserviceable(address)
             return redirect(url_for('customer.addresses'))
 
         except Exception as e:
@@ -285,12 +401,92 @@ def get_fuel_price(fuel_id):
         'description': fuel.description
     })
 
+
+@bp.route('/api/fuel-catalog')
+@login_required
+def fuel_catalog():
+    """All available fuels and prices in one payload, for polling clients.
+
+    Scope with `?station_id=1&station_id=2` or `?city=Pune` (stations whose
+    address mentions the city). Answers `If-None-Match` with 304 before
+    loading any fuel rows.
+    """
+    station_ids = request.args.getlist('station_id', type=int) or None
+    city = request.args.get('city', '').strip()
+    if city:
+        from app.models.fuel_station import FuelStation
+        city_stations = [s.id for s in FuelStation.query.with_entities(FuelStation.id)
+                         .filter(FuelStation.address.ilike(f"%{city}%"))]
+        station_ids = [s for s in station_ids if s in city_stations] if station_ids else city_stations
+
+    version = FuelType.catalog_version(station_ids)
+    if request.if_none_match.contains(version):
+        response = current_app.response_class(status=304)
+    else:
+        fuels = FuelType.catalog_query(station_ids).filter_by(is_available=True)\
+            .order_by(FuelType.id).all()
+        response = jsonify({
+            'version': version,
+            'fuels': [[f.id, f.name, f.price_per_liter, f.station_id] for f in fuels],
+            'fields': ['id', 'name', 'price_per_liter', 'station_id']
+        })
+    response.set_etag(version)
+    # Let clients keep the body but always revalidate (cheaply) before reuse
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+@bp.route('/api/fuel-stock')
+@login_required
+def fuel_stock():
+    """Litres left per tracked fuel (a few seconds stale at most)"""
+    station_ids = request.args.getlist('station_id', type=int) or None
+    return jsonify({'stock': inventory.snapshot(station_ids)})
+
+@bp.route('/api/locations')
+@login_required
+def location_autocomplete():
+    """Prefix search over pincodes (digits) or city names"""
+    results = serviceability.index.complete(request.args.get('q', ''), limit=10)
+    for item in results:
+        if 'pincode' in item:
+            item['serviceable'] = serviceability.is_serviceable(item['pincode'])
+    return jsonify({'results': results})
+
+
+@bp.route('/api/serviceability/<pincode>')
+@login_required
+def pincode_serviceability(pincode):
+    """Whether, and by which stations, a pincode is served"""
+    location = serviceability.index.lookup(pincode)
+    return jsonify({
+        'pincode': pincode,
+        'city': location.city if location else None,
+        'state': location.state if location else None,
+        'serviceable': serviceability.is_serviceable(pincode),
+        'station_ids': list(serviceability.stations_for(pincode)),
+    })
+
 @bp.route('/orders')
 @login_required
 def orders_history():
-    # fetch user orders from DB
-    user_orders = Order.query.filter_by(user_id=current_user.id).all()
-    return render_template('customer/orders.html', orders=user_orders)
+    # Streamed newest first, a page of orders (plus their fuels and addresses) at a time
+    user_orders = chunked(Order.query.options(selectinload(Order.fuel_type), selectinload(Order.delivery_address))
+                          .filter_by(user_id=current_user.id), Order.id)
+    return stream_page('customer/orders.html', orders=user_orders)
+
+@bp.route('/api/orders/sync')
+@login_required
+def orders_sync():
+    """Orders and tracking rows changed since `?cursor=`; omit it for a full sync"""
+    limit = min(request.args.get('limit', 100, type=int), 500)
+    try:
+        changes = order_changes(current_user.id, request.args.get('cursor') or None, limit=limit,
+                                safety_window=current_app.config['SYNC_SAFETY_WINDOW'])
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    response = jsonify(changes)
+    response.headers['Cache-Control'] = 'private, no-store'
+    return response
 
 @bp.route("/create_order", methods=["POST"])
 @login_required
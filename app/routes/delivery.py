@@ -0,0 +1,36 @@
+from datetime import date
+from flask import Blueprint, render_template, abort, request, jsonify, current_app
+from flask_login import login_required, current_user
+from sqlalchemy.orm import joinedload
+from app import tracker
+from app.models.order import Order, OrderStatus
+
+bp = Blueprint('delivery', __name__, url_prefix='/delivery')
+
+@bp.route('/dashboard')
+@login_required
+def dashboard():
+    """Today's and upcoming stops assigned to this partner"""
+    if not current_user.is_delivery_partner():
+        abort(403)
+    orders = Order.query.options(joinedload(Order.delivery_address), joinedload(Order.fuel_type))\
+        .filter(Order.delivery_partner_id == current_user.id,
+                Order.delivery_date >= date.today(),
+                Order.status.notin_([OrderStatus.DELIVERED, OrderStatus.CANCELLED]))\
+        .order_by(Order.delivery_date, Order.delivery_time_slot, Order.id).all()
+    return render_template('delivery/dashboard.html', orders=orders)
+
+@bp.route('/api/pings', methods=['POST'])
+@login_required
+def location_pings():
+    """Batched GPS pings: {"pings": [[epoch_seconds, lat, lon], ...]}"""
+    if not current_user.is_delivery_partner():
+        abort(403)
+    payload = request.get_json(silent=True) or {}
+    pings = payload.get('pings')
+    if not isinstance(pings, list):
+        return jsonify({'error': 'Expected {"pings": [[ts, lat, lon], ...]}'}), 400
+    if len(pings) > current_app.config['TRACKING_MAX_BATCH']:
+        return jsonify({'error': f"At most {current_app.config['TRACKING_MAX_BATCH']} pings per request"}), 413
+    accepted = tracker.record(current_user.id, pings)
+    return jsonify({'accepted': accepted, 'rejected': len(pings) - accepted})
@@ -1,34 +1,77 @@
-from flask import Blueprint, render_template, redirect, url_for, request, flash
+from datetime import date, datetime
+from flask import Blueprint, render_template, redirect, url_for, request, flash, current_app
 from flask_login import login_required, current_user
 from app.models.fuel import FuelType
 from app.models.fuel_station import FuelStation
 from app.models.order import Order, OrderStatus
-from app import db
+from app import db, order_search, inventory, forecaster
+from app.utils.widgets import Dashboard, Widget
+from app.utils.assignment import assign_date
+from app.utils.streaming import chunked, stream_page
+from sqlalchemy.orm import joinedload, contains_eager
 
 bp = Blueprint('owner', __name__, url_prefix='/owner')
 
+def _station_orders(station_ids):
+    """Newest-first orders of these stations with everything the tables show"""
+    return chunked(Order.query.join(FuelType)
+                   .options(joinedload(Order.user), contains_eager(Order.fuel_type), joinedload(Order.delivery_partner))
+                   .filter(FuelType.station_id.in_(station_ids)), Order.id)
+
 # Dashboard
+owner_dashboard = Dashboard(
+    Widget('fuels',
+           lambda station_ids: FuelType.query.filter(FuelType.station_id.in_(station_ids)).all(),
+           fallback=list),
+    # Served from the forecaster's cache; never waits on a model fit
+    Widget('forecast', lambda station_ids: forecaster.for_stations(station_ids), fallback=dict),
+)
+
 @bp.route('/dashboard')
 @login_required
 def dashboard():
     # Get all station IDs for this owner
     station_ids = [station.id for station in current_user.stations]
 
-    # Fetch all fuel types for all stations of this owner
-    fuels = FuelType.query.filter(FuelType.station_id.in_(station_ids)).all()
-
-    # Fetch all orders for these stations
-    orders = Order.query.join(FuelType).filter(FuelType.station_id.in_(station_ids)).all()
+    # Fuels and the forecast load side by side on the widget pool; orders
+    # stream into the page afterwards, a page of rows at a time
+    widgets = owner_dashboard.load(station_ids=station_ids)
 
-    return render_template('owner/dashboard.html', fuels=fuels, orders=orders)
+    return stream_page('owner/dashboard.html', fuels=widgets['fuels'], orders=_station_orders(station_ids),
+                       forecast=widgets['forecast'], stations={s.id: s.name for s in current_user.stations},
+                       fuel_names={f.id: f.name for f in widgets['fuels']})
 
 # Orders Page
 @bp.route('/orders')
 @login_required
 def orders():
     station_ids = [station.id for station in current_user.stations]
-    orders = Order.query.join(FuelType).filter(FuelType.station_id.in_(station_ids)).all()
-    return render_template('owner/orders.html', orders=orders)
+    q = request.args.get('q', '').strip()
+    if q:
+        # Order number / customer / phone / city lookups go through the search index
+        ids = order_search.search(q, station_ids=station_ids)
+        orders = chunked(Order.query.options(joinedload(Order.user), joinedload(Order.fuel_type),
+                                             joinedload(Order.delivery_partner))
+                         .filter(Order.id.in_(ids)), Order.id)
+    else:
+        orders = _station_orders(station_ids)
+    return stream_page('owner/orders.html', orders=orders, q=q)
+
+@bp.route('/orders/assign', methods=['POST'])
+@login_required
+def assign_orders():
+    """Match the day's unassigned orders to this owner's delivery partners"""
+    station_ids = [station.id for station in current_user.stations]
+    day = request.form.get('date') or date.today().isoformat()
+    try:
+        delivery_date = datetime.strptime(day, '%Y-%m-%d').date()
+    except ValueError:
+        flash('Invalid date', 'error')
+        return redirect(url_for('owner.orders'))
+    results = assign_date(delivery_date, station_ids=station_ids,
+                          load_weight=current_app.config['ASSIGNMENT_LOAD_WEIGHT'])
+    flash(f"Assigned {sum(results.values())} orders for {delivery_date:%d %b %Y}", 'success')
+    return redirect(url_for('owner.orders'))
 
 # Update Fuel
 @bp.route('/fuel/update/<int:fuel_id>', methods=['GET','POST'])
@@ -38,6 +81,9 @@ def update_fuel(fuel_id):
     if request.method == 'POST':
         fuel.price_per_liter = float(request.form['price'])
         fuel.is_available = True if 'available' in request.form else False
+        restock = request.form.get('restock', type=float)
+        if restock and restock > 0:
+            inventory.restock(fuel, restock)
         db.session.commit()
         flash('Fuel updated successfully', 'success')
         return redirect(url_for('owner.dashboard'))
@@ -1,23 +1,45 @@
-from flask import render_template, request, redirect, url_for, flash, Blueprint
-from app.models.order import Order, OrderStatus
+from flask import render_template, request, redirect, url_for, flash, Blueprint, jsonify, abort, current_app
+from flask_login import login_required, current_user
+from app.models.order import Order, OrderStatus, StatusConflict
+from app.models.payment import Payment, PaymentStatus
 from app.utils.forms import PaymentForm
-from app import db
+from app import db, idempotency, payments, csrf
+from app.utils.concurrency import retry_on_conflict
+from app.utils.payments import SIGNATURE_HEADER, verify_signature
 
 bp = Blueprint('payment', __name__, url_prefix="/payment")
 
 @bp.route('/pay/<order_id>', methods=['GET', 'POST'])
+@idempotency.idempotent
 def pay(order_id):
     order = Order.query.filter_by(order_number=order_id).first_or_404()
     form = PaymentForm()
 
     if form.validate_on_submit():  # checks CSRF automatically
         if form.payment_mode.data == 'COD':
-            order.status = OrderStatus.CONFIRMED
-            db.session.commit()
-            flash('COD selected. Your order is confirmed!', 'success')
+            try:
+                retry_on_conflict(lambda: order.update_status(
+                    OrderStatus.CONFIRMED,
+                    message="Cash on delivery selected",
+                    expected_status=OrderStatus.PENDING
+                ))
+                flash('COD selected. Your order is confirmed!', 'success')
+            except StatusConflict:
+                flash(f'This order is already {order.status_display.lower()}.', 'info')
         else:
-            # handle online payment logic here
-            flash('Online payment selected. Redirecting...', 'info')
+            # Record the intent and hand it to the background worker; the
+            # gateway round trip and settlement never block this request
+            payment = Payment.query.filter_by(order_id=order.id, payment_mode='Online')\
+                .filter(Payment.status.in_([PaymentStatus.PENDING, PaymentStatus.PROCESSING])).first()
+            if payment is None:
+                payment = Payment(order_id=order.id, amount=order.total_amount, payment_mode='Online')
+                db.session.add(payment)
+                db.session.commit()
+                payments.submit(payment.id)
+            elif payment.status == PaymentStatus.PENDING and payment.transaction_id is None:
+                # Its queued submission may have been lost; the gateway dedupes resubmits
+                payments.submit(payment.id)
+            flash('Payment is being processed. Your order will be confirmed shortly.', 'info')
 
         # after payment, redirect to success page
         return redirect(url_for('payment.success', order_id=order.order_number))
@@ -29,3 +51,34 @@ def pay(order_id):
 def success(order_id):
     order = Order.query.filter_by(order_number=order_id).first_or_404()
     return render_template('payment/success.html', order=order)
+
+
+@bp.route('/status/<order_id>')
+@login_required
+def status(order_id):
+    """Poll target for the success page while an online payment settles"""
+    order = Order.query.filter_by(order_number=order_id, user_id=current_user.id).first_or_404()
+    payment = Payment.query.filter_by(order_id=order.id).order_by(Payment.id.desc()).first()
+    return jsonify({
+        'order_status': order.status.value,
+        'payment_status': payment.status.value if payment else None,
+    })
+
+
+@bp.route('/webhook', methods=['POST'])
+@csrf.exempt
+def webhook():
+    """Gateway webhook: verify, apply, then acknowledge.
+
+    Anything that failed gets a 500 so the gateway redelivers; events
+    already applied are skipped as duplicates on the next delivery.
+    """
+    body = request.get_data()
+    if not verify_signature(current_app.config['PAYMENT_WEBHOOK_SECRET'], body, request.headers.get(SIGNATURE_HEADER)):
+        abort(400)
+    payload = request.get_json(silent=True) or {}
+    events = payload.get('events') or ([payload] if payload.get('type') else [])
+    changed, failed = payments.apply_events(events)
+    if failed:
+        return '', 500
+    return '', 200
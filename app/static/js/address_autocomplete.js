@@ -0,0 +1,63 @@
+// City/pincode suggestions and a live "do we deliver here?" hint for the
+// address forms. Lookups are served from an in-memory index on the server.
+document.addEventListener("DOMContentLoaded", function () {
+    const form = document.querySelector('form[data-locations-url]');
+    if (!form) return;
+    const url = form.dataset.locationsUrl;
+    const city = form.querySelector('input[name="city"]');
+    const state = form.querySelector('input[name="state"]');
+    const pincode = form.querySelector('input[name="pincode"]');
+
+    const hint = document.createElement('small');
+    hint.style.display = 'block';
+    pincode.insertAdjacentElement('afterend', hint);
+
+    function attachList(input, id) {
+        const list = document.createElement('datalist');
+        list.id = id;
+        input.setAttribute('list', id);
+        input.insertAdjacentElement('afterend', list);
+        return list;
+    }
+    const cityList = attachList(city, 'city-suggestions');
+    const pincodeList = attachList(pincode, 'pincode-suggestions');
+
+    function suggest(input, list, render, onExact) {
+        let timer = null;
+        input.addEventListener('input', function () {
+            clearTimeout(timer);
+            const q = input.value.trim();
+            if (!q) return;
+            timer = setTimeout(function () {
+                fetch(url + '?q=' + encodeURIComponent(q), { credentials: 'same-origin' })
+                    .then(response => response.ok ? response.json() : null)
+                    .then(data => {
+                        if (!data) return;
+                        list.innerHTML = '';
+                        data.results.forEach(item => {
+                            const option = document.createElement('option');
+                            option.value = render(item);
+                            list.appendChild(option);
+                        });
+                        onExact(q, data.results);
+                    })
+                    .catch(() => {});
+            }, 150);
+        });
+    }
+
+    suggest(city, cityList, item => item.city, function (q, results) {
+        const match = results.find(item => item.city.toLowerCase() === q.toLowerCase());
+        if (match && !state.value) state.value = match.state;
+    });
+
+    suggest(pincode, pincodeList, item => item.pincode, function (q, results) {
+        hint.textContent = '';
+        const match = results.find(item => item.pincode === q);
+        if (!match) return;
+        if (!city.value) city.value = match.city;
+        if (!state.value) state.value = match.state;
+        hint.textContent = match.serviceable ? 'We deliver to this pincode' : "Sorry, we don't deliver to this pincode yet";
+        hint.style.color = match.serviceable ? '#28a745' : '#dc3545';
+    });
+});
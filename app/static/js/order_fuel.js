@@ -9,6 +9,12 @@ document.addEventListener("DOMContentLoaded", function () {
     function updateTotal() {
         const selectedFuel = document.querySelector('input[name="fuel_id"]:checked');
         if (!selectedFuel) return;
+        // Untracked fuels have no data-stock and no upper limit
+        if (selectedFuel.dataset.stock !== undefined) {
+            quantityInput.max = Math.floor(parseFloat(selectedFuel.dataset.stock));
+        } else {
+            quantityInput.removeAttribute('max');
+        }
         const price = parseFloat(selectedFuel.dataset.price);
         const qty = parseFloat(quantityInput.value);
 
@@ -34,4 +40,44 @@ document.addEventListener("DOMContentLoaded", function () {
     };
 
     updateTotal(); // initial call
+
+    // Keep prices fresh. The browser revalidates with If-None-Match, so an
+    // unchanged catalog costs a 304 and no JSON parsing on the server side.
+    const catalogUrl = document.getElementById('orderForm').dataset.catalogUrl;
+    function refreshPrices() {
+        fetch(catalogUrl, { credentials: 'same-origin', cache: 'no-cache' })
+            .then(response => response.ok ? response.json() : null)
+            .then(catalog => {
+                if (!catalog) return;
+                catalog.fuels.forEach(([id, name, price]) => {
+                    const radio = document.querySelector('input[name="fuel_id"][value="' + id + '"]');
+                    if (!radio) return;
+                    radio.dataset.price = price;
+                    const label = radio.parentElement.querySelector('.fuel-price');
+                    if (label) label.textContent = '₹' + Number(price).toFixed(2) + '/L';
+                });
+                updateTotal();
+            })
+            .catch(() => {});
+    }
+    if (catalogUrl) setInterval(refreshPrices, 15000);
+
+    const stockUrl = document.getElementById('orderForm').dataset.stockUrl;
+    function refreshStock() {
+        fetch(stockUrl, { credentials: 'same-origin' })
+            .then(response => response.ok ? response.json() : null)
+            .then(data => {
+                if (!data) return;
+                Object.entries(data.stock).forEach(([id, liters]) => {
+                    const radio = document.querySelector('input[name="fuel_id"][value="' + id + '"]');
+                    if (!radio) return;
+                    radio.dataset.stock = liters;
+                    const label = radio.parentElement.querySelector('.fuel-stock');
+                    if (label) label.textContent = Math.floor(liters) + ' L left';
+                });
+                updateTotal();
+            })
+            .catch(() => {});
+    }
+    if (stockUrl) setInterval(refreshStock, 15000);
 });
@@ -0,0 +1,179 @@
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from flask import current_app, g, request
+from flask_login import current_user
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+CRITICAL = 'critical'
+NORMAL = 'normal'
+LOW = 'low'
+
+DEFAULT_TIERS = {
+    'customer.order_fuel': CRITICAL,
+    'payment.pay': CRITICAL,
+    'payment.success': CRITICAL,
+    'payment.webhook': CRITICAL,
+    'auth.login': CRITICAL,
+    'main.*': LOW,
+    'assets.*': LOW,
+    'static': LOW,
+    'customer.dashboard': LOW,
+    'owner.dashboard': LOW,
+    'admin.dashboard': LOW,
+}
+
+
+class DBLatencyTracker:
+    """Exponentially weighted moving average of query round-trip times"""
+
+    def __init__(self, alpha=0.2, max_age=10.0):
+        self.alpha = alpha
+        self.max_age = max_age
+        self.average = 0.0
+        self.last_sample = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            self.average += self.alpha * (seconds - self.average)
+            self.last_sample = time.monotonic()
+
+    @property
+    def current(self):
+        """Average latency in ms, or 0 when there hasn't been a recent query"""
+        if time.monotonic() - self.last_sample > self.max_age:
+            return 0.0
+        return self.average * 1000
+
+
+class AdmissionController:
+    """Sheds or degrades low-priority requests first when the app is overloaded.
+
+    Each endpoint belongs to a tier. Low tier requests are turned away once
+    in-flight requests pass half the limit or DB latency passes its threshold;
+    normal tier at 80% / twice the threshold; critical requests (ordering and
+    payment) are always admitted. Turned-away GETs are answered from the last
+    good copy of the page when one is fresh enough, otherwise with a 503.
+    """
+
+    def __init__(self, app=None):
+        self.in_flight = 0
+        self.db_latency = DBLatencyTracker()
+        self.counters = defaultdict(lambda: {'admitted': 0, 'degraded': 0, 'shed': 0})
+        self._lock = threading.Lock()
+        self._page_cache = OrderedDict()
+        self._listening = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('ADMISSION_ENABLED', True)
+        app.config.setdefault('ADMISSION_MAX_IN_FLIGHT', 64)
+        app.config.setdefault('ADMISSION_DB_LATENCY_MS', 250)
+        app.config.setdefault('ADMISSION_STALE_TTL', 300)
+        app.config.setdefault('ADMISSION_CACHE_SIZE', 1000)
+        app.config.setdefault('ADMISSION_TIERS', {})
+
+        if not self._listening:
+            event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+            self._listening = True
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        app.extensions['admission'] = self
+
+    # --- DB latency ---
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('admission_query_start', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info['admission_query_start'].pop()
+        self.db_latency.observe(time.perf_counter() - started)
+
+    # --- classification ---
+
+    def tier_for(self, endpoint):
+        tiers = dict(DEFAULT_TIERS, **current_app.config['ADMISSION_TIERS'])
+        if endpoint in tiers:
+            return tiers[endpoint]
+        blueprint = endpoint.rsplit('.', 1)[0] + '.*' if endpoint and '.' in endpoint else None
+        return tiers.get(blueprint, NORMAL)
+
+    def should_shed(self, tier):
+        if tier == CRITICAL:
+            return False
+        config = current_app.config
+        load = self.in_flight / config['ADMISSION_MAX_IN_FLIGHT']
+        latency = self.db_latency.current / config['ADMISSION_DB_LATENCY_MS']
+        if tier == LOW:
+            return load >= 0.5 or latency >= 1
+        return load >= 0.8 or latency >= 2
+
+    def _cache_key(self):
+        user_id = current_user.get_id() if current_user.is_authenticated else None
+        return (request.full_path, user_id)
+
+    # --- request hooks ---
+
+    def _before_request(self):
+        if not current_app.config['ADMISSION_ENABLED']:
+            return None
+        tier = g.admission_tier = self.tier_for(request.endpoint)
+
+        if self.should_shed(tier):
+            if request.method == 'GET':
+                cached = self._page_cache.get(self._cache_key())
+                if cached and time.monotonic() - cached[0] < current_app.config['ADMISSION_STALE_TTL']:
+                    self._count(tier, 'degraded')
+                    body, mimetype = cached[1], cached[2]
+                    response = current_app.response_class(body, mimetype=mimetype)
+                    response.headers['X-Degraded'] = 'stale'
+                    return response
+            self._count(tier, 'shed')
+            return current_app.response_class(
+                'Service busy, please retry shortly.\n',
+                status=503,
+                mimetype='text/plain',
+                headers={'Retry-After': '5'}
+            )
+
+        with self._lock:
+            self.in_flight += 1
+        g.admission_admitted = True
+        self._count(tier, 'admitted')
+        return None
+
+    def _after_request(self, response):
+        # Remember healthy low-priority pages so we can serve them when shedding
+        if g.get('admission_admitted') and g.admission_tier == LOW \
+                and request.method == 'GET' and response.status_code == 200 \
+                and not response.direct_passthrough and not response.is_streamed:
+            with self._lock:
+                key = self._cache_key()
+                self._page_cache.pop(key, None)
+                self._page_cache[key] = (time.monotonic(), response.get_data(), response.mimetype)
+                while len(self._page_cache) > current_app.config['ADMISSION_CACHE_SIZE']:
+                    self._page_cache.popitem(last=False)
+        return response
+
+    def _teardown_request(self, exc):
+        if g.pop('admission_admitted', False):
+            with self._lock:
+                self.in_flight -= 1
+
+    def _count(self, tier, outcome):
+        with self._lock:
+            self.counters[tier][outcome] += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'in_flight': self.in_flight,
+                'db_latency_ms': round(self.db_latency.current, 2),
+                'tiers': {tier: dict(c) for tier, c in self.counters.items()},
+            }
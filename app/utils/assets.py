@@ -0,0 +1,111 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+from flask import current_app, url_for
+
+MANIFEST_NAME = 'manifest.json'
+ASSET_EXTENSIONS = ('.css', '.js')
+
+
+def minify_css(source):
+    """Strip comments and redundant whitespace from a stylesheet"""
+    source = re.sub(r'/\*.*?\*/', '', source, flags=re.S)
+    source = re.sub(r'\s+', ' ', source)
+    source = re.sub(r'\s*([{};,>])\s*', r'\1', source)
+    # Only after ':'; a space before it is a descendant combinator (`.a :hover`)
+    source = re.sub(r':\s+', ':', source)
+    source = source.replace(';}', '}')
+    return source.strip()
+
+
+def minify_js(source):
+    """Drop blank lines, indentation and full-line comments from a script.
+
+    Line breaks are kept so automatic semicolon insertion still works.
+    """
+    lines = []
+    for line in source.splitlines():
+        line = line.strip()
+        if not line or line.startswith('//'):
+            continue
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+MINIFIERS = {
+    '.css': minify_css,
+    '.js': minify_js,
+}
+
+
+def dist_folder(app):
+    return os.path.join(app.static_folder, app.config['ASSETS_DIST_DIR'])
+
+
+def build_assets(app):
+    """Minify, fingerprint and gzip every CSS/JS file under the static folder.
+
+    Writes `<name>.<hash>.<ext>` plus a `.gz` twin into the dist folder and
+    returns the manifest mapping logical paths to fingerprinted ones.
+    """
+    static_root = app.static_folder
+    out_root = dist_folder(app)
+    manifest = {}
+
+    for root, dirs, files in os.walk(static_root):
+        # Never re-process our own build output
+        if os.path.abspath(root).startswith(os.path.abspath(out_root)):
+            continue
+        for filename in sorted(files):
+            stem, ext = os.path.splitext(filename)
+            if ext not in ASSET_EXTENSIONS:
+                continue
+
+            src_path = os.path.join(root, filename)
+            logical = os.path.relpath(src_path, static_root).replace(os.sep, '/')
+            with open(src_path, encoding='utf-8') as f:
+                content = MINIFIERS[ext](f.read()).encode('utf-8')
+
+            digest = hashlib.sha256(content).hexdigest()[:12]
+            hashed = f"{os.path.splitext(logical)[0]}.{digest}{ext}"
+            out_path = os.path.join(out_root, hashed)
+            os.makedirs(os.path.dirname(out_path), exist_ok=True)
+
+            with open(out_path, 'wb') as f:
+                f.write(content)
+            # mtime=0 keeps the gzip bytes identical across builds
+            with open(out_path + '.gz', 'wb') as f:
+                f.write(gzip.compress(content, compresslevel=9, mtime=0))
+
+            manifest[logical] = hashed
+
+    os.makedirs(out_root, exist_ok=True)
+    with open(os.path.join(out_root, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(app):
+    """Return the asset manifest, read once per process"""
+    manifest = app.extensions.get('asset_manifest')
+    if manifest is None:
+        path = os.path.join(dist_folder(app), MANIFEST_NAME)
+        try:
+            with open(path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+        app.extensions['asset_manifest'] = manifest
+    return manifest
+
+
+def asset_url(filename):
+    """url_for() for static assets that prefers the fingerprinted build"""
+    app = current_app._get_current_object()
+    if app.config['ASSETS_FINGERPRINT']:
+        hashed = load_manifest(app).get(filename)
+        if hashed:
+            return url_for('assets.serve', filename=hashed)
+    return url_for('static', filename=filename)
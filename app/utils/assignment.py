@@ -0,0 +1,216 @@
+"""Batch assignment of a slot's orders to delivery partners.
+
+Each partner offers `max_stops_per_slot` seats minus the stops they already
+have. Seat k of a partner costs the distance from the partner to the order
+plus ASSIGNMENT_LOAD_WEIGHT km per stop already ahead of it, so work spreads
+out unless the detour is worth it; seats on vehicles that can't carry the
+order are infeasible. The order x seat matrix is solved exactly with the
+Hungarian algorithm (vectorised over columns), vehicle capacity is enforced
+on the result, and every assignment is written with one executemany UPDATE.
+"""
+import logging
+import time
+from datetime import datetime
+import numpy as np
+from sqlalchemy import bindparam, func, select
+from app import db, eta_service
+from app.models.address import Address
+from app.models.delivery import DeliveryPartner
+from app.models.fuel import FuelType
+from app.models.fuel_station import FuelStation
+from app.models.order import Order, OrderStatus
+from app.utils.locations import EARTH_RADIUS_KM
+
+logger = logging.getLogger(__name__)
+
+# Orders that are paid for / accepted but not yet on the road
+ASSIGNABLE = [OrderStatus.CONFIRMED, OrderStatus.PREPARING]
+
+INFEASIBLE = 1e9
+
+
+def min_cost_assignment(cost):
+    """Minimum-cost matching of rows to columns of a rectangular matrix.
+
+    Returns (row, col) pairs covering min(rows, cols) rows. Shortest
+    augmenting path Hungarian algorithm with potentials, O(n^2 m), with
+    the inner loop over columns done in NumPy.
+    """
+    cost = np.asarray(cost, dtype=float)
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+    if n == 0:
+        return []
+
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=int)  # p[j]: row (1-based) matched to column j, 0 if free
+    way = np.zeros(m + 1, dtype=int)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used[1:]
+            reduced = cost[i0 - 1] - u[i0] - v[1:]
+            better = free & (reduced < minv[1:])
+            minv[1:][better] = reduced[better]
+            way[1:][better] = j0
+            candidates = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(candidates)) + 1
+            delta = candidates[j1 - 1]
+            done = np.nonzero(used)[0]
+            u[p[done]] += delta
+            v[done] -= delta
+            minv[1:][free] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    pairs = [(p[j] - 1, j - 1) for j in range(1, m + 1) if p[j]]
+    return [(c, r) for r, c in pairs] if transposed else pairs
+
+
+def distance_matrix(lat1, lon1, lat2, lon2):
+    """Haversine km between every point of set 1 (rows) and set 2 (columns)"""
+    lat1, lon1 = np.radians(lat1)[:, None], np.radians(lon1)[:, None]
+    lat2, lon2 = np.radians(lat2)[None, :], np.radians(lon2)[None, :]
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def build_cost_matrix(orders, partners, load_weight):
+    """(cost matrix, seat -> partner index) for orders x partner seats.
+
+    `orders` rows: (id, liters, lat, lon); `partners` rows:
+    (user_id, lat, lon, capacity_left, seats_left, stops_already).
+    """
+    seats = [(index, k) for index, partner in enumerate(partners) for k in range(max(partner[4], 0))]
+    if not orders or not seats:
+        return np.zeros((len(orders), len(seats))), []
+    seat_partner = np.array([index for index, _ in seats])
+    seat_rank = np.array([partners[index][5] + k for index, k in seats], dtype=float)
+
+    order_lat = np.array([o[2] for o in orders], dtype=float)
+    order_lon = np.array([o[3] for o in orders], dtype=float)
+    partner_lat = np.array([p[1] for p in partners], dtype=float)
+    partner_lon = np.array([p[2] for p in partners], dtype=float)
+    # Unknown positions (NaN) cost nothing extra; the load term still spreads work
+    distance = np.nan_to_num(distance_matrix(order_lat, order_lon, partner_lat, partner_lon), nan=0.0)
+
+    cost = distance[:, seat_partner] + load_weight * seat_rank[None, :]
+    liters = np.array([o[1] for o in orders], dtype=float)
+    capacity = np.array([p[3] for p in partners], dtype=float)[seat_partner]
+    cost[liters[:, None] > capacity[None, :]] = INFEASIBLE
+    return cost, seat_partner.tolist()
+
+
+def assign_slot(station_id, delivery_date, slot, load_weight=2.0):
+    """Assign every unassigned order of one station slot; returns how many were written"""
+    started = time.perf_counter()
+    station = db.session.get(FuelStation, station_id)
+    station_lat = station.latitude if station and station.latitude is not None else np.nan
+    station_lon = station.longitude if station and station.longitude is not None else np.nan
+
+    orders = db.session.execute(
+        select(Order.id, Order.version, Order.quantity_liters, Address.latitude, Address.longitude)
+        .join(FuelType, Order.fuel_type_id == FuelType.id)
+        .join(Address, Order.delivery_address_id == Address.id)
+        .where(FuelType.station_id == station_id, Order.delivery_date == delivery_date,
+               Order.delivery_time_slot == slot, Order.delivery_partner_id.is_(None),
+               Order.status.in_(ASSIGNABLE))
+        .order_by(Order.id)
+    ).all()
+    if not orders:
+        return 0
+
+    # Stops and litres each partner already carries in this slot
+    loads = dict((row[0], row[1:]) for row in db.session.execute(
+        select(Order.delivery_partner_id, func.count(Order.id), func.sum(Order.quantity_liters))
+        .where(Order.delivery_date == delivery_date, Order.delivery_time_slot == slot,
+               Order.delivery_partner_id.isnot(None), Order.status != OrderStatus.CANCELLED)
+        .group_by(Order.delivery_partner_id)
+    ))
+    partners = []
+    for partner in DeliveryPartner.query.filter_by(station_id=station_id, is_active=True).order_by(DeliveryPartner.id):
+        stops, liters = loads.get(partner.user_id, (0, 0.0))
+        partners.append((
+            partner.user_id,
+            partner.latitude if partner.latitude is not None else station_lat,
+            partner.longitude if partner.longitude is not None else station_lon,
+            partner.vehicle_capacity_liters - (liters or 0.0),
+            partner.max_stops_per_slot - stops,
+            stops,
+        ))
+
+    order_rows = [(o.id, o.quantity_liters,
+                   o.latitude if o.latitude is not None else station_lat,
+                   o.longitude if o.longitude is not None else station_lon) for o in orders]
+    cost, seat_partner = build_cost_matrix(order_rows, partners, load_weight)
+    if not seat_partner:
+        logger.info("Station %s %s %s: no partner capacity for %d orders", station_id, delivery_date, slot, len(orders))
+        return 0
+
+    matches = [(i, j) for i, j in min_cost_assignment(cost) if cost[i, j] < INFEASIBLE]
+
+    # Seats only model stop counts; drop the priciest stops that overflow a tank
+    carried = {}
+    chosen = []
+    for i, j in sorted(matches, key=lambda m: cost[m]):
+        index = seat_partner[j]
+        if carried.get(index, 0.0) + orders[i].quantity_liters <= partners[index][3]:
+            carried[index] = carried.get(index, 0.0) + orders[i].quantity_liters
+            chosen.append((orders[i], partners[index][0]))
+
+    written = bulk_assign(chosen)
+    logger.info("Station %s %s %s: assigned %d/%d orders to %d partners in %.2fs", station_id, delivery_date,
+                slot, written, len(orders), len(partners), time.perf_counter() - started)
+    return written
+
+
+def bulk_assign(assignments):
+    """Write (order row, partner user id) pairs in one executemany.
+
+    Each row only updates if the order is still unassigned at the version we
+    read, so a concurrent edit wins and the order is retried next run.
+    """
+    if not assignments:
+        return 0
+    orders = Order.__table__
+    stmt = orders.update().where(
+        orders.c.id == bindparam('_id'),
+        orders.c.version == bindparam('_version'),
+        orders.c.delivery_partner_id.is_(None),
+    ).values(
+        delivery_partner_id=bindparam('_partner'),
+        assigned_at=datetime.utcnow(),
+        version=orders.c.version + 1,
+    )
+    result = db.session.execute(stmt, [
+        {'_id': order.id, '_version': order.version, '_partner': partner_id}
+        for order, partner_id in assignments
+    ])
+    db.session.commit()
+    eta_service.invalidate({partner_id for _, partner_id in assignments})
+    return result.rowcount if result.rowcount is not None and result.rowcount >= 0 else len(assignments)
+
+
+def assign_date(delivery_date, station_ids=None, load_weight=2.0):
+    """Run `assign_slot` for every station slot with unassigned orders on a date"""
+    query = select(FuelType.station_id, Order.delivery_time_slot).distinct()\
+        .join(FuelType, Order.fuel_type_id == FuelType.id)\
+        .where(Order.delivery_date == delivery_date, Order.delivery_partner_id.is_(None),
+               Order.status.in_(ASSIGNABLE))
+    if station_ids is not None:
+        query = query.where(FuelType.station_id.in_(station_ids))
+    return {(station_id, slot): assign_slot(station_id, delivery_date, slot, load_weight)
+            for station_id, slot in db.session.execute(query).all()}
@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import Counter
+from sqlalchemy import event
+from app import db
+from app.models.user import User
+from app.utils.bloom import BloomFilter
+
+FIELDS = ('username', 'email', 'phone')
+
+
+def normalize(value):
+    # MySQL's default collation compares case-insensitively, so we do too
+    return (value or '').strip().lower()
+
+
+class AvailabilityIndex:
+    """Answers "is this username/email/phone free?" mostly from memory.
+
+    One Bloom filter per field is built from `users` on first use and fed
+    by an ORM insert/update hook. A miss in the filter means the value is
+    definitely unused; only probable hits fall through to an indexed query.
+    Filters are per process, so other workers' inserts show up after the
+    periodic rebuild, which one request runs while the rest keep using the
+    stale filters. Form validation stays the authoritative check.
+    """
+
+    def __init__(self, app=None):
+        self._filters = None
+        self._built_at = 0
+        self._building = None
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self.stats = Counter()
+        self._listening = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('AVAILABILITY_ERROR_RATE', 0.01)
+        app.config.setdefault('AVAILABILITY_REBUILD_INTERVAL', 15 * 60)
+        self.error_rate = app.config['AVAILABILITY_ERROR_RATE']
+        self.rebuild_interval = app.config['AVAILABILITY_REBUILD_INTERVAL']
+        if not self._listening:
+            event.listen(User, 'after_insert', self._on_write)
+            event.listen(User, 'after_update', self._on_write)
+            self._listening = True
+        app.extensions['availability'] = self
+
+    def _on_write(self, mapper, connection, user):
+        self.add(user)
+
+    def add(self, user):
+        with self._lock:
+            if self._building is not None:
+                self._building.append(user_values(user))
+            if self._filters is not None:
+                for field, value in user_values(user).items():
+                    self._filters[field].add(value)
+
+    def build(self):
+        """(Re)build all filters with one streaming scan of users"""
+        with self._lock:
+            self._building = []
+        try:
+            capacity = max(100000, db.session.query(db.func.count(User.id)).scalar() * 2)
+            filters = {field: BloomFilter(capacity, self.error_rate) for field in FIELDS}
+            rows = db.session.query(User.username, User.email, User.phone).yield_per(10000)
+            for username, email, phone in rows:
+                filters['username'].add(normalize(username))
+                filters['email'].add(normalize(email))
+                filters['phone'].add(normalize(phone))
+            with self._lock:
+                # Replay anything inserted while we were scanning
+                for values in self._building:
+                    for field, value in values.items():
+                        filters[field].add(value)
+                self._filters = filters
+                self._built_at = time.monotonic()
+        finally:
+            with self._lock:
+                self._building = None
+        self.stats['builds'] += 1
+
+    def _stale(self):
+        return self._filters is None or time.monotonic() - self._built_at > self.rebuild_interval
+
+    def _ensure_built(self):
+        if not self._stale():
+            return
+        # Single flight: only the first build makes callers wait
+        if not self._build_lock.acquire(blocking=self._filters is None):
+            return
+        try:
+            if self._stale():
+                self.build()
+        finally:
+            self._build_lock.release()
+
+    def is_available(self, field, value):
+        if field not in FIELDS:
+            raise ValueError(f"Unknown field {field!r}")
+        value = normalize(value)
+        self._ensure_built()
+        if value not in self._filters[field]:
+            self.stats['memory'] += 1
+            return True
+        self.stats['database'] += 1
+        column = getattr(User, field)
+        return not db.session.query(User.id).filter(db.func.lower(column) == value).first()
+
+
+def user_values(user):
+    return {field: normalize(getattr(user, field)) for field in FIELDS}
@@ -0,0 +1,169 @@
+"""Chunked online backfills.
+
+A whole-table UPDATE keeps every row it touched locked until it commits,
+so on a production-sized table it stalls writers for minutes. `Backfill`
+walks the table's primary key in ranges of `batch_size` keys instead and
+commits each range in its own short transaction, together with a
+checkpoint row (BackfillCheckpoint), sleeping `sleep` seconds between
+ranges so live traffic and replicas keep up. A killed run resumes after
+the last committed range. Rows inserted after a run starts lie beyond its
+end key; new code paths are expected to write them correctly already.
+
+From an Alembic revision, `run_in_migration(op, backfill)` commits the
+revision's DDL first and falls back to one plain UPDATE in --sql mode.
+Checkpoint names are fixed, so each direction of a revision calls
+`forget_in_migration` for the other direction's jobs; otherwise a later
+re-upgrade would find its job finished and skip it. `flask backfill` runs
+ad-hoc jobs. Progress (rows/s, ETA) is logged every
+BACKFILL_REPORT_SECONDS.
+"""
+import logging
+import time
+from datetime import datetime
+import sqlalchemy as sa
+from flask import current_app, has_app_context
+from app.models.backfill import BackfillCheckpoint
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {'BACKFILL_BATCH_SIZE': 1000, 'BACKFILL_SLEEP': 0.05, 'BACKFILL_REPORT_SECONDS': 10.0}
+
+
+def _setting(name):
+    if has_app_context():
+        return current_app.config.get(name, DEFAULTS[name])
+    return DEFAULTS[name]
+
+
+class Backfill:
+    """One resumable job over `table`, keyed by its integer primary key `key`.
+
+    Either set `values` ({column: value or expression}) on rows matching
+    `where`, or pass `batch(connection, low, high)` to do custom work for
+    keys in (low, high] and return the number of rows it changed. Keep
+    `where` true only for rows still to do, so a batch is safe to repeat.
+    """
+
+    def __init__(self, name, table, values=None, where=None, batch=None, key='id',
+                 batch_size=None, sleep=None, report_every=None):
+        if (values is None) == (batch is None):
+            raise ValueError("Give a backfill either `values` or `batch`")
+        self.name = name
+        self.table = table
+        self.key = table.c[key]
+        self.values = values
+        self.where = where
+        self.batch = batch
+        self.batch_size = batch_size or _setting('BACKFILL_BATCH_SIZE')
+        self.sleep = _setting('BACKFILL_SLEEP') if sleep is None else sleep
+        self.report_every = report_every or _setting('BACKFILL_REPORT_SECONDS')
+
+    def statement(self, low=None, high=None):
+        """The UPDATE for keys in (low, high]; the whole table without bounds"""
+        clauses = []
+        if low is not None:
+            clauses += [self.key > low, self.key <= high]
+        if self.where is not None:
+            clauses.append(self.where)
+        return sa.update(self.table).where(*clauses).values(self.values)
+
+    def _run_batch(self, conn, low, high):
+        if self.batch is not None:
+            return self.batch(conn, low, high) or 0
+        return conn.execute(self.statement(low, high)).rowcount
+
+    def _checkpoint(self, conn, **values):
+        checkpoints = BackfillCheckpoint.__table__
+        values['updated_at'] = datetime.utcnow()
+        updated = conn.execute(checkpoints.update().where(checkpoints.c.name == self.name).values(**values))
+        if updated.rowcount == 0:
+            conn.execute(checkpoints.insert().values(name=self.name, started_at=values['updated_at'], **values))
+
+    def run(self, engine, restart=False, progress=None):
+        """Process every range not done yet; returns counts and throughput.
+
+        `progress(stats)` is called after each committed batch.
+        """
+        checkpoints = BackfillCheckpoint.__table__
+        checkpoints.create(engine, checkfirst=True)
+        with engine.begin() as conn:
+            if restart:
+                conn.execute(checkpoints.delete().where(checkpoints.c.name == self.name))
+            saved = conn.execute(sa.select(checkpoints).where(checkpoints.c.name == self.name)).first()
+            if saved is None:
+                lowest, highest = conn.execute(sa.select(sa.func.min(self.key), sa.func.max(self.key))).one()
+                start, end, done_before, finished = (lowest or 1) - 1, highest or 0, 0, False
+                self._checkpoint(conn, last_key=start, end_key=end, rows=0)
+            else:
+                start, end, done_before = saved.last_key, saved.end_key, saved.rows
+                finished = saved.finished_at is not None
+
+        stats = {'name': self.name, 'rows': 0, 'batches': 0, 'resumed_from': start, 'last_key': start,
+                 'end_key': end, 'seconds': 0.0, 'rows_per_second': 0.0, 'finished': finished}
+        if finished:
+            logger.info("Backfill %s already finished (%d rows)", self.name, done_before)
+            return stats
+        if saved is not None:
+            logger.info("Backfill %s resuming after key %d of %d", self.name, start, end)
+        started = reported = time.perf_counter()
+        low = start
+        while low < end:
+            high = min(low + self.batch_size, end)
+            with engine.begin() as conn:
+                changed = self._run_batch(conn, low, high)
+                stats['rows'] += changed
+                self._checkpoint(conn, last_key=high, rows=done_before + stats['rows'],
+                                 finished_at=datetime.utcnow() if high >= end else None)
+            stats['batches'] += 1
+            stats['last_key'] = low = high
+            elapsed = time.perf_counter() - started
+            stats['seconds'] = round(elapsed, 2)
+            stats['rows_per_second'] = round(stats['rows'] / elapsed, 1) if elapsed else 0.0
+            if progress:
+                progress(stats)
+            if time.perf_counter() - reported >= self.report_every:
+                reported = time.perf_counter()
+                keys_per_second = (low - start) / elapsed
+                logger.info("Backfill %s: key %d of %d, %d rows (%.0f rows/s), ~%.0fs left", self.name, low, end,
+                            stats['rows'], stats['rows_per_second'], (end - low) / keys_per_second)
+            if changed and self.sleep and low < end:
+                time.sleep(self.sleep)
+        if start >= end:
+            with engine.begin() as conn:
+                self._checkpoint(conn, finished_at=datetime.utcnow())
+
+        stats['finished'] = True
+        logger.info("Backfill %s done: %d rows in %d batches, %.1fs (%.0f rows/s)", self.name, stats['rows'],
+                    stats['batches'], stats['seconds'], stats['rows_per_second'])
+        return stats
+
+
+def run_in_migration(op, backfill):
+    """Run `backfill` from an Alembic revision's upgrade()/downgrade().
+
+    Commits the revision's pending DDL first, so the batches (each on its
+    own connection) neither wait on the revision's locks nor get rolled
+    into its transaction. Offline (--sql) it emits one plain UPDATE.
+    """
+    context = op.get_context()
+    if context.as_sql:
+        if backfill.batch is not None:
+            raise RuntimeError(f"Backfill {backfill.name} needs a live database; it can't be rendered as SQL")
+        op.execute(backfill.statement())
+        return None
+    with context.autocommit_block():
+        return backfill.run(op.get_bind().engine)
+
+
+def forget_in_migration(op, *names):
+    """Delete the named backfills' checkpoints so they run again next time.
+
+    Call it from upgrade() with the names downgrade() uses, and the other
+    way round. Offline (--sql) nothing is checkpointed, so nothing is
+    emitted.
+    """
+    if op.get_context().as_sql:
+        return
+    checkpoints = BackfillCheckpoint.__table__
+    if sa.inspect(op.get_bind()).has_table(checkpoints.name):
+        op.execute(checkpoints.delete().where(checkpoints.c.name.in_(names)))
@@ -0,0 +1,67 @@
+"""gzip for HTML and JSON responses.
+
+Negotiated per request from Accept-Encoding. Buffered responses are
+compressed in one go once they pass COMPRESS_MIN_SIZE; streamed responses
+are compressed chunk by chunk with a sync flush after each one, so the
+client can start rendering as soon as the first chunk arrives.
+"""
+import gzip
+import zlib
+from flask import current_app, request
+
+
+def gzip_stream(chunks, level=6):
+    """Gzip an iterable of str/bytes chunks, flushing after every chunk"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+    try:
+        for chunk in chunks:
+            data = compressor.compress(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+            data += compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        yield compressor.flush()
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+class Compressor:
+
+    def __init__(self, app=None):
+        self.mimetypes = set()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('COMPRESS_ENABLED', True)
+        app.config.setdefault('COMPRESS_LEVEL', 6)
+        app.config.setdefault('COMPRESS_MIN_SIZE', 500)
+        app.config.setdefault('COMPRESS_MIMETYPES', ['text/html', 'application/json'])
+        self.mimetypes = set(app.config['COMPRESS_MIMETYPES'])
+        app.after_request(self._after_request)
+        app.extensions['compress'] = self
+
+    def _wants(self, response):
+        return (current_app.config['COMPRESS_ENABLED']
+                and response.mimetype in self.mimetypes
+                and 200 <= response.status_code < 300 and response.status_code != 204
+                and not response.direct_passthrough
+                and 'Content-Encoding' not in response.headers
+                and 'gzip' in request.headers.get('Accept-Encoding', '').lower())
+
+    def _after_request(self, response):
+        response.vary.add('Accept-Encoding')
+        if not self._wants(response):
+            return response
+        level = current_app.config['COMPRESS_LEVEL']
+        if response.is_streamed:
+            response.response = gzip_stream(response.response, level)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < current_app.config['COMPRESS_MIN_SIZE']:
+                return response
+            response.set_data(gzip.compress(data, compresslevel=level))
+        response.headers['Content-Encoding'] = 'gzip'
+        return response
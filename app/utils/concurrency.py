@@ -0,0 +1,22 @@
+import random
+import time
+from sqlalchemy.orm.exc import StaleDataError
+from app import db
+
+
+def retry_on_conflict(fn, attempts=5, backoff=0.01):
+    """Run `fn` and retry it when an optimistic-lock check fails.
+
+    `fn` should (re)read what it needs from the session each time it runs:
+    after a conflict the session is rolled back, which expires loaded
+    objects so the next attempt sees the winning writer's version.
+    """
+    for attempt in range(attempts):
+        try:
+            return fn()
+        except StaleDataError:
+            db.session.rollback()
+            if attempt == attempts - 1:
+                raise
+            # Jittered exponential backoff keeps hot orders from thundering
+            time.sleep(backoff * (2 ** attempt) * random.random())
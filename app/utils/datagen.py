@@ -0,0 +1,447 @@
+"""Synthetic data for performance testing.
+
+`generate` fills the database with customers whose addresses sit around
+real pincode centroids, stations with fuels, stock and delivery partners,
+and orders with their tracking rows and payments. A few knobs shape it:
+
+  * cities: pincodes are drawn uniformly, scaled by `city_weights`
+    (lowercase city or state -> multiplier),
+  * orders per customer: lognormal activity with sigma `order_skew`, so
+    most customers order a handful of times and a few order constantly,
+  * order times: spread over the last `days` with a daytime hourly profile,
+  * status and payment mode: weighted mixes for orders already due.
+
+Reference tables (stations, fuels, partners) are written first from this
+process. Customers are then built in chunks on a process pool: each chunk
+is drawn with NumPy and written with Core executemany inserts in a single
+transaction. Primary keys of users, addresses and orders are allotted up
+front, so workers never read ids back and share nothing but the database.
+Orders go to the shard their customer's city routes to.
+
+Every generated customer, owner and partner logs in with GENERATED_PASSWORD.
+"""
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import numpy as np
+import sqlalchemy as sa
+from werkzeug.security import generate_password_hash
+from app import db, shards
+from app.models.address import Address
+from app.models.delivery import DeliveryPartner
+from app.models.fuel import FuelType
+from app.models.fuel_station import FuelStation
+from app.models.inventory import FuelStock
+from app.models.order import Order, OrderStatus, OrderTracking
+from app.models.payment import Payment, PaymentStatus
+from app.models.user import User
+from app.utils.locations import LocationIndex
+from app.utils.sharding import bind_key
+
+logger = logging.getLogger(__name__)
+
+GENERATED_PASSWORD = 'password'
+
+FUELS = (('Petrol', 106.3), ('Diesel', 92.8), ('CNG', 76.6))
+SLOTS = ['07:00-09:00', '09:00-11:00', '11:00-13:00', '13:00-15:00', '15:00-17:00', '17:00-19:00', '19:00-21:00']
+QUANTITIES = np.array([10.0, 20.0, 30.0, 50.0, 100.0, 200.0, 500.0])
+QUANTITY_WEIGHTS = np.array([0.12, 0.25, 0.18, 0.22, 0.13, 0.07, 0.03])
+# Share of orders placed in each hour of the day
+HOURLY = np.array([1, 0, 0, 0, 0, 1, 3, 6, 8, 9, 8, 7, 7, 6, 6, 6, 7, 8, 8, 7, 5, 4, 2, 1], dtype=float)
+DELIVERY_FEE = 50.0
+
+DEFAULT_STATUS_MIX = {'delivered': 0.92, 'cancelled': 0.08}  # orders whose delivery day has passed
+DEFAULT_PAYMENT_MIX = {'cod': 0.55, 'online': 0.45}
+TODAY_MIX = {'pending': 0.1, 'confirmed': 0.3, 'preparing': 0.3, 'out_for_delivery': 0.3}
+UPCOMING_MIX = {'pending': 0.4, 'confirmed': 0.6}
+
+# Tracking rows written on the way to each status (placing an order writes none)
+PATHS = {
+    OrderStatus.PENDING: [],
+    OrderStatus.CONFIRMED: [OrderStatus.CONFIRMED],
+    OrderStatus.PREPARING: [OrderStatus.CONFIRMED, OrderStatus.PREPARING],
+    OrderStatus.OUT_FOR_DELIVERY: [OrderStatus.CONFIRMED, OrderStatus.PREPARING, OrderStatus.OUT_FOR_DELIVERY],
+    OrderStatus.DELIVERED: [OrderStatus.CONFIRMED, OrderStatus.PREPARING, OrderStatus.OUT_FOR_DELIVERY,
+                            OrderStatus.DELIVERED],
+    OrderStatus.CANCELLED: [OrderStatus.CANCELLED],
+}
+# Minutes relative to the slot start at which each step happens
+STEP_MINUTES = {OrderStatus.PREPARING: -60, OrderStatus.OUT_FOR_DELIVERY: -20, OrderStatus.DELIVERED: 30}
+
+ORDER_STATUSES = list(OrderStatus)
+STATUS_CODES = {status.value: code for code, status in enumerate(ORDER_STATUSES)}
+CONFIRMED = STATUS_CODES['confirmed']
+PAYMENT_CODES = {'cod': 0, 'online': 1}
+
+
+def _recipe(status):
+    """Everything the row builder needs per status, so its loop only does lookups"""
+    steps, before = [], OrderStatus.PENDING
+    for step in PATHS[status]:
+        steps.append((STATUS_CODES[step.value], step.name, f"Order status changed from {before.value} to {step.value}"))
+        before = step
+    cancelled = status is OrderStatus.CANCELLED
+    cod = None if cancelled else (PaymentStatus.COMPLETED if status is OrderStatus.DELIVERED else PaymentStatus.PENDING)
+    online = PaymentStatus.FAILED if cancelled else PaymentStatus.COMPLETED
+    return (status.name, steps, STATUS_CODES[before.value],
+            status in (OrderStatus.OUT_FOR_DELIVERY, OrderStatus.DELIVERED), status is OrderStatus.DELIVERED,
+            cod.name if cod else None, online.name)
+
+
+RECIPES = [_recipe(status) for status in ORDER_STATUSES]
+
+
+def parse_mix(text, allowed):
+    """'delivered=0.9,cancelled=0.1' -> normalised {name: share}"""
+    mix = {}
+    for item in (text or '').split(','):
+        if not item.strip():
+            continue
+        name, _, share = item.partition('=')
+        name = name.strip().lower()
+        if name not in allowed:
+            raise ValueError(f"Unknown mix entry '{name}' (expected one of {', '.join(allowed)})")
+        mix[name] = float(share)
+    total = sum(mix.values())
+    if total <= 0:
+        raise ValueError("A mix needs at least one positive share")
+    return {name: share / total for name, share in mix.items()}
+
+
+def _draw(rng, mix, size, codes):
+    """`size` draws from a {name: share} mix, as codes[name]"""
+    names = list(mix)
+    return np.array([codes[n] for n in names])[rng.choice(len(names), size=size, p=[mix[n] for n in names])]
+
+
+def _stamps(times):
+    """datetime64 array -> DATETIME strings as SQLAlchemy writes them"""
+    return np.char.replace(np.datetime_as_string(times.astype('datetime64[us]')), 'T', ' ').tolist()
+
+
+def _engine(url):
+    if url.startswith('sqlite'):
+        # Workers queue for SQLite's single writer instead of failing
+        return sa.create_engine(url, connect_args={'timeout': 600})
+    return sa.create_engine(url)
+
+
+# --- worker side ---
+
+_plan = None
+_engines = None
+
+
+def _init_worker(plan):
+    global _plan, _engines
+    _plan = plan
+    _engines = {shard: _engine(url) for shard, url in plan['urls'].items()}
+
+
+def _build_chunk(task):
+    """Rows for one chunk of customers: {table: rows}, orders split by shard"""
+    index, user_start, n_users, address_start, n_addresses, order_start, n_orders = task
+    plan = _plan
+    rng = np.random.default_rng([plan['seed'], index])
+    now = plan['now']
+    today = np.datetime64(now.date(), 'D')
+    stamp = _stamps(np.array([now], dtype='datetime64[s]'))[0]
+
+    # Customers and their addresses
+    user_ids = np.arange(user_start, user_start + n_users)
+    home = rng.choice(len(plan['pincodes']), size=n_users, p=plan['pincode_weights'])
+    extra = rng.multinomial(n_addresses - n_users, np.full(n_users, 1 / n_users)) if n_addresses > n_users \
+        else np.zeros(n_users, dtype=int)
+    address_counts = 1 + extra
+    address_first = address_start + np.concatenate(([0], np.cumsum(address_counts)[:-1]))
+    address_user = np.repeat(np.arange(n_users), address_counts)
+    address_pin = home[address_user]
+    lat = plan['pincode_lat'][address_pin] + rng.normal(0, 0.015, len(address_user))
+    lon = plan['pincode_lon'][address_pin] + rng.normal(0, 0.015, len(address_user))
+    # Each address orders from its nearest station (equirectangular distance is plenty here)
+    station_lat, station_lon = plan['station_lat'], plan['station_lon']
+    nearest = np.empty(len(address_user), dtype=int)
+    for i in range(0, len(address_user), 2000):
+        dlat = lat[i:i + 2000, None] - station_lat[None, :]
+        dlon = (lon[i:i + 2000, None] - station_lon[None, :]) * np.cos(np.radians(lat[i:i + 2000, None]))
+        nearest[i:i + 2000] = np.argmin(dlat * dlat + dlon * dlon, axis=1)
+
+    pins, hash_ = plan['pincodes'], plan['password_hash']
+    phones = rng.integers(6000000000, 9999999999, size=n_users).tolist()
+    users = [{
+        'id': uid, 'username': f'syn{uid}', 'email': f'syn{uid}@example.com', 'phone': str(phone),
+        'password_hash': hash_, 'role': 'customer', 'is_verified': True, 'is_active': True,
+        'home_shard': plan['pincode_shard'][pin], 'created_at': stamp, 'updated_at': stamp,
+    } for uid, phone, pin in zip(user_ids.tolist(), phones, home.tolist())]
+    labels = ('Home', 'Office', 'Other')
+    addresses = []
+    for n, (u, pin, a_lat, a_lon) in enumerate(zip(address_user.tolist(), address_pin.tolist(),
+                                                   lat.tolist(), lon.tolist())):
+        loc = pins[pin]
+        aid = address_start + n
+        first = aid == address_first[u]
+        addresses.append({
+            'id': aid, 'user_id': user_start + u, 'label': labels[0] if first else labels[1 + aid % 2],
+            'name': f'Customer {user_start + u}', 'phone': users[u]['phone'],
+            'address_line1': f'{aid % 400 + 1}, Sector {aid % 37 + 1}', 'address_line2': None,
+            'city': loc.city, 'state': loc.state, 'pincode': loc.pincode, 'landmark': None,
+            'is_default': bool(first), 'latitude': round(a_lat, 6), 'longitude': round(a_lon, 6),
+            'created_at': stamp, 'updated_at': stamp,
+        })
+
+    # Orders: lognormal activity decides how many each customer places
+    activity = rng.lognormal(0.0, plan['order_skew'], n_users)
+    per_user = rng.multinomial(n_orders, activity / activity.sum())
+    order_user = np.repeat(np.arange(n_users), per_user)
+    order_address = address_first[order_user] + (rng.random(n_orders) * address_counts[order_user]).astype(int)
+    station = nearest[order_address - address_start]
+    fuel_pick = (rng.random(n_orders) * plan['station_fuel_count'][station]).astype(int)
+    fuel_id = plan['station_fuels'][station, fuel_pick]
+    price = plan['fuel_price'][station, fuel_pick]
+    liters = QUANTITIES[rng.choice(len(QUANTITIES), size=n_orders, p=QUANTITY_WEIGHTS)]
+    fuel_cost = np.round(liters * price, 2)
+    partner_pick = (rng.random(n_orders) * np.maximum(plan['station_partner_count'][station], 1)).astype(int)
+    partner = plan['station_partners'][station, partner_pick]
+
+    days_ago = rng.integers(0, plan['days'], size=n_orders)
+    seconds = rng.choice(24, size=n_orders, p=HOURLY / HOURLY.sum()) * 3600 + rng.integers(0, 3600, n_orders)
+    created = (today - days_ago.astype('timedelta64[D]')).astype('datetime64[s]') + seconds.astype('timedelta64[s]')
+    created = np.where(created > np.datetime64(now, 's'), created - np.timedelta64(1, 'D'), created)
+    delivery_day = created.astype('datetime64[D]') + rng.choice(3, size=n_orders, p=[0.5, 0.35, 0.15]) + 1
+    slot = rng.integers(0, len(SLOTS), size=n_orders)
+    slot_start = delivery_day.astype('datetime64[s]') + (7 + 2 * slot).astype('timedelta64[h]')
+
+    status = np.empty(n_orders, dtype=np.int64)
+    due, due_today = delivery_day < today, delivery_day == today
+    upcoming = ~(due | due_today)
+    status[due] = _draw(rng, plan['status_mix'], int(due.sum()), STATUS_CODES)
+    status[due_today] = _draw(rng, TODAY_MIX, int(due_today.sum()), STATUS_CODES)
+    status[upcoming] = _draw(rng, UPCOMING_MIX, int(upcoming.sum()), STATUS_CODES)
+    online = _draw(rng, plan['payment_mix'], n_orders, PAYMENT_CODES).astype(bool)
+
+    # When each step happened: a few minutes after placing, then relative to the slot
+    minute = np.timedelta64(60, 's')
+    first, later = rng.integers(2, 30, n_orders) * minute, rng.integers(2, 30, n_orders) * minute
+    at = {OrderStatus.PENDING: created, OrderStatus.CONFIRMED: created + first, OrderStatus.CANCELLED: created + first}
+    previous = at[OrderStatus.CONFIRMED]
+    for step in (OrderStatus.PREPARING, OrderStatus.OUT_FOR_DELIVERY, OrderStatus.DELIVERED):
+        previous = at[step] = np.maximum(previous + minute, slot_start + STEP_MINUTES[step] * minute + later)
+    stamps = [_stamps(at[status]) for status in ORDER_STATUSES]
+    created_s, day_s = stamps[STATUS_CODES['pending']], delivery_day.astype(str).tolist()
+    preparing_s, confirmed_s = stamps[STATUS_CODES['preparing']], stamps[STATUS_CODES['confirmed']]
+
+    rows = {}
+    shard_of = [u['home_shard'] for u in users]
+    for n, (u, aid, fid, ppl, qty, cost, code, slot_i, paid_online, pid) in enumerate(zip(
+            order_user.tolist(), order_address.tolist(), fuel_id.tolist(), price.tolist(), liters.tolist(),
+            fuel_cost.tolist(), status.tolist(), slot.tolist(), online.tolist(), partner.tolist())):
+        oid = order_start + n
+        name, steps, last_code, assignable, delivered, cod_status, online_status = RECIPES[code]
+        last = stamps[last_code][n]
+        assigned = assignable and pid > 0
+        total = cost + DELIVERY_FEE
+        target = rows.setdefault(shard_of[u], {'orders': [], 'tracking': [], 'payments': []})
+        target['orders'].append({
+            'id': oid, 'order_number': f'SYN{oid:011d}', 'user_id': user_start + u, 'fuel_type_id': fid,
+            'quantity_liters': qty, 'price_per_liter': ppl, 'total_fuel_cost': cost,
+            'delivery_address_id': aid, 'delivery_date': day_s[n], 'delivery_time_slot': SLOTS[slot_i],
+            'delivery_fee': DELIVERY_FEE, 'total_amount': total, 'status': name,
+            'status_updated_at': last, 'delivery_partner_id': pid if assigned else None,
+            'assigned_at': preparing_s[n] if assigned else None, 'special_instructions': None,
+            'created_at': created_s[n], 'confirmed_at': confirmed_s[n] if steps and steps[0][0] == CONFIRMED else None,
+            'delivered_at': last if delivered else None, 'version': 1 + len(steps),
+        })
+        for step_code, step_name, message in steps:
+            target['tracking'].append({'order_id': oid, 'status': step_name, 'created_at': stamps[step_code][n],
+                                       'message': message})
+        pay_status = online_status if paid_online else cod_status
+        if pay_status is None:
+            continue
+        target['payments'].append({
+            'order_id': oid, 'amount': total, 'payment_mode': 'Online' if paid_online else 'COD',
+            'status': pay_status, 'transaction_id': f'SYNTXN{oid}' if paid_online else None,
+            'failure_reason': 'Order cancelled' if pay_status == 'FAILED' else None,
+            'created_at': created_s[n], 'updated_at': last, 'version': 1,
+        })
+    return users, addresses, rows
+
+
+def _insert(conn, table, rows, size):
+    # A bare table() has untyped columns: values go to the driver as prepared
+    # above, skipping a bind processor call per value
+    if not rows:
+        return
+    bare = sa.table(table.name, *(sa.column(key) for key in rows[0]))
+    for i in range(0, len(rows), size):
+        conn.execute(bare.insert(), rows[i:i + size])
+
+
+def _load_chunk(task):
+    """Process-pool task: build one chunk and write it; returns (users, addresses, orders, tracking, payments)"""
+    users, addresses, rows = _build_chunk(task)
+    size = _plan['insert_size']
+    with _engines[None].begin() as conn:
+        _insert(conn, User.__table__, users, size)
+        _insert(conn, Address.__table__, addresses, size)
+    for shard, shard_rows in rows.items():
+        with _engines[shard].begin() as conn:
+            _insert(conn, Order.__table__, shard_rows['orders'], size)
+            _insert(conn, OrderTracking.__table__, shard_rows['tracking'], size)
+            _insert(conn, Payment.__table__, shard_rows['payments'], size)
+    return (len(users), len(addresses), *(sum(len(r[k]) for r in rows.values())
+                                          for k in ('orders', 'tracking', 'payments')))
+
+
+# --- coordinator ---
+
+def _next_id(column):
+    return (db.session.query(sa.func.max(column)).scalar() or 0) + 1
+
+
+def _pincode_table(city_weights):
+    locations = sorted(LocationIndex().by_pincode.values())
+    weights = np.array([city_weights.get(loc.city.lower(), city_weights.get(loc.state.lower(), 1.0))
+                        for loc in locations], dtype=float)
+    if weights.sum() <= 0:
+        raise ValueError("City weights leave no pincode to draw from")
+    return locations, weights / weights.sum()
+
+
+def _reference_data(rng, locations, weights, n_stations, partners_per_station, password_hash, now):
+    """Owners, stations, fuels with stock, and delivery partners; returns per-station lookup arrays"""
+    user_id, station_id, fuel_id = _next_id(User.id), _next_id(FuelStation.id), _next_id(FuelType.id)
+    owners, stations, fuels, stock, partner_users, partners = [], [], [], [], [], []
+    station_fuels = np.zeros((n_stations, len(FUELS)), dtype=np.int64)
+    fuel_price = np.zeros((n_stations, len(FUELS)))
+    fuel_count = np.zeros(n_stations, dtype=np.int64)
+    station_partners = np.zeros((n_stations, max(partners_per_station, 1)), dtype=np.int64)
+    lat = np.zeros(n_stations)
+    lon = np.zeros(n_stations)
+    for s, pin in enumerate(rng.choice(len(locations), size=n_stations, p=weights).tolist()):
+        loc = locations[pin]
+        sid, owner_id = station_id + s, user_id
+        user_id += 1
+        lat[s], lon[s] = loc.latitude + rng.normal(0, 0.01), loc.longitude + rng.normal(0, 0.01)
+        owners.append({'id': owner_id, 'username': f'synowner{owner_id}', 'email': f'synowner{owner_id}@example.com',
+                       'phone': '9000000000', 'password_hash': password_hash, 'role': 'station_owner',
+                       'is_verified': True, 'is_active': True, 'created_at': now, 'updated_at': now})
+        stations.append({'id': sid, 'name': f'FuelExpress {loc.city} #{sid}', 'address': f'{loc.city}, {loc.state}',
+                         'latitude': round(lat[s], 6), 'longitude': round(lon[s], 6), 'service_radius_km': 15.0,
+                         'owner_id': owner_id, 'created_at': now})
+        kinds = FUELS if rng.random() < 0.4 else FUELS[:2]
+        for k, (kind, base) in enumerate(kinds):
+            price = round(base * rng.uniform(0.97, 1.03), 2)
+            fuels.append({'id': fuel_id, 'name': f'{kind} #{sid}', 'price_per_liter': price, 'is_available': True,
+                          'description': None, 'station_id': sid, 'created_at': now, 'updated_at': now})
+            stock.append({'fuel_type_id': fuel_id, 'station_id': sid, 'available_liters': 1e9, 'updated_at': now})
+            station_fuels[s, k], fuel_price[s, k] = fuel_id, price
+            fuel_id += 1
+        fuel_count[s] = len(kinds)
+        for p in range(partners_per_station):
+            partner_users.append({'id': user_id, 'username': f'synrider{user_id}',
+                                  'email': f'synrider{user_id}@example.com', 'phone': '9000000000',
+                                  'password_hash': password_hash, 'role': 'delivery_partner',
+                                  'is_verified': True, 'is_active': True, 'created_at': now, 'updated_at': now})
+            partners.append({'user_id': user_id, 'station_id': sid, 'vehicle_capacity_liters': 1000.0,
+                             'max_stops_per_slot': 4, 'is_active': True, 'latitude': round(lat[s], 6),
+                             'longitude': round(lon[s], 6), 'created_at': now})
+            station_partners[s, p] = user_id
+            user_id += 1
+
+    for table, rows in ((User.__table__, owners + partner_users), (FuelStation.__table__, stations),
+                        (FuelType.__table__, fuels), (FuelStock.__table__, stock),
+                        (DeliveryPartner.__table__, partners)):
+        if rows:
+            db.session.execute(table.insert(), rows)
+    db.session.commit()
+    return {
+        'station_lat': lat, 'station_lon': lon, 'station_fuels': station_fuels, 'fuel_price': fuel_price,
+        'station_fuel_count': fuel_count, 'station_partners': station_partners,
+        'station_partner_count': np.full(n_stations, partners_per_station, dtype=np.int64),
+    }
+
+
+def _reset_sequences(engine, tables):
+    """Explicit ids don't move PostgreSQL sequences; catch them up"""
+    if engine.dialect.name != 'postgresql':
+        return
+    with engine.begin() as conn:
+        for table in tables:
+            conn.execute(sa.text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                                 f"(SELECT coalesce(max(id), 1) FROM {table}))"))
+
+
+def generate(users=100000, orders=1000000, stations=200, partners_per_station=3, addresses_per_user=1.3,
+             days=365, order_skew=1.0, status_mix=None, payment_mix=None, city_weights=None,
+             workers=None, chunk_size=5000, insert_size=10000, seed=1, progress=None):
+    """Load a synthetic dataset; returns row counts and timing.
+
+    `progress(done_users, totals)` is called after each chunk lands.
+    """
+    if users < 1 or stations < 1 or addresses_per_user < 1:
+        raise ValueError("Need at least one user, one station and one address per user")
+    started = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    password_hash = generate_password_hash(GENERATED_PASSWORD)
+    locations, weights = _pincode_table({k.lower(): v for k, v in (city_weights or {}).items()})
+
+    plan = {
+        'seed': seed, 'now': now, 'days': days, 'order_skew': order_skew, 'insert_size': insert_size,
+        'status_mix': status_mix or DEFAULT_STATUS_MIX, 'payment_mix': payment_mix or DEFAULT_PAYMENT_MIX,
+        'password_hash': password_hash, 'pincodes': locations, 'pincode_weights': weights,
+        'pincode_lat': np.array([loc.latitude for loc in locations]),
+        'pincode_lon': np.array([loc.longitude for loc in locations]),
+        'pincode_shard': [shards.route(loc.city, loc.state) for loc in locations],
+        'urls': {None: db.engine.url.render_as_string(hide_password=False),
+                 **{name: db.engines[bind_key(name)].url.render_as_string(hide_password=False)
+                    for name in shards.names}},
+    }
+    plan.update(_reference_data(rng, locations, weights, stations, partners_per_station, password_hash, now))
+
+    # Allot id ranges per chunk up front; orders are numbered across every shard
+    user_start, address_start = _next_id(User.id), _next_id(Address.id)
+    order_start = max(shards.fan_out(_next_id, Order.id).values())
+    tasks = []
+    for index, first in enumerate(range(0, users, chunk_size)):
+        last = min(users, first + chunk_size)
+        a0, a1 = int(addresses_per_user * first), int(addresses_per_user * last)
+        o0, o1 = orders * first // users, orders * last // users
+        tasks.append((index, user_start + first, last - first, address_start + a0, a1 - a0, order_start + o0, o1 - o0))
+    reference = time.perf_counter() - started
+
+    # Forked workers must not share the parent's pooled connections
+    db.session.remove()
+    for engine in db.engines.values():
+        engine.dispose()
+
+    totals = dict.fromkeys(('users', 'addresses', 'orders', 'tracking', 'payments'), 0)
+    workers = workers or os.cpu_count()
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(plan,))
+        results = pool.map(_load_chunk, tasks)
+    else:
+        pool = None
+        _init_worker(plan)
+        results = map(_load_chunk, tasks)
+    try:
+        for counts in results:
+            for key, count in zip(totals, counts):
+                totals[key] += count
+            if progress:
+                progress(totals['users'], totals)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        for engine in (_engines or {}).values():
+            engine.dispose()
+
+    _reset_sequences(db.engine, ('users', 'fuel_stations', 'fuel_types', 'addresses'))
+    for name in [None] + shards.names:
+        _reset_sequences(db.engines[bind_key(name)] if name else db.engine, ('orders',))
+    elapsed = time.perf_counter() - started
+    logger.info("Generated %d users, %d orders in %.1fs", totals['users'], totals['orders'], elapsed)
+    return {**totals, 'stations': stations, 'partners': stations * partners_per_station,
+            'reference_seconds': round(reference, 2), 'seconds': round(elapsed, 2)}
@@ -0,0 +1,289 @@
+"""Delivery ETAs from a partner's live position and remaining stops.
+
+Travel estimates are great-circle distance times a road factor, turned into
+minutes by a speed model (a base speed with optional per-hour overrides).
+Distances are cached in an LRU keyed by pairs of grid cells, so every
+address in the same ~500 m cell shares one entry with its station or the
+previous stop.
+
+Each partner's route for the day (their open stops in slot order) is kept
+as a plan of precomputed legs. A position report only changes the leg to
+the first stop, which is worked out at query time; a delivered or cancelled
+stop is dropped from the plan in place, rejoining its neighbours with one
+new leg; a reassignment rebuilds the plan with one query. Answering an ETA
+is a few dict lookups and a walk over the stops ahead.
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, time as dtime, timedelta
+from sqlalchemy import event, select
+from sqlalchemy.orm import object_session
+from app import db
+from app.models.address import Address
+from app.models.delivery import DeliveryPartner
+from app.models.fuel import FuelType
+from app.models.fuel_station import FuelStation
+from app.models.order import Order, OrderStatus, OrderTracking
+from app.utils.locations import haversine_km
+
+CLOSED = (OrderStatus.DELIVERED, OrderStatus.CANCELLED)
+
+
+def slot_start(delivery_date, slot):
+    """Start of a "HH:MM" or "HH:MM-HH:MM" slot on its date; midnight if unparseable"""
+    try:
+        return datetime.combine(delivery_date, datetime.strptime((slot or '')[:5], '%H:%M').time())
+    except ValueError:
+        return datetime.combine(delivery_date, dtime())
+
+
+class SpeedModel:
+    """Minutes to cover a straight-line distance, with slower rush hours"""
+
+    def __init__(self, speed_kmh=25.0, road_factor=1.3, hourly=None):
+        self.speed_kmh = speed_kmh
+        self.road_factor = road_factor
+        self.hourly = {int(hour): float(kmh) for hour, kmh in (hourly or {}).items()}
+
+    def minutes(self, km, at=None):
+        """Drive time for `km` leaving at `at`, switching speed at each hour boundary"""
+        km = km * self.road_factor
+        if at is None or not self.hourly:
+            return km / self.speed_kmh * 60.0
+        # Integrating over the hours keeps a later departure from ever arriving earlier
+        elapsed = 0.0
+        into_hour = at.minute + at.second / 60.0
+        hour = at.hour
+        while True:
+            speed = self.hourly.get(hour, self.speed_kmh)
+            reach = speed * (60.0 - into_hour) / 60.0
+            if km <= reach:
+                return elapsed + km / speed * 60.0
+            km -= reach
+            elapsed += 60.0 - into_hour
+            into_hour = 0.0
+            hour = (hour + 1) % 24
+
+
+class TravelCache:
+    """LRU of great-circle km between grid cells"""
+
+    def __init__(self, grid_degrees=0.005, size=50000):
+        self.grid = grid_degrees
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def cell(self, lat, lon):
+        return round(lat / self.grid), round(lon / self.grid)
+
+    def km(self, origin, destination):
+        key = (self.cell(*origin), self.cell(*destination))
+        with self._lock:
+            km = self._entries.get(key)
+            if km is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return km
+        (a_lat, a_lon), (b_lat, b_lon) = key
+        km = haversine_km(a_lat * self.grid, a_lon * self.grid, b_lat * self.grid, b_lon * self.grid)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = km
+            if len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        return km
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class _Plan:
+    """A partner's open stops for the day: [order_id, point, slot start], legs between them"""
+
+    def __init__(self, stops, legs, expires):
+        self.stops = stops
+        self.legs = legs  # legs[k]: km from stop k-1 to stop k; legs[0] is unused
+        self.expires = expires
+
+
+class EtaService:
+
+    def __init__(self, app=None):
+        self.app = None
+        self.speed = SpeedModel()
+        self.cache = TravelCache()
+        self._plans = {}
+        self._order_partner = {}
+        self._lock = threading.Lock()
+        self._listening = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('ETA_SPEED_KMH', 25.0)
+        app.config.setdefault('ETA_HOURLY_SPEED_KMH', {})
+        app.config.setdefault('ETA_ROAD_FACTOR', 1.3)
+        app.config.setdefault('ETA_STOP_MINUTES', 10.0)
+        app.config.setdefault('ETA_GRID_DEGREES', 0.005)
+        app.config.setdefault('ETA_CACHE_SIZE', 50000)
+        app.config.setdefault('ETA_PLAN_TTL', 60)
+        app.config.setdefault('ETA_FIX_MAX_AGE', 600)
+        self.speed = SpeedModel(app.config['ETA_SPEED_KMH'], app.config['ETA_ROAD_FACTOR'],
+                                app.config['ETA_HOURLY_SPEED_KMH'])
+        self.cache = TravelCache(app.config['ETA_GRID_DEGREES'], app.config['ETA_CACHE_SIZE'])
+        if not self._listening:
+            event.listen(OrderTracking, 'after_insert', self._stop_closed)
+            event.listen(db.session, 'after_commit', self._drop_closed)
+            event.listen(db.session, 'after_rollback', self._keep_closed)
+            event.listen(Order.delivery_partner_id, 'set', self._reassigned)
+            self._listening = True
+        self.app = app
+        app.extensions['eta'] = self
+
+    # --- plan maintenance ---
+
+    def invalidate(self, partner_ids=None):
+        """Drop cached routes (all of them by default); they rebuild on next use"""
+        with self._lock:
+            for partner_id in (list(self._plans) if partner_ids is None else partner_ids):
+                plan = self._plans.pop(partner_id, None)
+                for stop in plan.stops if plan else ():
+                    self._order_partner.pop(stop[0], None)
+
+    def _reassigned(self, target, value, oldvalue, initiator):
+        self.invalidate([pid for pid in (value, oldvalue) if isinstance(pid, int)])
+
+    def _stop_closed(self, mapper, connection, target):
+        # Only queued here: the stop leaves its plan once the status change is committed
+        session = object_session(target)
+        if target.status in CLOSED and session is not None:
+            session.info.setdefault('eta_closed', set()).add(target.order_id)
+
+    def _keep_closed(self, session):
+        session.info.pop('eta_closed', None)
+
+    def _drop_closed(self, session):
+        for order_id in session.info.pop('eta_closed', ()):
+            self.complete(order_id)
+
+    def complete(self, order_id):
+        """Remove a finished stop from its partner's plan, joining its neighbours"""
+        with self._lock:
+            partner_id = self._order_partner.pop(order_id, None)
+            plan = self._plans.get(partner_id)
+            if plan is None:
+                return
+            index = next((k for k, stop in enumerate(plan.stops) if stop[0] == order_id), None)
+            if index is None:
+                return
+            del plan.stops[index]
+            del plan.legs[index]
+            if 0 < index < len(plan.stops):
+                plan.legs[index] = self.cache.km(plan.stops[index - 1][1], plan.stops[index][1])
+
+    def _load_plan(self, partner_id, today):
+        rows = db.session.execute(
+            select(Order.id, Order.delivery_time_slot, Address.latitude, Address.longitude,
+                   FuelStation.latitude, FuelStation.longitude)
+            .join(Address, Order.delivery_address_id == Address.id)
+            .join(FuelType, Order.fuel_type_id == FuelType.id)
+            .join(FuelStation, FuelType.station_id == FuelStation.id)
+            .where(Order.delivery_partner_id == partner_id, Order.delivery_date == today,
+                   Order.status.notin_(CLOSED))
+            .order_by(Order.delivery_time_slot, Order.id)
+        ).all()
+        stops = []
+        for order_id, slot, lat, lon, station_lat, station_lon in rows:
+            point = (lat, lon) if lat is not None else (station_lat, station_lon)
+            if point[0] is not None:
+                stops.append([order_id, point, slot_start(today, slot)])
+        legs = [0.0] + [self.cache.km(a[1], b[1]) for a, b in zip(stops, stops[1:])]
+        plan = _Plan(stops, legs, time.monotonic() + self.app.config['ETA_PLAN_TTL'])
+        with self._lock:
+            self._plans[partner_id] = plan
+            for stop in stops:
+                self._order_partner[stop[0]] = partner_id
+        return plan
+
+    def plan(self, partner_id, today=None):
+        plan = self._plans.get(partner_id)
+        if plan is None or plan.expires < time.monotonic():
+            plan = self._load_plan(partner_id, today or date.today())
+        return plan
+
+    # --- queries ---
+
+    def _partner_position(self, partner_id):
+        from app import tracker
+        fix = tracker.latest(partner_id)
+        if fix and time.time() - fix[0] <= self.app.config['ETA_FIX_MAX_AGE']:
+            return fix[1], fix[2]
+        row = db.session.execute(
+            select(DeliveryPartner.latitude, DeliveryPartner.longitude, FuelStation.latitude, FuelStation.longitude)
+            .join(FuelStation, DeliveryPartner.station_id == FuelStation.id)
+            .where(DeliveryPartner.user_id == partner_id)
+        ).first()
+        if row is None:
+            return None
+        return (row[0], row[1]) if row[0] is not None else (row[2], row[3]) if row[2] is not None else None
+
+    def travel_minutes(self, origin, destination, at):
+        return self.speed.minutes(self.cache.km(origin, destination), at)
+
+    def for_order(self, order, now=None):
+        """{'eta', 'minutes', 'stops_ahead', 'source'} for an open order, else None.
+
+        'route' ETAs walk the partner's remaining stops from their latest
+        position; orders without a partner (or not on today's route) get
+        slot start plus the drive from their station.
+        """
+        if order.status in CLOSED:
+            return None
+        now = now or datetime.now()
+        today = now.date()
+        stop_minutes = self.app.config['ETA_STOP_MINUTES']
+
+        if order.delivery_partner_id and order.delivery_date == today:
+            plan = self.plan(order.delivery_partner_id, today)
+            with self._lock:
+                # complete() edits both lists in place; copy them as one consistent pair
+                stops, legs = list(plan.stops), list(plan.legs)
+            index = next((k for k, stop in enumerate(stops) if stop[0] == order.id), None)
+            position = self._partner_position(order.delivery_partner_id) if index is not None else None
+            if position is not None:
+                at = max(now + timedelta(minutes=self.travel_minutes(position, stops[0][1], now)), stops[0][2])
+                for k in range(1, index + 1):
+                    at += timedelta(minutes=stop_minutes + self.speed.minutes(legs[k], at))
+                    at = max(at, stops[k][2])
+                return self._result(at, now, index, 'route')
+
+        station = order.fuel_type.station if order.fuel_type else None
+        address = order.delivery_address
+        if station is None or station.latitude is None:
+            return None
+        destination = (address.latitude, address.longitude) \
+            if address is not None and address.latitude is not None else (station.latitude, station.longitude)
+        depart = max(now, slot_start(order.delivery_date, order.delivery_time_slot))
+        at = depart + timedelta(minutes=self.travel_minutes((station.latitude, station.longitude), destination, depart))
+        return self._result(at, now, None, 'station')
+
+    @staticmethod
+    def _result(at, now, stops_ahead, source):
+        return {
+            'eta': at.replace(second=0, microsecond=0),
+            'minutes': max(0, int((at - now).total_seconds() // 60)),
+            'stops_ahead': stops_ahead,
+            'source': source,
+        }
+
+    def status(self):
+        return {
+            'plans': len(self._plans),
+            'cache_entries': len(self.cache),
+            'cache_hits': self.cache.hits,
+            'cache_misses': self.cache.misses,
+        }
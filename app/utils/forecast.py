@@ -0,0 +1,145 @@
+"""Next-week demand forecasts per station, fuel and delivery slot.
+
+History is aggregated to litres per (station, fuel, slot, day) in SQL and
+streamed in chunks into a dense series x days NumPy matrix. Every series
+shares the same design matrix (intercept, linear trend, day-of-week
+dummies), so one ridge least-squares solve fits all of them at once;
+slot-of-day seasonality comes from each slot being its own series.
+"""
+import logging
+import threading
+import time
+from datetime import date, timedelta
+import numpy as np
+from sqlalchemy import func, select
+from app import db
+from app.models.fuel import FuelType
+from app.models.order import Order, OrderStatus
+
+logger = logging.getLogger(__name__)
+
+HORIZON_DAYS = 7
+
+
+def design_matrix(days, first_day):
+    """Columns: intercept, trend (in weeks), Tue..Sun dummies (Monday is the baseline)"""
+    t = np.arange(days, dtype=float)
+    weekday = (first_day.weekday() + np.arange(days)) % 7
+    dummies = (weekday[:, None] == np.arange(1, 7)[None, :]).astype(float)
+    return np.column_stack([np.ones(days), t / 7.0, dummies])
+
+
+def fit(Y, first_day, ridge=1.0):
+    """Coefficients (features x series) for every row of `Y` in one solve.
+
+    The intercept is left unpenalised; the ridge term keeps trend and
+    weekday effects sane for short or sparse series.
+    """
+    X = design_matrix(Y.shape[1], first_day)
+    penalty = np.eye(X.shape[1]) * ridge
+    penalty[0, 0] = 0.0
+    return np.linalg.solve(X.T @ X + penalty, X.T @ Y.T)
+
+
+def predict(coefficients, history_days, first_day, horizon=HORIZON_DAYS):
+    X = design_matrix(history_days + horizon, first_day)[history_days:]
+    return np.clip(X @ coefficients, 0.0, None).T  # series x horizon
+
+
+class DemandForecaster:
+    """Builds forecasts for every station at once and caches the result"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self._result = None
+        self._built_at = 0.0
+        self._building = False
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('FORECAST_HISTORY_DAYS', 26 * 7)
+        app.config.setdefault('FORECAST_CACHE_TTL', 6 * 60 * 60)
+        app.config.setdefault('FORECAST_CHUNK_SIZE', 50000)
+        self.app = app
+        app.extensions['forecaster'] = self
+
+    def load_history(self, today=None):
+        """(series keys, litres matrix, first day) for the configured window"""
+        config = self.app.config
+        today = today or date.today()
+        days = config['FORECAST_HISTORY_DAYS']
+        first_day = today - timedelta(days=days)
+
+        query = select(
+            FuelType.station_id, Order.fuel_type_id, Order.delivery_time_slot,
+            Order.delivery_date, func.sum(Order.quantity_liters)
+        ).join(FuelType, Order.fuel_type_id == FuelType.id).where(
+            Order.delivery_date >= first_day,
+            Order.delivery_date < today,
+            Order.status != OrderStatus.CANCELLED,
+        ).group_by(FuelType.station_id, Order.fuel_type_id, Order.delivery_time_slot, Order.delivery_date)
+
+        index = {}
+        rows, cols, values = [], [], []
+        with db.engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=config['FORECAST_CHUNK_SIZE']).execute(query)
+            for chunk in result.partitions():
+                for station_id, fuel_type_id, slot, day, liters in chunk:
+                    key = (station_id, fuel_type_id, slot)
+                    rows.append(index.setdefault(key, len(index)))
+                    cols.append((day - first_day).days)
+                    values.append(liters or 0.0)
+
+        Y = np.zeros((len(index), days))
+        if index:
+            np.add.at(Y, (np.asarray(rows), np.asarray(cols)), np.asarray(values, dtype=float))
+        return list(index), Y, first_day
+
+    def build(self, today=None):
+        """{station_id: {'days': [...], 'series': [...], 'total': [...]}}"""
+        started = time.perf_counter()
+        today = today or date.today()
+        keys, Y, first_day = self.load_history(today)
+        days = [(today + timedelta(days=i)).isoformat() for i in range(HORIZON_DAYS)]
+        forecasts = {}
+        if keys:
+            F = predict(fit(Y, first_day), Y.shape[1], first_day)
+            for (station_id, fuel_type_id, slot), row in zip(keys, np.round(F, 1).tolist()):
+                station = forecasts.setdefault(station_id, {'days': days, 'series': [], 'total': [0.0] * HORIZON_DAYS})
+                station['series'].append({'fuel_type_id': fuel_type_id, 'slot': slot, 'liters': row})
+                station['total'] = [round(a + b, 1) for a, b in zip(station['total'], row)]
+            for station in forecasts.values():
+                station['series'].sort(key=lambda s: (s['fuel_type_id'], s['slot']))
+        logger.info("Forecast %d series over %d days in %.2fs", len(keys), Y.shape[1], time.perf_counter() - started)
+        return forecasts
+
+    def refresh(self):
+        try:
+            with self.app.app_context():
+                result = self.build()
+            with self._lock:
+                self._result, self._built_at = result, time.monotonic()
+        except Exception:
+            logger.exception("Demand forecast failed")
+        finally:
+            self._building = False
+
+    def for_stations(self, station_ids, wait=False):
+        """Cached forecasts for `station_ids`.
+
+        A stale or missing cache is rebuilt in the background; pass `wait=True`
+        to build inline instead (CLI, first load in tests).
+        """
+        stale = self._result is None or time.monotonic() - self._built_at > self.app.config['FORECAST_CACHE_TTL']
+        if stale:
+            if wait:
+                self.refresh()
+            else:
+                with self._lock:
+                    start, self._building = not self._building, True
+                if start:
+                    threading.Thread(target=self.refresh, name='demand-forecast', daemon=True).start()
+        result = self._result or {}
+        return {station_id: result[station_id] for station_id in station_ids if station_id in result}
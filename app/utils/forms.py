@@ -1,7 +1,9 @@
 from flask_wtf import FlaskForm
 from wtforms import StringField, PasswordField, BooleanField, SelectField, SubmitField, FloatField, DateField, TimeField, TextAreaField, RadioField,IntegerField, DecimalField
 from wtforms.validators import DataRequired, Email, Length, EqualTo, ValidationError, NumberRange
+from sqlalchemy import or_
 from app.models import User
+from app.utils.availability import normalize
 
 class LoginForm(FlaskForm):
     email = StringField('Email', validators=[DataRequired(), Email()])
@@ -21,20 +23,32 @@ class RegistrationForm(FlaskForm):
     ], default='customer')
     submit = SubmitField('Create Account')
     
-    def validate_username(self, username):
-        user = User.query.filter_by(username=username.data).first()
-        if user:
-            raise ValidationError('Username already taken. Choose a different one.')
-    
-    def validate_email(self, email):
-        user = User.query.filter_by(email=email.data).first()
-        if user:
-            raise ValidationError('Email already registered. Use a different email.')
-    
-    def validate_phone(self, phone):
-        user = User.query.filter_by(phone=phone.data).first()
-        if user:
-            raise ValidationError('Phone number already registered.')
+    def validate(self, extra_validators=None):
+        """Field checks, then one query for username/email/phone clashes"""
+        if not super().validate(extra_validators):
+            return False
+
+        taken = User.query.with_entities(User.username, User.email, User.phone).filter(or_(
+            User.username == self.username.data,
+            User.email == self.email.data,
+            User.phone == self.phone.data
+        )).all()
+
+        messages = {
+            'username': 'Username already taken. Choose a different one.',
+            'email': 'Email already registered. Use a different email.',
+            'phone': 'Phone number already registered.',
+        }
+        clashed = False
+        for row in taken:
+            for field, message in messages.items():
+                field_obj = getattr(self, field)
+                # The query matched under the column collation; compare the same way
+                if normalize(getattr(row, field)) == normalize(field_obj.data):
+                    clashed = True
+                    if message not in field_obj.errors:
+                        field_obj.errors.append(message)
+        return not clashed
 
 
 class AddressForm(FlaskForm):
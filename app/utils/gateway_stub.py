@@ -0,0 +1,94 @@
+"""Local stand-in for the payment gateway.
+
+Speaks just enough of the payment intents API for development and tests:
+POST /v1/payment_intents answers immediately with a `processing` intent,
+then the outcome is delivered to the webhook URL a moment later, signed
+like the real thing. Amounts whose paise end in 13 (e.g. 100.13) decline.
+"""
+import json
+import threading
+import urllib.request
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from app.utils.payments import SIGNATURE_HEADER, sign_payload
+
+
+class StubGateway:
+
+    def __init__(self, webhook_url, webhook_secret, host='127.0.0.1', port=8765, settle_delay=0.2):
+        self.webhook_url = webhook_url
+        self.webhook_secret = webhook_secret
+        self.settle_delay = settle_delay
+        self.intents = {}
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        gateway = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if self.path != '/v1/payment_intents':
+                    self.send_error(404)
+                    return
+                length = int(self.headers.get('Content-Length') or 0)
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                intent = gateway.create_intent(payload, self.headers.get('Idempotency-Key'))
+                body = json.dumps(intent).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # keep test output quiet
+
+        return Handler
+
+    def create_intent(self, payload, idempotency_key=None):
+        with self._lock:
+            if idempotency_key and idempotency_key in self.intents:
+                return self.intents[idempotency_key]
+            intent = {
+                'id': f"pi_{uuid.uuid4().hex[:24]}",
+                'status': 'processing',
+                'amount': payload.get('amount'),
+                'currency': payload.get('currency'),
+                'reference': payload.get('reference'),
+            }
+            self.intents[idempotency_key or intent['id']] = intent
+        threading.Timer(self.settle_delay, self.settle, args=(intent,)).start()
+        return intent
+
+    def settle(self, intent):
+        declined = (intent['amount'] or 0) % 100 == 13
+        event = {
+            'id': f"evt_{uuid.uuid4().hex[:24]}",
+            'type': 'payment_intent.payment_failed' if declined else 'payment_intent.succeeded',
+            'data': dict(intent, failure_message='Card declined' if declined else None),
+        }
+        body = json.dumps({'events': [event]}).encode('utf-8')
+        req = urllib.request.Request(self.webhook_url, data=body, method='POST', headers={
+            'Content-Type': 'application/json',
+            SIGNATURE_HEADER: sign_payload(self.webhook_secret, body),
+        })
+        try:
+            urllib.request.urlopen(req, timeout=5).close()
+        except OSError as e:
+            print(f"Stub gateway: webhook delivery failed: {e}")
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,169 @@
+import json
+import threading
+import time
+import uuid
+from functools import wraps
+from flask import current_app, request, session
+from flask_login import current_user
+
+HEADER = 'Idempotency-Key'
+FORM_FIELD = 'idempotency_key'
+
+
+def new_key():
+    """Fresh key for a form's hidden `idempotency_key` field"""
+    return uuid.uuid4().hex
+
+
+class MemoryStore:
+    """Process-local TTL store with atomic add, for a single worker and tests"""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def _purge(self, now):
+        expired = [k for k, (_, expires) in self._data.items() if expires <= now]
+        for k in expired:
+            del self._data[k]
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item and item[1] > time.monotonic():
+                return item[0]
+            return None
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+
+    def add(self, key, value, ttl):
+        """Set only if absent; returns True when we claimed the key"""
+        with self._lock:
+            now = time.monotonic()
+            if len(self._data) > 10000:
+                self._purge(now)
+            item = self._data.get(key)
+            if item and item[1] > now:
+                return False
+            self._data[key] = (value, now + ttl)
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class RedisStore:
+    """TTL store shared across workers; `add` is a single SET NX"""
+
+    def __init__(self, url, prefix='idem:'):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return value.decode('utf-8') if value is not None else None
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, value, ex=int(ttl))
+
+    def add(self, key, value, ttl):
+        return bool(self.client.set(self.prefix + key, value, ex=int(ttl), nx=True))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+
+class Idempotency:
+    """Replays the first response to a repeated POST instead of re-running it"""
+
+    def __init__(self, app=None):
+        self.store = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('IDEMPOTENCY_TTL', 24 * 60 * 60)
+        app.config.setdefault('IDEMPOTENCY_LOCK_TIMEOUT', 30)
+        app.config.setdefault('IDEMPOTENCY_STORAGE_URL', None)
+        url = app.config['IDEMPOTENCY_STORAGE_URL']
+        self.store = RedisStore(url) if url else MemoryStore()
+        app.jinja_env.globals['idempotency_key'] = new_key
+        app.extensions['idempotency'] = self
+
+    def _scoped_key(self, key):
+        # Keys are only unique per caller, so never let two users share one
+        owner = current_user.get_id() if current_user.is_authenticated else session.get('_id', 'anon')
+        return f"{request.endpoint}:{owner}:{key}"
+
+    @staticmethod
+    def _dump(response):
+        return json.dumps({
+            'status': response.status_code,
+            'mimetype': response.mimetype,
+            'location': response.headers.get('Location'),
+            'body': response.get_data(as_text=True),
+        })
+
+    @staticmethod
+    def _load(raw):
+        data = json.loads(raw)
+        response = current_app.response_class(data['body'], status=data['status'], mimetype=data['mimetype'])
+        if data['location']:
+            response.headers['Location'] = data['location']
+        response.headers['Idempotent-Replay'] = 'true'
+        return response
+
+    def _wait_for_result(self, result_key, lock_key):
+        """Block a concurrent duplicate until the first request finishes"""
+        deadline = time.monotonic() + current_app.config['IDEMPOTENCY_LOCK_TIMEOUT']
+        delay = 0.01
+        while time.monotonic() < deadline:
+            raw = self.store.get(result_key)
+            if raw is not None:
+                return self._load(raw)
+            if self.store.get(lock_key) is None:
+                return None  # first attempt failed without storing a result
+            time.sleep(delay)
+            delay = min(delay * 2, 0.25)
+        return current_app.response_class(
+            'This request is already being processed.\n', status=409, mimetype='text/plain'
+        )
+
+    def idempotent(self, f):
+        """Honour an Idempotency-Key header or hidden form field on POSTs"""
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            key = request.headers.get(HEADER) or request.form.get(FORM_FIELD)
+            if request.method != 'POST' or not key:
+                return f(*args, **kwargs)
+
+            scoped = self._scoped_key(key[:100])
+            result_key, lock_key = 'res:' + scoped, 'lock:' + scoped
+            ttl = current_app.config['IDEMPOTENCY_TTL']
+
+            raw = self.store.get(result_key)
+            if raw is not None:
+                return self._load(raw)
+
+            if not self.store.add(lock_key, '1', current_app.config['IDEMPOTENCY_LOCK_TIMEOUT']):
+                replay = self._wait_for_result(result_key, lock_key)
+                if replay is not None:
+                    return replay
+                if not self.store.add(lock_key, '1', current_app.config['IDEMPOTENCY_LOCK_TIMEOUT']):
+                    return current_app.response_class(
+                        'This request is already being processed.\n', status=409, mimetype='text/plain'
+                    )
+
+            try:
+                response = current_app.make_response(f(*args, **kwargs))
+                # Server errors are worth retrying, so don't pin them to the key
+                if response.status_code < 500 and not response.direct_passthrough:
+                    self.store.set(result_key, self._dump(response), ttl)
+                return response
+            finally:
+                self.store.delete(lock_key)
+        return wrapper
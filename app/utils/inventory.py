@@ -0,0 +1,150 @@
+"""Station tank stock: atomic reservations and a cached snapshot.
+
+A reservation is a single conditional decrement
+
+    UPDATE fuel_stock SET available_liters = available_liters - :q
+    WHERE fuel_type_id = :fuel AND available_liters >= :q
+
+run in the order's own transaction, so two customers can never both take
+the last litres: the database serialises the two UPDATEs and the second
+matches no row. Cancelling an order (any OrderTracking row with status
+CANCELLED) gives its litres back in the same flush.
+"""
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import event, select
+from app import db
+from app.models.inventory import FuelStock, StockMovement
+from app.models.order import OrderStatus, OrderTracking
+
+
+class InsufficientStock(Exception):
+    """The station doesn't have enough of this fuel left"""
+
+    def __init__(self, fuel_type_id, requested, available):
+        super().__init__(f"Only {available:g} L left, {requested:g} L requested")
+        self.fuel_type_id = fuel_type_id
+        self.requested = requested
+        self.available = available
+
+
+def _record(conn, fuel_type_id, change, reason, order_id=None):
+    conn.execute(StockMovement.__table__.insert().values(
+        fuel_type_id=fuel_type_id, order_id=order_id, change_liters=change,
+        reason=reason, created_at=datetime.utcnow()
+    ))
+
+
+def reserve(conn, fuel_type_id, liters, order_id=None):
+    """Take `liters` out of stock, or raise InsufficientStock.
+
+    Returns False (and does nothing) for untracked fuels. Non-positive
+    `liters` raise ValueError: a negative reservation would add stock.
+    """
+    if not liters > 0:
+        raise ValueError(f"Can't reserve {liters!r} L")
+    stock = FuelStock.__table__
+    result = conn.execute(
+        stock.update()
+        .where(stock.c.fuel_type_id == fuel_type_id, stock.c.available_liters >= liters)
+        .values(available_liters=stock.c.available_liters - liters, updated_at=datetime.utcnow())
+    )
+    if result.rowcount == 0:
+        available = conn.execute(
+            select(stock.c.available_liters).where(stock.c.fuel_type_id == fuel_type_id)
+        ).scalar()
+        if available is None:
+            return False
+        raise InsufficientStock(fuel_type_id, liters, available)
+    _record(conn, fuel_type_id, -liters, StockMovement.RESERVE, order_id)
+    return True
+
+
+def release(conn, order_id):
+    """Return an order's reserved litres; a no-op if there are none or already released"""
+    movements = StockMovement.__table__
+    rows = conn.execute(
+        select(movements.c.fuel_type_id, movements.c.change_liters, movements.c.reason)
+        .where(movements.c.order_id == order_id)
+    ).all()
+    reserved = [r for r in rows if r.reason == StockMovement.RESERVE]
+    if not reserved or any(r.reason == StockMovement.RELEASE for r in rows):
+        return False
+    fuel_type_id, liters = reserved[0].fuel_type_id, -reserved[0].change_liters
+    stock = FuelStock.__table__
+    conn.execute(
+        stock.update().where(stock.c.fuel_type_id == fuel_type_id)
+        .values(available_liters=stock.c.available_liters + liters, updated_at=datetime.utcnow())
+    )
+    _record(conn, fuel_type_id, liters, StockMovement.RELEASE, order_id)
+    return True
+
+
+def restock(conn, fuel_type_id, station_id, liters):
+    """Add delivered fuel, starting to track the fuel if it wasn't yet"""
+    if not liters > 0:
+        raise ValueError(f"Can't restock {liters!r} L")
+    stock = FuelStock.__table__
+    result = conn.execute(
+        stock.update().where(stock.c.fuel_type_id == fuel_type_id)
+        .values(available_liters=stock.c.available_liters + liters, updated_at=datetime.utcnow())
+    )
+    if result.rowcount == 0:
+        conn.execute(stock.insert().values(
+            fuel_type_id=fuel_type_id, station_id=station_id,
+            available_liters=liters, updated_at=datetime.utcnow()
+        ))
+    _record(conn, fuel_type_id, liters, StockMovement.RESTOCK)
+
+
+class Inventory:
+    """Ledger operations on the current session plus a short-lived stock snapshot"""
+
+    def __init__(self, app=None):
+        self.ttl = 5
+        self._snapshots = {}
+        self._lock = threading.Lock()
+        self._listening = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('INVENTORY_SNAPSHOT_TTL', 5)
+        self.ttl = app.config['INVENTORY_SNAPSHOT_TTL']
+        if not self._listening:
+            event.listen(OrderTracking, 'after_insert', self._release_cancelled)
+            self._listening = True
+        app.extensions['inventory'] = self
+
+    def reserve(self, fuel_type_id, liters, order_id=None):
+        """Reserve inside the current transaction; rolls back with it"""
+        reserved = reserve(db.session.connection(), fuel_type_id, float(liters), order_id)
+        self.invalidate()
+        return reserved
+
+    def restock(self, fuel, liters):
+        restock(db.session.connection(), fuel.id, fuel.station_id, float(liters))
+        self.invalidate()
+
+    def _release_cancelled(self, mapper, connection, target):
+        # Runs inside the flush that records the cancellation
+        if target.status == OrderStatus.CANCELLED and release(connection, target.order_id):
+            self.invalidate()
+
+    def invalidate(self):
+        self._snapshots = {}
+
+    def snapshot(self, station_ids=None):
+        """{fuel_type_id: available litres} for tracked fuels, cached for a few seconds"""
+        key = tuple(sorted(station_ids)) if station_ids is not None else None
+        cached = self._snapshots.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        query = select(FuelStock.fuel_type_id, FuelStock.available_liters)
+        if station_ids is not None:
+            query = query.where(FuelStock.station_id.in_(station_ids))
+        levels = {fuel_type_id: liters for fuel_type_id, liters in db.session.execute(query)}
+        with self._lock:
+            self._snapshots[key] = (time.monotonic() + self.ttl, levels)
+        return levels
@@ -0,0 +1,347 @@
+"""Per-order invoices and monthly statements, as HTML or PDF.
+
+Everything an invoice shows is first collected into a plain dict (order
+amounts, fuel, station, customer, address, latest payment). The SHA-256 of
+that dict, the output format and the layout (template sources) names the
+file in INVOICE_CACHE_DIR, so a document is rendered once and every later
+download, or re-run of a month, is a file read. Any change to the order,
+payment or address gives a new key.
+
+Monthly runs load a month's orders with a handful of set-based queries
+(fanned out over the order shards) and hand batches of statement dicts to
+a process pool, which renders and writes whatever isn't cached yet. The
+workers never touch the database.
+
+PDFs are written directly (text in Courier, no dependencies), which is all
+a one-page invoice or a statement table needs.
+"""
+import calendar
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from sqlalchemy import select
+from app import db, shards
+from app.models.address import Address
+from app.models.fuel import FuelType
+from app.models.fuel_station import FuelStation
+from app.models.order import Order, OrderStatus
+from app.models.payment import Payment
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates')
+PDF_LAYOUT = 1  # bump when the PDF layout below changes
+LOOKUP_CHUNK = 5000
+
+_jinja = None
+_layout = None
+
+
+def _env():
+    global _jinja
+    if _jinja is None:
+        _jinja = Environment(loader=FileSystemLoader(TEMPLATE_DIR), autoescape=select_autoescape(['html']))
+    return _jinja
+
+
+def layout_version():
+    """Hash of the invoice templates, so editing them invalidates the cache"""
+    global _layout
+    if _layout is None:
+        digest = hashlib.sha256(str(PDF_LAYOUT).encode())
+        for name in ('invoice.html', 'statement.html', '_style.html'):
+            with open(os.path.join(TEMPLATE_DIR, 'invoices', name), 'rb') as f:
+                digest.update(f.read())
+        _layout = digest.hexdigest()[:16]
+    return _layout
+
+
+# --- inputs ---
+
+def invoice_data(order, fuel, station, user, address, payment=None):
+    """The inputs of one invoice as a plain dict; attribute access works on models and rows alike"""
+    lines = [address.name, address.address_line1, address.address_line2, address.landmark,
+             f"{address.city} - {address.pincode}", address.state, f"Phone: {address.phone}"] if address else []
+    return {
+        'number': order.order_number,
+        'date': order.created_at.strftime('%d %b %Y') if order.created_at else '',
+        'delivery_date': order.delivery_date.strftime('%d %b %Y') if order.delivery_date else '',
+        'customer': {'name': user.username, 'email': user.email, 'phone': user.phone},
+        'address': [line for line in lines if line],
+        'station': {'name': station.name if station else '', 'address': station.address if station else ''},
+        'fuel': fuel.name if fuel else '',
+        'quantity': order.quantity_liters,
+        'price': order.price_per_liter,
+        'fuel_cost': order.total_fuel_cost,
+        'delivery_fee': order.delivery_fee or 0.0,
+        'total': order.total_amount,
+        'payment': {
+            'mode': payment.payment_mode,
+            'status': payment.status.value if payment.status else 'pending',
+            'transaction_id': payment.transaction_id,
+        } if payment else None,
+    }
+
+
+def statement_data(year, month, invoices):
+    return {
+        'month': f"{year:04d}-{month:02d}",
+        'period': f"{calendar.month_name[month]} {year}",
+        'customer': invoices[0]['customer'],
+        'invoices': invoices,
+        'liters': round(sum(i['quantity'] for i in invoices), 2),
+        'total': round(sum(i['total'] for i in invoices), 2),
+    }
+
+
+def cache_key(kind, fmt, data, seller):
+    payload = json.dumps({'kind': kind, 'format': fmt, 'layout': layout_version(), 'seller': seller, 'data': data},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+# --- rendering ---
+
+def render_html(kind, data, seller):
+    template = _env().get_template(f'invoices/{kind}.html')
+    return template.render(**{kind: data, 'seller': seller}).encode('utf-8')
+
+
+def _money(value):
+    return f"Rs. {value:,.2f}"  # the standard PDF fonts have no rupee sign
+
+
+def _pdf_lines(kind, data, seller):
+    head = [seller['name']] + ([f"GSTIN: {seller['gstin']}"] if seller.get('gstin') else []) + ['']
+    if kind == 'invoice':
+        lines = head + [
+            f"INVOICE  #{data['number']}",
+            f"Order date: {data['date']}    Delivery date: {data['delivery_date']}",
+            '',
+            'Billed to:', f"  {data['customer']['name']} <{data['customer']['email']}>",
+        ] + [f"  {line}" for line in data['address']] + [
+            '', f"Supplied from: {data['station']['name']}, {data['station']['address'] or ''}", '',
+            f"{'Item':<34}{'Quantity':>14}{'Rate':>14}{'Amount':>18}",
+            '-' * 80,
+            f"{data['fuel'][:33]:<34}{data['quantity']:>12.2f} L{_money(data['price']):>14}{_money(data['fuel_cost']):>18}",
+            f"{'Delivery fee':<62}{_money(data['delivery_fee']):>18}",
+            '-' * 80,
+            f"{'TOTAL':<62}{_money(data['total']):>18}",
+        ]
+        if data['payment']:
+            lines += ['', f"Paid by {data['payment']['mode']} ({data['payment']['status']})"
+                      + (f", transaction {data['payment']['transaction_id']}" if data['payment']['transaction_id'] else '')]
+        return lines
+    lines = head + [
+        f"MONTHLY STATEMENT  {data['period']}",
+        f"{data['customer']['name']} <{data['customer']['email']}>  {data['customer']['phone']}",
+        '',
+        f"{'Invoice':<14}{'Date':<13}{'Fuel':<16}{'Station':<14}{'Quantity':>10}{'Amount':>13}",
+        '-' * 80,
+    ]
+    for i in data['invoices']:
+        lines.append(f"{i['number']:<14}{i['date']:<13}{i['fuel'][:15]:<16}{i['station']['name'][:13]:<14}"
+                     f"{i['quantity']:>8.2f} L{_money(i['total']):>13}")
+    lines += ['-' * 80, f"{len(data['invoices'])} orders{'':<44}{data['liters']:>8.2f} L{_money(data['total']):>13}"]
+    return lines
+
+
+def _pdf_text(value):
+    value = value.encode('latin-1', 'replace').decode('latin-1')
+    return value.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def pdf_document(lines, lines_per_page=64):
+    """A minimal PDF: A4 pages of 9pt Courier text"""
+    pages = [lines[i:i + lines_per_page] for i in range(0, max(len(lines), 1), lines_per_page)] or [[]]
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>', None,
+               b'<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>']
+    kids = []
+    for page in pages:
+        text = ['BT /F1 9 Tf 11 TL 40 800 Td']
+        text += [f"({_pdf_text(line)}) Tj T*" for line in page]
+        text.append('ET')
+        stream = '\n'.join(text).encode('latin-1')
+        objects.append(b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream))
+        objects.append(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+                       b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % len(objects))
+        kids.append(len(objects))
+    objects[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (' '.join(f'{k} 0 R' for k in kids).encode(), len(kids))
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    out += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def render(kind, fmt, data, seller):
+    if fmt == 'pdf':
+        return pdf_document(_pdf_lines(kind, data, seller))
+    return render_html(kind, data, seller)
+
+
+# --- disk cache ---
+
+def _path(cache_dir, key, fmt):
+    return os.path.join(cache_dir, key[:2], f"{key}.{fmt}")
+
+
+def cached_render(cache_dir, kind, fmt, data, seller):
+    """(bytes, was_cached) for a document, rendering and storing it on a miss"""
+    path = _path(cache_dir, cache_key(kind, fmt, data, seller), fmt)
+    try:
+        with open(path, 'rb') as f:
+            return f.read(), True
+    except FileNotFoundError:
+        pass
+    content = render(kind, fmt, data, seller)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # A unique temp file per writer: concurrent misses for the same document
+    # (threads share a pid) each replace the target with a complete copy
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.replace(tmp, path)  # readers never see a partial file
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return content, False
+
+
+def _render_batch(cache_dir, seller, formats, statements):
+    """Process-pool task: (rendered, cached) counts for a batch of statements"""
+    rendered = cached = 0
+    for data in statements:
+        for fmt in formats:
+            path = _path(cache_dir, cache_key('statement', fmt, data, seller), fmt)
+            if os.path.exists(path):
+                cached += 1
+            else:
+                cached_render(cache_dir, 'statement', fmt, data, seller)
+                rendered += 1
+    return rendered, cached
+
+
+class Invoicer:
+
+    def __init__(self, app=None):
+        self.app = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config.get('INVOICE_CACHE_DIR'):
+            app.config['INVOICE_CACHE_DIR'] = os.path.join(app.instance_path, 'invoices')
+        app.config.setdefault('INVOICE_SELLER_NAME', 'FuelExpress')
+        app.config.setdefault('INVOICE_SELLER_GSTIN', None)
+        app.config.setdefault('INVOICE_WORKERS', None)  # None: one per CPU
+        app.config.setdefault('INVOICE_BATCH_SIZE', 200)
+        self.app = app
+        app.extensions['invoices'] = self
+
+    @property
+    def seller(self):
+        return {'name': self.app.config['INVOICE_SELLER_NAME'], 'gstin': self.app.config['INVOICE_SELLER_GSTIN']}
+
+    @property
+    def cache_dir(self):
+        return self.app.config['INVOICE_CACHE_DIR']
+
+    # --- single documents ---
+
+    def order_invoice(self, order, fmt='html'):
+        payment = max(order.payment, key=lambda p: p.id) if order.payment else None
+        fuel = order.fuel_type
+        data = invoice_data(order, fuel, fuel.station if fuel else None, order.user, order.delivery_address, payment)
+        return cached_render(self.cache_dir, 'invoice', fmt, data, self.seller)[0]
+
+    def statement(self, user_id, year, month, fmt='html'):
+        """A customer's statement for one month, or None if they ordered nothing"""
+        invoices = self.load_month(year, month, user_ids=[user_id]).get(user_id)
+        if not invoices:
+            return None
+        return cached_render(self.cache_dir, 'statement', fmt, statement_data(year, month, invoices), self.seller)[0]
+
+    # --- monthly runs ---
+
+    def load_month(self, year, month, user_ids=None):
+        """{user_id: [invoice dicts]} for the month's non-cancelled orders, oldest first"""
+        start = datetime(year, month, 1)
+        end = datetime(year + month // 12, month % 12 + 1, 1)
+
+        def orders_and_payments():
+            orders = Order.__table__
+            query = select(orders).where(orders.c.created_at >= start, orders.c.created_at < end,
+                                         orders.c.status != OrderStatus.CANCELLED)
+            if user_ids is not None:
+                query = query.where(orders.c.user_id.in_(user_ids))
+            rows = db.session.execute(query.order_by(orders.c.created_at, orders.c.id)).all()
+            payments = Payment.__table__
+            latest = {}
+            ids = [row.id for row in rows]
+            for i in range(0, len(ids), LOOKUP_CHUNK):
+                for payment in db.session.execute(
+                        select(payments).where(payments.c.order_id.in_(ids[i:i + LOOKUP_CHUNK])).order_by(payments.c.id)
+                ):
+                    latest[payment.order_id] = payment  # newest attempt wins
+            return [(row, latest.get(row.id)) for row in rows]
+
+        # Plain rows rather than ORM objects: a month can be millions of orders
+        rows = [row for shard_rows in shards.fan_out(orders_and_payments).values() for row in shard_rows]
+
+        fuels = {f.id: f for f in db.session.execute(select(FuelType.__table__))}
+        stations = {s.id: s for s in db.session.execute(select(FuelStation.__table__))}
+        users, addresses = {}, {}
+        for table, wanted, found in ((User.__table__, {o.user_id for o, _ in rows}, users),
+                                     (Address.__table__, {o.delivery_address_id for o, _ in rows}, addresses)):
+            wanted = sorted(wanted)
+            for i in range(0, len(wanted), LOOKUP_CHUNK):
+                found.update((r.id, r) for r in db.session.execute(
+                    select(table).where(table.c.id.in_(wanted[i:i + LOOKUP_CHUNK]))))
+
+        month_invoices = {}
+        for order, payment in rows:
+            fuel = fuels.get(order.fuel_type_id)
+            month_invoices.setdefault(order.user_id, []).append(invoice_data(
+                order, fuel, stations.get(fuel.station_id) if fuel else None,
+                users[order.user_id], addresses.get(order.delivery_address_id), payment
+            ))
+        return month_invoices
+
+    def run_month(self, year, month, formats=('html', 'pdf'), workers=None):
+        """Render every customer's statement for a month; returns counts and timing"""
+        started = time.perf_counter()
+        month_invoices = self.load_month(year, month)
+        loaded = time.perf_counter() - started
+        statements = [statement_data(year, month, invoices) for _, invoices in sorted(month_invoices.items())]
+        size = self.app.config['INVOICE_BATCH_SIZE']
+        batches = [statements[i:i + size] for i in range(0, len(statements), size)]
+
+        rendered = cached = 0
+        workers = workers or self.app.config['INVOICE_WORKERS'] or os.cpu_count()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_render_batch, self.cache_dir, self.seller, list(formats), batch) for batch in batches]
+            for future in futures:
+                r, c = future.result()
+                rendered += r
+                cached += c
+        elapsed = time.perf_counter() - started
+        logger.info("Statements %04d-%02d: %d customers, %d rendered, %d cached in %.1fs",
+                    year, month, len(statements), rendered, cached, elapsed)
+        return {'customers': len(statements), 'rendered': rendered, 'cached': cached,
+                'load_seconds': round(loaded, 2), 'seconds': round(elapsed, 2)}
@@ -0,0 +1,176 @@
+"""Pincode/city autocomplete and delivery serviceability.
+
+Backed by the bundled `app/data/pincodes.csv` (pincode, city, state and an
+approximate locality centroid). Prefix search runs on sorted arrays with
+bisect; serviceability is a precomputed pincode -> station ids map, so both
+answer without touching the database.
+"""
+import csv
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import namedtuple
+from sqlalchemy import event
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'pincodes.csv')
+
+Location = namedtuple('Location', 'pincode city state latitude longitude')
+
+EARTH_RADIUS_KM = 6371.0
+DEFAULT_SERVICE_RADIUS_KM = 15.0  # matches fuel_stations.service_radius_km's default
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points in kilometres"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def _prefix_range(keys, prefix):
+    """Slice bounds of the sorted `keys` that start with `prefix`"""
+    start = bisect_left(keys, prefix)
+    end = bisect_left(keys, prefix + '\uffff', lo=start)
+    return start, end
+
+
+class LocationIndex:
+
+    def __init__(self, path=DATA_PATH):
+        self.by_pincode = {}
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                self.by_pincode[row['pincode']] = Location(
+                    row['pincode'], row['city'], row['state'],
+                    float(row['latitude']), float(row['longitude'])
+                )
+        self._pincodes = sorted(self.by_pincode)
+
+        # One entry per (city, state); pincodes in ascending order
+        cities = {}
+        for pincode in self._pincodes:
+            loc = self.by_pincode[pincode]
+            cities.setdefault((loc.city.lower(), loc.city, loc.state), []).append(pincode)
+        self._city_entries = sorted(cities.items())
+        self._city_keys = [entry[0][0] for entry in self._city_entries]
+
+    def lookup(self, pincode):
+        return self.by_pincode.get((pincode or '').strip())
+
+    def complete(self, query, limit=10):
+        """Pincode prefix matches for digits, city prefix matches otherwise"""
+        query = (query or '').strip()
+        if not query:
+            return []
+        if query.isdigit():
+            start, end = _prefix_range(self._pincodes, query)
+            return [{'pincode': p, 'city': self.by_pincode[p].city, 'state': self.by_pincode[p].state}
+                    for p in self._pincodes[start:min(end, start + limit)]]
+        start, end = _prefix_range(self._city_keys, query.lower())
+        return [{'city': city, 'state': state, 'pincodes': [pincodes[0], pincodes[-1]]}
+                for (_, city, state), pincodes in self._city_entries[start:min(end, start + limit)]]
+
+
+class Serviceability:
+    """Which stations deliver to which pincodes, precomputed in memory.
+
+    A station with coordinates serves every pincode within its
+    `service_radius_km`; one without is listed for the city named in its
+    address, but since its coverage isn't configured it never refuses an
+    order. Pincodes missing from the bundled sample dataset can't be judged
+    and are always serviceable. The map is rebuilt lazily whenever a station changes in this
+    process, and at least every SERVICEABILITY_REBUILD_INTERVAL seconds so
+    other workers' station edits show up too. One caller rebuilds while
+    the rest keep using the old map.
+    """
+
+    def __init__(self, app=None):
+        self._index = None
+        self._map = None
+        self._built_at = 0
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._listening = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('SERVICEABILITY_ENFORCED', False)
+        app.config.setdefault('SERVICEABILITY_REBUILD_INTERVAL', 5 * 60)
+        self.rebuild_interval = app.config['SERVICEABILITY_REBUILD_INTERVAL']
+        if not self._listening:
+            from app.models.fuel_station import FuelStation
+            for name in ('after_insert', 'after_update', 'after_delete'):
+                event.listen(FuelStation, name, self.invalidate)
+            self._listening = True
+        app.extensions['serviceability'] = self
+
+    @property
+    def index(self):
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = LocationIndex()
+        return self._index
+
+    def invalidate(self, *args):
+        self._map = None
+
+    def build(self):
+        from app.models.fuel_station import FuelStation
+        stations = FuelStation.query.with_entities(
+            FuelStation.id, FuelStation.address, FuelStation.latitude,
+            FuelStation.longitude, FuelStation.service_radius_km
+        ).all()
+        built_at = time.monotonic()
+
+        serving = {}
+        for loc in self.index.by_pincode.values():
+            ids = []
+            for station_id, address, lat, lon, radius in stations:
+                if lat is not None and lon is not None:
+                    radius = DEFAULT_SERVICE_RADIUS_KM if radius is None else radius
+                    if haversine_km(lat, lon, loc.latitude, loc.longitude) <= radius:
+                        ids.append(station_id)
+                elif address and loc.city.lower() in address.lower():
+                    ids.append(station_id)
+            if ids:
+                serving[loc.pincode] = tuple(ids)
+        unmapped = frozenset(station_id for station_id, _, lat, lon, _ in stations if lat is None or lon is None)
+        self._map = {'stations': serving, 'unmapped': unmapped, 'configured': bool(stations)}
+        self._built_at = built_at
+        return self._map
+
+    def _current(self):
+        current = self._map
+        if current is not None and time.monotonic() - self._built_at <= self.rebuild_interval:
+            return current
+        if not self._build_lock.acquire(blocking=current is None):
+            return current
+        try:
+            if self._map is None or time.monotonic() - self._built_at > self.rebuild_interval:
+                return self.build()
+            return self._map
+        finally:
+            self._build_lock.release()
+
+    def stations_for(self, pincode):
+        return self._current()['stations'].get((pincode or '').strip(), ())
+
+    def is_serviceable(self, pincode, station_id=None):
+        """True if someone (or the given station) delivers to `pincode`.
+
+        With no stations at all, a pincode outside the bundled dataset, or a
+        station without coordinates, there is nothing to judge by, so the
+        answer is yes.
+        """
+        pincode = (pincode or '').strip()
+        current = self._current()
+        if not current['configured'] or self.index.lookup(pincode) is None:
+            return True
+        stations = current['stations'].get(pincode, ())
+        if station_id is not None:
+            return station_id in current['unmapped'] or station_id in stations
+        return bool(current['unmapped']) or bool(stations)
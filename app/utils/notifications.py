@@ -0,0 +1,203 @@
+"""Customer notifications for order status changes.
+
+Every OrderTracking row written by `Order.update_status` becomes an event
+once its transaction commits (rolled back changes never notify). A
+dispatcher thread folds events for the same order together until it has
+been quiet for NOTIFICATION_COALESCE_WINDOW seconds (or NOTIFICATION_MAX_DELAY
+has passed since the first one), so CONFIRMED -> PREPARING -> OUT_FOR_DELIVERY
+in quick succession is a single "Out for Delivery" message. Due orders are
+loaded in one query and handed to each channel as a batch.
+"""
+import logging
+import queue
+import threading
+import time
+from collections import deque, namedtuple
+from sqlalchemy import event
+from sqlalchemy.orm import joinedload, object_session
+from app import db
+from app.models.order import Order, OrderTracking
+
+logger = logging.getLogger(__name__)
+
+Notification = namedtuple('Notification', 'order_id order_number user_id username email phone status subject body')
+
+
+class StubChannel:
+    """Records and logs instead of sending; the default for local development"""
+
+    def __init__(self, name, keep=1000):
+        self.name = name
+        self.sent = deque(maxlen=keep)
+        self.count = 0
+
+    def send(self, notifications):
+        for n in notifications:
+            logger.info("[%s stub] %s -> %s: %s", self.name, n.order_number, n.username, n.subject)
+        self.sent.extend(notifications)
+        self.count += len(notifications)
+
+
+class EmailChannel:
+    """Sends through Flask-Mail, reusing one SMTP connection per batch"""
+
+    name = 'email'
+
+    def __init__(self, app):
+        self.app = app
+
+    def send(self, notifications):
+        from flask_mail import Message
+        from app import mail
+        with mail.connect() as conn:
+            for n in notifications:
+                if not n.email:
+                    continue
+                conn.send(Message(
+                    n.subject,
+                    sender=self.app.config['MAIL_USERNAME'],
+                    recipients=[n.email],
+                    body=n.body
+                ))
+
+
+def _stub_factory(name):
+    return lambda app: StubChannel(name)
+
+
+# Channel name -> factory(app). SMS and push have no provider wired in yet;
+# register a real one with `notifier.register_channel()`.
+CHANNELS = {
+    'email': EmailChannel,
+    'sms': _stub_factory('sms'),
+    'push': _stub_factory('push'),
+}
+
+
+def build_notification(order):
+    subject = f"Order {order.order_number}: {order.status_display}"
+    body = (f"Hello {order.user.username},\n\n"
+            f"Your order {order.order_number} is now: {order.status_display}.\n\n"
+            f"Thank you,\nFuelExpress Team")
+    return Notification(order.id, order.order_number, order.user_id, order.user.username,
+                        order.user.email, order.user.phone, order.status.value, subject, body)
+
+
+class Notifier:
+
+    def __init__(self, app=None):
+        self.app = None
+        self.channels = {}
+        self._events = queue.Queue()
+        self._started = False
+        self._start_lock = threading.Lock()
+        self._listening = False
+        self.stats = {'events': 0, 'coalesced': 0, 'delivered': 0, 'failed': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('NOTIFICATIONS_ENABLED', True)
+        app.config.setdefault('NOTIFICATION_CHANNELS', 'email,sms,push')
+        app.config.setdefault('NOTIFICATION_STUBS', True)
+        app.config.setdefault('NOTIFICATION_COALESCE_WINDOW', 3.0)
+        app.config.setdefault('NOTIFICATION_MAX_DELAY', 15.0)
+        app.config.setdefault('NOTIFICATION_BATCH_SIZE', 500)
+        self.app = app
+        self.channels = {}
+        for name in filter(None, (c.strip() for c in app.config['NOTIFICATION_CHANNELS'].split(','))):
+            self.channels[name] = StubChannel(name) if app.config['NOTIFICATION_STUBS'] else CHANNELS[name](app)
+        if not self._listening:
+            event.listen(OrderTracking, 'after_insert', self._collect)
+            event.listen(db.session, 'after_commit', self._publish)
+            event.listen(db.session, 'after_rollback', self._discard)
+            self._listening = True
+        app.extensions['notifier'] = self
+
+    def register_channel(self, name, channel):
+        """Use `channel` (anything with `send(notifications)`) for `name`"""
+        self.channels[name] = channel
+
+    # --- producing events ---
+
+    def _collect(self, mapper, connection, target):
+        session = object_session(target)
+        if session is not None:
+            session.info.setdefault('status_events', []).append(target.order_id)
+
+    def _discard(self, session):
+        session.info.pop('status_events', None)
+
+    def _publish(self, session):
+        events = session.info.pop('status_events', None)
+        if not events or not self.app.config['NOTIFICATIONS_ENABLED']:
+            return
+        self._ensure_started()
+        now = time.monotonic()
+        for order_id in events:
+            self._events.put((order_id, now))
+
+    def _ensure_started(self):
+        if self._started:
+            return
+        with self._start_lock:
+            if not self._started:
+                threading.Thread(target=self._dispatch_loop, name='notification-dispatch', daemon=True).start()
+                self._started = True
+
+    # --- coalescing and delivery ---
+
+    def _fold(self, pending, item):
+        order_id, at = item
+        self.stats['events'] += 1
+        if order_id in pending:
+            pending[order_id][1] = at
+            self.stats['coalesced'] += 1
+        else:
+            pending[order_id] = [at, at]
+
+    def _dispatch_loop(self):
+        config = self.app.config
+        window = config['NOTIFICATION_COALESCE_WINDOW']
+        max_delay = config['NOTIFICATION_MAX_DELAY']
+        tick = max(0.01, min(window / 4, 0.25))
+        pending = {}  # order_id -> [first_seen, last_seen]
+        while True:
+            try:
+                self._fold(pending, self._events.get(timeout=tick))
+                # Drain what is queued, but come up for air under sustained load
+                for _ in range(10000):
+                    self._fold(pending, self._events.get_nowait())
+            except queue.Empty:
+                pass
+
+            now = time.monotonic()
+            due = [order_id for order_id, (first, last) in pending.items()
+                   if now - last >= window or now - first >= max_delay]
+            for order_id in due:
+                del pending[order_id]
+            for start in range(0, len(due), config['NOTIFICATION_BATCH_SIZE']):
+                self._deliver(due[start:start + config['NOTIFICATION_BATCH_SIZE']])
+
+    def _deliver(self, order_ids):
+        with self.app.app_context():
+            try:
+                # The current status is the coalesced one: whatever the order settled on
+                orders = Order.query.options(joinedload(Order.user)).filter(Order.id.in_(order_ids)).all()
+                notifications = [build_notification(order) for order in orders]
+            except Exception:
+                logger.exception("Could not load %d orders for notification", len(order_ids))
+                self.stats['failed'] += len(order_ids)
+                return
+            finally:
+                db.session.remove()
+        for name, channel in list(self.channels.items()):
+            try:
+                channel.send(notifications)
+                self.stats['delivered'] += len(notifications)
+            except Exception:
+                logger.exception("Notification channel %r failed for %d notifications", name, len(notifications))
+                self.stats['failed'] += len(notifications)
+
+    def status(self):
+        return dict(self.stats, queued=self._events.qsize(), channels=sorted(self.channels))
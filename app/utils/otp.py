@@ -0,0 +1,155 @@
+import hmac
+import random
+import threading
+import time
+
+# Outcomes of OTPService.verify()
+VERIFIED = 'verified'
+INVALID = 'invalid'
+EXPIRED = 'expired'      # nothing pending: never issued, already used or timed out
+LOCKED = 'locked'        # too many wrong guesses; a new code must be issued
+
+
+class MemoryOTPStore:
+    """Process-local store with per-key expiry, for development and tests"""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key, now):
+        item = self._data.get(key)
+        if item and item[1] <= now:
+            del self._data[key]
+            return None
+        return item
+
+    def put(self, key, code, ttl):
+        with self._lock:
+            now = time.time()
+            # Opportunistic sweep keeps abandoned registrations from piling up
+            if len(self._data) > 10000:
+                for k in [k for k, v in self._data.items() if v[1] <= now]:
+                    del self._data[k]
+            self._data[key] = ({'code': code, 'attempts': 0}, now + ttl)
+
+    def get(self, key):
+        """Return (state dict, expires_at) or None"""
+        with self._lock:
+            item = self._live(key, time.time())
+            return (dict(item[0]), item[1]) if item else None
+
+    def add_attempt(self, key):
+        """Count an attempt at a live code; (attempts so far, code) or None"""
+        with self._lock:
+            item = self._live(key, time.time())
+            if not item:
+                return None
+            item[0]['attempts'] += 1
+            return item[0]['attempts'], item[0]['code']
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class RedisOTPStore:
+    """One hash per email; Redis handles expiry, HINCRBY counts attempts"""
+
+    # Increment only a hash that still exists: a bare HINCRBY on an expired
+    # key would create one with no code and no TTL
+    ADD_ATTEMPT = """
+    if redis.call('EXISTS', KEYS[1]) == 0 then
+        return false
+    end
+    local attempts = redis.call('HINCRBY', KEYS[1], 'attempts', 1)
+    return {attempts, redis.call('HGET', KEYS[1], 'code')}
+    """
+
+    def __init__(self, url, prefix='otp:'):
+        import redis
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+        self._add_attempt = self.client.register_script(self.ADD_ATTEMPT)
+
+    def put(self, key, code, ttl):
+        pipe = self.client.pipeline()
+        pipe.delete(self.prefix + key)
+        pipe.hset(self.prefix + key, mapping={'code': code, 'attempts': 0})
+        pipe.expire(self.prefix + key, int(ttl))
+        pipe.execute()
+
+    def get(self, key):
+        pipe = self.client.pipeline()
+        pipe.hgetall(self.prefix + key)
+        pipe.ttl(self.prefix + key)
+        state, ttl = pipe.execute()
+        if not state or ttl < 0:
+            return None
+        return {'code': state['code'], 'attempts': int(state['attempts'])}, time.time() + ttl
+
+    def add_attempt(self, key):
+        result = self._add_attempt(keys=[self.prefix + key])
+        return (int(result[0]), result[1]) if result else None
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+
+class OTPService:
+    """Issues and checks one-time codes without writing to the users table"""
+
+    def __init__(self, app=None):
+        self.store = None
+        self.ttl = 600
+        self.max_attempts = 5
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('OTP_TTL', 10 * 60)
+        app.config.setdefault('OTP_MAX_ATTEMPTS', 5)
+        app.config.setdefault('OTP_STORAGE_URL', None)
+        self.ttl = app.config['OTP_TTL']
+        self.max_attempts = app.config['OTP_MAX_ATTEMPTS']
+        url = app.config['OTP_STORAGE_URL']
+        self.store = RedisOTPStore(url) if url else MemoryOTPStore()
+        app.extensions['otp'] = self
+
+    @staticmethod
+    def _key(email):
+        return email.strip().lower()
+
+    def issue(self, email):
+        """Create a fresh code for `email`, replacing any pending one"""
+        code = f"{random.SystemRandom().randint(100000, 999999)}"
+        self.store.put(self._key(email), code, self.ttl)
+        return code
+
+    def pending(self, email):
+        """(code, expires_at epoch seconds) of the pending code, or None"""
+        item = self.store.get(self._key(email))
+        return (item[0]['code'], item[1]) if item else None
+
+    def verify(self, email, code):
+        """Check `code` for `email`.
+
+        The attempt is counted before comparing, so parallel guesses can't
+        all slip in under the limit.
+        """
+        key = self._key(email)
+        counted = self.store.add_attempt(key)
+        if counted is None:
+            return EXPIRED
+        attempts, expected = counted
+        if attempts > self.max_attempts:
+            self.store.delete(key)
+            return LOCKED
+        # Bytes, as compare_digest rejects non-ASCII str (e.g. Arabic-Indic digits)
+        if hmac.compare_digest(expected.encode('utf-8'), (code or '').strip().encode('utf-8')):
+            self.store.delete(key)
+            return VERIFIED
+        if attempts >= self.max_attempts:
+            self.store.delete(key)
+            return LOCKED
+        return INVALID
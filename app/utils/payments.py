@@ -0,0 +1,289 @@
+import hashlib
+import hmac
+import json
+import logging
+import queue
+import threading
+from datetime import datetime, timedelta
+import urllib.error
+import urllib.request
+from app import db
+from app.models.order import OrderStatus, StatusConflict
+from app.models.payment import Payment, PaymentStatus
+from app.utils.concurrency import retry_on_conflict
+from app.utils.sharding import current_shard, use_shard
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = 'X-Gateway-Signature'
+
+# Gateway event type -> the payment state it settles to
+EVENT_STATUS = {
+    'payment_intent.succeeded': PaymentStatus.COMPLETED,
+    'payment_intent.payment_failed': PaymentStatus.FAILED,
+}
+
+
+def payment_reference(payment_id, shard=None):
+    """Gateway reference for a payment; ids repeat across shards, so it names the shard"""
+    return f"{shard}:{payment_id}" if shard else str(payment_id)
+
+
+def parse_reference(reference):
+    """(shard, payment_id) for a reference, or None if it isn't one of ours"""
+    shard, _, payment_id = str(reference or '').rpartition(':')
+    if not payment_id.isdigit():
+        return None
+    return shard or None, int(payment_id)
+
+
+def sign_payload(secret, body):
+    return hmac.new(secret.encode('utf-8'), body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(secret, body, signature):
+    return bool(signature) and hmac.compare_digest(sign_payload(secret, body), signature)
+
+
+class GatewayError(Exception):
+    """The payment gateway could not be reached or refused the request"""
+
+
+class GatewayClient:
+    """Minimal JSON client for a Stripe-style payment intents API"""
+
+    def __init__(self, base_url, api_key, timeout=10):
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.timeout = timeout
+
+    def create_intent(self, amount, reference, currency='inr'):
+        body = json.dumps({
+            'amount': int(round(amount * 100)),  # minor units, like Stripe
+            'currency': currency,
+            'reference': str(reference),
+        }).encode('utf-8')
+        req = urllib.request.Request(
+            f"{self.base_url}/v1/payment_intents",
+            data=body,
+            method='POST',
+            headers={
+                'Content-Type': 'application/json',
+                'Authorization': f"Bearer {self.api_key or ''}",
+                # Lets us resubmit after a timeout without double charging
+                'Idempotency-Key': f"payment-{reference}",
+            },
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                return json.loads(resp.read())
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            raise GatewayError(str(e)) from e
+
+
+class PaymentProcessor:
+    """Talks to the gateway off the request thread.
+
+    Checkout only records a PENDING payment and calls `submit()`. Worker
+    threads create the gateway intent and mark it PROCESSING. Queued
+    submissions live in memory, so the first worker to start requeues
+    recent PENDING payments that never reached the gateway, and checkout
+    resubmits one it finds still unsent. Webhooks are applied by
+    `apply_events` before they are acknowledged.
+
+    Payment ids are only unique per shard, so every queued item carries
+    the shard it was submitted from, workers run it under `use_shard`, and
+    the gateway reference is "<shard>:<id>" for payments off the primary.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._intents = queue.Queue()
+        self._started = False
+        self._start_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PAYMENT_GATEWAY_URL', 'http://127.0.0.1:8765')
+        app.config.setdefault('PAYMENT_WEBHOOK_SECRET', None)
+        app.config.setdefault('PAYMENT_WORKERS', 2)
+        app.config.setdefault('PAYMENT_SUBMIT_RETRIES', 5)
+        app.config.setdefault('PAYMENT_RESUME_HOURS', 24)
+        if not app.config['PAYMENT_WEBHOOK_SECRET']:
+            # Anyone could sign webhooks with a well-known key and confirm unpaid orders
+            if not (app.debug or app.testing):
+                raise RuntimeError("PAYMENT_WEBHOOK_SECRET must be set outside development and testing")
+            app.config['PAYMENT_WEBHOOK_SECRET'] = 'whsec_local'
+        self.app = app
+        app.extensions['payments'] = self
+
+    @property
+    def client(self):
+        config = self.app.config
+        return GatewayClient(config['PAYMENT_GATEWAY_URL'], config['STRIPE_SECRET_KEY'])
+
+    def _ensure_started(self):
+        # Threads start lazily so CLI commands and the reloader parent stay idle
+        if self._started:
+            return
+        with self._start_lock:
+            if self._started:
+                return
+            for i in range(self.app.config['PAYMENT_WORKERS']):
+                threading.Thread(target=self._submit_loop, name=f'payment-submit-{i}', daemon=True).start()
+            threading.Thread(target=self._resume_unsent, name='payment-resume', daemon=True).start()
+            self._started = True
+
+    def _resume_unsent(self):
+        """Requeue PENDING online payments that never got a gateway intent.
+
+        Submissions queued in a previous process died with it. Resubmitting
+        is safe: the gateway dedupes on the Idempotency-Key.
+        """
+        since = datetime.utcnow() - timedelta(hours=self.app.config['PAYMENT_RESUME_HOURS'])
+
+        def unsent():
+            return [row[0] for row in db.session.query(Payment.id).filter(
+                Payment.payment_mode == 'Online', Payment.status == PaymentStatus.PENDING,
+                Payment.transaction_id.is_(None), Payment.created_at >= since)]
+
+        try:
+            per_shard = self.app.extensions['shards'].fan_out(unsent)
+        except Exception:
+            logger.exception("Could not look for unsent payments")
+            return
+        for shard, ids in per_shard.items():
+            for payment_id in ids:
+                self._intents.put((shard, payment_id, 0))
+        requeued = sum(len(ids) for ids in per_shard.values())
+        if requeued:
+            logger.info("Requeued %d unsent payments", requeued)
+
+    # --- outbound: create intents ---
+
+    def submit(self, payment_id):
+        """Queue a PENDING payment of the current shard for submission to the gateway"""
+        self._ensure_started()
+        self._intents.put((current_shard(), payment_id, 0))
+
+    def _submit_loop(self):
+        while True:
+            shard, payment_id, attempt = self._intents.get()
+            with self.app.app_context(), use_shard(shard):
+                try:
+                    self.create_intent(payment_id, attempt)
+                except Exception:
+                    logger.exception("Payment %s: submission crashed", payment_id)
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
+
+    def create_intent(self, payment_id, attempt=0):
+        payment = db.session.get(Payment, payment_id)
+        if payment is None or payment.status != PaymentStatus.PENDING:
+            return
+
+        try:
+            intent = self.client.create_intent(payment.amount, reference=payment_reference(payment.id, current_shard()))
+        except GatewayError as e:
+            if attempt + 1 < self.app.config['PAYMENT_SUBMIT_RETRIES']:
+                logger.warning("Payment %s: gateway error (%s), retrying", payment_id, e)
+                threading.Timer(2 ** attempt, self._intents.put,
+                                args=((current_shard(), payment_id, attempt + 1),)).start()
+                return
+            intent = {'status': 'failed', 'error': str(e)}
+
+        def record():
+            payment = db.session.get(Payment, payment_id)
+            if payment.status != PaymentStatus.PENDING:
+                return  # the webhook beat us to it
+            if intent.get('id'):
+                payment.transaction_id = intent['id']
+            if intent.get('status') == 'failed':
+                payment.transition(PaymentStatus.FAILED, reason=intent.get('error') or 'Rejected by gateway')
+            else:
+                payment.transition(PaymentStatus.PROCESSING)
+            db.session.commit()
+
+        retry_on_conflict(record)
+
+    # --- inbound: webhooks ---
+
+    def apply_events(self, events):
+        """Settle payments for a webhook delivery; returns (changed, failed).
+
+        Events are grouped by the shard named in their reference and each
+        group is applied in one transaction on that shard. If that fails,
+        its events are retried one transaction each, so one bad event
+        can't hold up the rest. Duplicate deliveries and events for
+        already-settled payments are ignored, so the gateway may redeliver
+        freely.
+        """
+        known = set(self.app.extensions['shards'].names)
+        by_shard = {}
+        for event in events:
+            status = EVENT_STATUS.get(event.get('type'))
+            data = event.get('data') or {}
+            reference = data.get('reference')
+            if not status or not reference:
+                continue
+            parsed = parse_reference(reference)
+            if parsed is None or (parsed[0] is not None and parsed[0] not in known):
+                logger.warning("Ignoring payment event %s with reference %r", event.get('id'), reference)
+                continue
+            shard, payment_id = parsed
+            by_shard.setdefault(shard, {})[payment_id] = (status, data)
+
+        changed = failed = 0
+        for shard, settled in by_shard.items():
+            with use_shard(shard):
+                try:
+                    shard_changed, shard_failed = self._apply(shard, settled)
+                finally:
+                    # Ids repeat across shards; don't let the identity map mix them up
+                    db.session.expunge_all()
+            changed += shard_changed
+            failed += shard_failed
+        return changed, failed
+
+    def _apply(self, shard, settled):
+        try:
+            return retry_on_conflict(lambda: self._settle(settled)), 0
+        except Exception:
+            db.session.rollback()
+            if len(settled) == 1:
+                logger.exception("Failed to apply payment event for payment %s", payment_reference(next(iter(settled)), shard))
+                return 0, 1
+        changed = failed = 0
+        for payment_id, outcome in settled.items():
+            try:
+                changed += retry_on_conflict(lambda: self._settle({payment_id: outcome}))
+            except Exception:
+                logger.exception("Failed to apply payment event for payment %s", payment_reference(payment_id, shard))
+                db.session.rollback()
+                failed += 1
+        return changed, failed
+
+    def _settle(self, settled):
+        payments = Payment.query.filter(Payment.id.in_(list(settled))).all()
+        changed = 0
+        for payment in payments:
+            status, data = settled[payment.id]
+            if not payment.can_transition(status):
+                continue
+            payment.transaction_id = payment.transaction_id or data.get('id')
+            payment.transition(status, reason=data.get('failure_message'))
+            changed += 1
+            if status == PaymentStatus.COMPLETED and payment.order:
+                try:
+                    payment.order.update_status(
+                        OrderStatus.CONFIRMED,
+                        message="Online payment received",
+                        expected_status=OrderStatus.PENDING,
+                        commit=False
+                    )
+                except StatusConflict:
+                    pass
+        db.session.commit()
+        return changed
@@ -0,0 +1,164 @@
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from functools import wraps
+from flask import current_app, request
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {
+    'second': 1,
+    'minute': 60,
+    'hour': 60 * 60,
+    'day': 24 * 60 * 60,
+}
+
+
+def parse_rate(rate):
+    """Turn '5/minute' into (capacity, refill tokens per second)"""
+    count, _, period = rate.partition('/')
+    count = int(count)
+    return count, count / PERIODS[period.strip().rstrip('s')]
+
+
+def client_ip():
+    return request.remote_addr or 'unknown'
+
+
+def request_email():
+    """Email being acted on, wherever the route takes it from"""
+    email = (request.view_args or {}).get('email') \
+        or request.args.get('email') \
+        or request.form.get('email')
+    return email.strip().lower() if email else None
+
+
+class MemoryBackend:
+    """In-process buckets; fine for a single worker and for tests"""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, refill_rate, now=None):
+        """Consume one token. Returns seconds to wait, 0 when allowed."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, stamp = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - stamp) * refill_rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0
+            else:
+                wait = (1 - tokens) / refill_rate
+            self._buckets[key] = (tokens, now)
+            # Evict least recently seen keys so a spray of IPs can't grow us forever
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class RedisBackend:
+    """Buckets shared by all workers, updated atomically with a Lua script"""
+
+    SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local state = redis.call('HMGET', KEYS[1], 't', 's')
+    local tokens = tonumber(state[1]) or capacity
+    local stamp = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - stamp) * rate)
+    local wait = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+    else
+        wait = (1 - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 't', tokens, 's', now)
+    redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+    return tostring(wait)
+    """
+
+    def __init__(self, url, prefix='rl:'):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._take = self.client.register_script(self.SCRIPT)
+
+    def take(self, key, capacity, refill_rate, now=None):
+        now = time.time() if now is None else now
+        return float(self._take(keys=[self.prefix + key], args=[capacity, refill_rate, now]))
+
+    def reset(self):
+        for key in self.client.scan_iter(self.prefix + '*'):
+            self.client.delete(key)
+
+
+class RateLimiter:
+    """Token-bucket limiter applied to views through `limit()` decorators"""
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.counters = defaultdict(lambda: {'allowed': 0, 'rejected': 0})
+        self._counter_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('RATELIMIT_ENABLED', True)
+        app.config.setdefault('RATELIMIT_STORAGE_URL', None)
+        url = app.config['RATELIMIT_STORAGE_URL']
+        self.backend = RedisBackend(url) if url else MemoryBackend()
+        app.extensions['ratelimiter'] = self
+
+    def _count(self, scope, outcome):
+        with self._counter_lock:
+            self.counters[scope][outcome] += 1
+
+    def stats(self):
+        with self._counter_lock:
+            return {scope: dict(c) for scope, c in self.counters.items()}
+
+    def hit(self, scope, key, rate):
+        """Take a token for `key` under `scope`; returns seconds to wait"""
+        capacity, refill_rate = parse_rate(rate)
+        try:
+            wait = self.backend.take(f"{scope}:{key}", capacity, refill_rate)
+        except Exception as e:
+            # Never take the site down because the limiter store is unreachable
+            logger.warning("Rate limiter backend error, allowing request: %s", e)
+            return 0
+        self._count(scope, 'rejected' if wait else 'allowed')
+        return wait
+
+    def limit(self, rate, key=client_ip, scope=None, methods=None):
+        """Reject requests over `rate` (e.g. '5/minute') per `key()` with a 429"""
+        def decorator(f):
+            bucket_scope = scope or f"{f.__name__}:{key.__name__}"
+
+            @wraps(f)
+            def wrapper(*args, **kwargs):
+                if not current_app.config['RATELIMIT_ENABLED'] \
+                        or (methods and request.method not in methods):
+                    return f(*args, **kwargs)
+                value = key()
+                if value is not None:
+                    wait = self.hit(bucket_scope, value, rate)
+                    if wait:
+                        return current_app.response_class(
+                            'Too many requests. Please slow down.\n',
+                            status=429,
+                            mimetype='text/plain',
+                            headers={'Retry-After': str(max(1, math.ceil(wait)))}
+                        )
+                return f(*args, **kwargs)
+            return wrapper
+        return decorator
@@ -0,0 +1,164 @@
+"""Reconcile our payments against the gateway's daily settlement file.
+
+The file is streamed row by row and matched against `payments` in chunks
+through the unique index on `transaction_id`, so memory stays flat no matter
+how long the file is. Transaction ids seen in the file are spilled to a
+temporary on-disk SQLite table; a final pass over our own payments probes it
+to find settlements the gateway never reported.
+"""
+import csv
+import math
+import os
+import sqlite3
+import tempfile
+import time
+from app import db
+from app.models.payment import Payment, PaymentStatus
+
+# Settlement file status -> our PaymentStatus
+GATEWAY_STATUS = {
+    'succeeded': PaymentStatus.COMPLETED,
+    'settled': PaymentStatus.COMPLETED,
+    'paid': PaymentStatus.COMPLETED,
+    'failed': PaymentStatus.FAILED,
+    'declined': PaymentStatus.FAILED,
+    'pending': PaymentStatus.PROCESSING,
+    'processing': PaymentStatus.PROCESSING,
+}
+
+REPORT_FIELDS = ['kind', 'transaction_id', 'file_amount', 'db_amount', 'file_status', 'db_status']
+
+MISSING_IN_DB = 'missing_in_db'
+MISSING_IN_FILE = 'missing_in_file'
+AMOUNT_DIFFERS = 'amount_differs'
+STATUS_DIFFERS = 'status_differs'
+MALFORMED = 'malformed'  # amount blank or not a number; reported, not matched
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def read_settlement_file(path):
+    """Yield (transaction_id, amount, status) from a settlement CSV.
+
+    Expects a header with at least `transaction_id`, `amount` and `status`.
+    A blank or unparseable amount comes through as None.
+    """
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            txn = (row.get('transaction_id') or '').strip()
+            if not txn:
+                continue
+            try:
+                amount = float(row.get('amount'))
+            except (TypeError, ValueError):
+                amount = None
+            if amount is not None and not math.isfinite(amount):
+                amount = None
+            yield txn, amount, (row.get('status') or '').strip().lower()
+
+
+class Reconciler:
+
+    def __init__(self, chunk_size=5000, tolerance=0.005):
+        self.chunk_size = chunk_size
+        self.tolerance = tolerance
+        self.counts = {
+            'file_rows': 0,
+            'matched': 0,
+            MISSING_IN_DB: 0,
+            MISSING_IN_FILE: 0,
+            AMOUNT_DIFFERS: 0,
+            STATUS_DIFFERS: 0,
+            MALFORMED: 0,
+        }
+
+    def _emit(self, writer, kind, txn, file_amount=None, db_amount=None, file_status=None, db_status=None):
+        self.counts[kind] += 1
+        writer.writerow([kind, txn, file_amount, db_amount, file_status, db_status.value if db_status else None])
+
+    def compare_chunk(self, chunk, writer):
+        """Match one chunk of file rows with a single indexed IN lookup"""
+        ids = [row[0] for row in chunk]
+        found = {
+            txn: (amount, status)
+            for txn, amount, status in db.session.query(
+                Payment.transaction_id, Payment.amount, Payment.status
+            ).filter(Payment.transaction_id.in_(ids))
+        }
+        for txn, file_amount, file_status in chunk:
+            if file_amount is None:
+                db_amount, db_status = found.get(txn, (None, None))
+                self._emit(writer, MALFORMED, txn, None, db_amount, file_status, db_status)
+                continue
+            if txn not in found:
+                self._emit(writer, MISSING_IN_DB, txn, file_amount=file_amount, file_status=file_status)
+                continue
+            db_amount, db_status = found[txn]
+            self.counts['matched'] += 1
+            if abs(db_amount - file_amount) > self.tolerance:
+                self._emit(writer, AMOUNT_DIFFERS, txn, file_amount, db_amount, file_status, db_status)
+            expected = GATEWAY_STATUS.get(file_status)
+            if expected is not None and expected != db_status:
+                self._emit(writer, STATUS_DIFFERS, txn, file_amount, db_amount, file_status, db_status)
+
+    def run(self, settlement_path, report_path, since=None, until=None):
+        """Reconcile `settlement_path`, writing mismatches to `report_path`.
+
+        `since`/`until` bound which of our online payments are expected to
+        appear in the file (by `created_at`); without them the
+        missing-in-file pass is skipped.
+        """
+        started = time.perf_counter()
+        spill_fd, spill_path = tempfile.mkstemp(suffix='.sqlite')
+        os.close(spill_fd)
+        spill = sqlite3.connect(spill_path)
+        spill.execute('CREATE TABLE seen (txn TEXT PRIMARY KEY) WITHOUT ROWID')
+
+        try:
+            with open(report_path, 'w', newline='', encoding='utf-8') as out:
+                writer = csv.writer(out)
+                writer.writerow(REPORT_FIELDS)
+
+                for chunk in _chunks(read_settlement_file(settlement_path), self.chunk_size):
+                    self.counts['file_rows'] += len(chunk)
+                    self.compare_chunk(chunk, writer)
+                    spill.executemany('INSERT OR IGNORE INTO seen VALUES (?)', [(row[0],) for row in chunk])
+                    # Don't let the identity map grow across the whole file
+                    db.session.expunge_all()
+                spill.commit()
+
+                if since is not None or until is not None:
+                    self._missing_in_file(spill, writer, since, until)
+        finally:
+            spill.close()
+            os.remove(spill_path)
+
+        self.counts['seconds'] = round(time.perf_counter() - started, 2)
+        return self.counts
+
+    def _missing_in_file(self, spill, writer, since, until):
+        query = db.session.query(Payment.transaction_id, Payment.amount, Payment.status)\
+            .filter(Payment.transaction_id.isnot(None), Payment.payment_mode == 'Online')
+        if since is not None:
+            query = query.filter(Payment.created_at >= since)
+        if until is not None:
+            query = query.filter(Payment.created_at < until)
+
+        for chunk in _chunks(query.yield_per(self.chunk_size), self.chunk_size):
+            placeholders = ','.join('?' * len(chunk))
+            seen = {row[0] for row in spill.execute(
+                f'SELECT txn FROM seen WHERE txn IN ({placeholders})', [row[0] for row in chunk]
+            )}
+            for txn, amount, status in chunk:
+                if txn not in seen:
+                    self._emit(writer, MISSING_IN_FILE, txn, db_amount=amount, db_status=status)
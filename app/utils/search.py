@@ -0,0 +1,263 @@
+"""In-memory order search for owners and support staff.
+
+An inverted index over order number, customer username and phone, and
+delivery city, pincode and phone, partitioned by station so an owner's
+search only ever looks at their own stations' postings. Every query term is
+prefix-matched against a sorted vocabulary (bisect), and terms are ANDed.
+
+The index is built with one streaming query on first use, then kept current
+from the session's after-commit hook. Rebuilds scan into a fresh corpus
+outside the lock, so commits never wait on them; changes committed
+meanwhile are buffered and replayed before the new corpus is swapped in. Orders created by other workers are
+picked up with an indexed `orders.id > last seen id` probe before each
+search; edits made elsewhere arrive with the periodic rebuild.
+"""
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from sqlalchemy import event, select
+from app import db
+from app.models.address import Address
+from app.models.fuel import FuelType
+from app.models.order import Order
+from app.models.user import User
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+PHONE_RE = re.compile(r'^\s*\+?[\d\s()-]{11,}$')
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or '').lower())
+
+
+def phone_tokens(phone):
+    digits = re.sub(r'\D', '', phone or '')
+    # Index the bare 10-digit number too, so searches can skip the country code
+    return {digits, digits[-10:]} - {''}
+
+
+def document_tokens(row):
+    tokens = set(tokenize(row.order_number))
+    tokens.update(tokenize(row.username))
+    tokens.update(tokenize(row.city))
+    tokens.update(tokenize(row.pincode))
+    tokens.update(phone_tokens(row.user_phone))
+    tokens.update(phone_tokens(row.address_phone))
+    return tokens
+
+
+class _Postings:
+    """Token -> order ids for one station, with a sorted vocabulary"""
+
+    def __init__(self):
+        self.postings = {}
+        self.vocabulary = []
+
+    def add(self, order_id, tokens, sort=True):
+        for token in tokens:
+            ids = self.postings.get(token)
+            if ids is None:
+                ids = self.postings[token] = set()
+                if sort:
+                    insort(self.vocabulary, token)
+            ids.add(order_id)
+
+    def sort(self):
+        """Rebuild the vocabulary after a run of add(sort=False)"""
+        self.vocabulary = sorted(self.postings)
+
+    def remove(self, order_id, tokens):
+        for token in tokens:
+            ids = self.postings.get(token)
+            if ids is None:
+                continue
+            ids.discard(order_id)
+            if not ids:
+                del self.postings[token]
+                del self.vocabulary[bisect_left(self.vocabulary, token)]
+
+    def prefix_ids(self, prefix):
+        start = bisect_left(self.vocabulary, prefix)
+        matched = set()
+        for token in self.vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            matched |= self.postings[token]
+        return matched
+
+
+class _Corpus:
+    """Per-station postings plus each order's (station, tokens) for re-indexing"""
+
+    def __init__(self):
+        self.shards = {}
+        self.documents = {}
+        self.max_order_id = 0
+
+    def index_row(self, row, sort=True):
+        tokens = document_tokens(row)
+        old = self.documents.get(row.id)
+        if old:
+            self.shards[old[0]].remove(row.id, old[1])
+        self.shards.setdefault(row.station_id, _Postings()).add(row.id, tokens, sort)
+        self.documents[row.id] = (row.station_id, tokens)
+        self.max_order_id = max(self.max_order_id, row.id)
+
+    def remove(self, order_id):
+        old = self.documents.pop(order_id, None)
+        if old:
+            self.shards[old[0]].remove(order_id, old[1])
+
+    def apply(self, deleted, rows):
+        for order_id in deleted:
+            self.remove(order_id)
+        for row in rows:
+            self.index_row(row)
+
+
+class OrderSearchIndex:
+
+    def __init__(self, app=None):
+        self._corpus = _Corpus()
+        self._built_at = None
+        self._building = None
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._listening = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('SEARCH_REBUILD_INTERVAL', 30 * 60)
+        self.rebuild_interval = app.config['SEARCH_REBUILD_INTERVAL']
+        if not self._listening:
+            event.listen(db.session, 'after_flush', self._collect_changes)
+            event.listen(db.session, 'after_commit', self._apply_changes)
+            event.listen(db.session, 'after_rollback', self._discard_changes)
+            self._listening = True
+        app.extensions['order_search'] = self
+
+    # --- loading ---
+
+    @staticmethod
+    def _select():
+        return select(
+            Order.id, Order.order_number, FuelType.station_id,
+            User.username, User.phone.label('user_phone'),
+            Address.city, Address.pincode, Address.phone.label('address_phone')
+        ).select_from(Order)\
+            .join(FuelType, Order.fuel_type_id == FuelType.id)\
+            .join(User, Order.user_id == User.id)\
+            .join(Address, Order.delivery_address_id == Address.id)
+
+    def build(self):
+        """Full rebuild with one streaming scan, without holding the lock"""
+        with self._lock:
+            self._building = []
+        try:
+            corpus = _Corpus()
+            with db.engine.connect() as conn:
+                result = conn.execution_options(stream_results=True, yield_per=10000).execute(self._select())
+                for row in result:
+                    corpus.index_row(row, sort=False)
+            for shard in corpus.shards.values():
+                shard.sort()
+            with self._lock:
+                # Replay anything committed while we were scanning
+                for deleted, rows in self._building:
+                    corpus.apply(deleted, rows)
+                self._corpus = corpus
+                self._built_at = time.monotonic()
+        finally:
+            with self._lock:
+                self._building = None
+
+    def _stale(self):
+        return self._built_at is None or time.monotonic() - self._built_at > self.rebuild_interval
+
+    def _refresh(self):
+        # Single flight: only the first build makes searches wait
+        if self._stale() and self._build_lock.acquire(blocking=self._built_at is None):
+            try:
+                if self._stale():
+                    self.build()
+                    return
+            finally:
+                self._build_lock.release()
+        with db.engine.connect() as conn:
+            rows = conn.execute(self._select().where(Order.id > self._corpus.max_order_id)).all()
+        if rows:
+            with self._lock:
+                for row in rows:
+                    self._corpus.index_row(row)
+
+    # --- incremental updates ---
+
+    def _collect_changes(self, session, flush_context):
+        pending = session.info.setdefault('order_search', {'orders': set(), 'users': set(), 'addresses': set(), 'deleted': set()})
+        for obj in list(session.new) + list(session.dirty):
+            if isinstance(obj, Order):
+                pending['orders'].add(obj.id)
+            elif isinstance(obj, User):
+                pending['users'].add(obj.id)
+            elif isinstance(obj, Address):
+                pending['addresses'].add(obj.id)
+        for obj in session.deleted:
+            if isinstance(obj, Order):
+                pending['deleted'].add(obj.id)
+
+    def _discard_changes(self, session):
+        session.info.pop('order_search', None)
+
+    def _apply_changes(self, session):
+        pending = session.info.pop('order_search', None)
+        if not pending or (self._built_at is None and self._building is None):
+            return  # nothing to do, or not built yet (the first build sees it all)
+        clauses = []
+        if pending['orders']:
+            clauses.append(Order.id.in_(pending['orders']))
+        if pending['users']:
+            clauses.append(Order.user_id.in_(pending['users']))
+        if pending['addresses']:
+            clauses.append(Order.delivery_address_id.in_(pending['addresses']))
+        rows = []
+        if clauses:
+            with db.engine.connect() as conn:
+                rows = conn.execute(self._select().where(db.or_(*clauses))).all()
+        with self._lock:
+            if self._building is not None:
+                self._building.append((pending['deleted'], rows))
+            if self._built_at is not None:
+                self._corpus.apply(pending['deleted'], rows)
+
+    # --- querying ---
+
+    def search(self, query, station_ids=None, limit=50):
+        """Order ids matching every term of `query` (as prefixes), newest first.
+
+        `station_ids=None` searches every station (support staff).
+        """
+        terms = set(tokenize(query))
+        if PHONE_RE.match(query or ''):
+            # "+91 98765-43210" and friends: search the bare number
+            terms = {re.sub(r'\D', '', query)[-10:]}
+        if not terms:
+            return []
+
+        self._refresh()
+        with self._lock:
+            postings = self._corpus.shards
+            shards = postings.values() if station_ids is None else \
+                [postings[s] for s in station_ids if s in postings]
+            found = set()
+            for shard in shards:
+                # Rarest term first keeps the intersections small
+                matches = sorted((shard.prefix_ids(term) for term in terms), key=len)
+                ids = set(matches[0])
+                for other in matches[1:]:
+                    ids &= other
+                    if not ids:
+                        break
+                found |= ids
+        return sorted(found, reverse=True)[:limit]
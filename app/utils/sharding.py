@@ -0,0 +1,175 @@
+"""City-based sharding of order data.
+
+Orders, their tracking rows and payments can live on per-region databases
+(SHARD_URLS, one Flask-SQLAlchemy bind each) while users, addresses,
+stations and fuels stay on the primary. SHARD_MAP routes a lowercase city
+or state to a shard; a city entry wins over its state, and anything
+unmapped stays on the primary.
+
+A user's shard is fixed in `users.home_shard` when they save their first
+address, as long as they have no orders on the primary yet, so existing
+customers keep their history where it is. Each request runs with the
+logged-in user's shard selected and `ShardedSession.get_bind` sends every
+statement touching a sharded table there, so `Order.query...` in customer
+views needs no changes. Sharded statements must not join primary tables;
+load those with a separate query (lazy or selectin loading).
+
+Work that spans users (admin reports) goes through `ShardRouter.fan_out`,
+which runs the same function against the primary and every shard
+concurrently and hands back the per-shard results to merge.
+
+Shard schemas hold only the sharded tables (`ShardRouter.create_all`).
+Their foreign keys to primary tables are not enforced by SQLite; on MySQL,
+create them without those constraints.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+import sqlalchemy as sa
+from sqlalchemy import event, exists
+from sqlalchemy.sql.util import find_tables
+from flask import g
+from flask_login import current_user
+from flask_sqlalchemy.session import Session
+
+SHARDED_TABLES = ('orders', 'order_tracking', 'payments')  # creation order
+
+_current = ContextVar('shard', default=None)
+
+
+def bind_key(shard):
+    return f'shard_{shard}'
+
+
+def current_shard():
+    """Shard selected for this request / fan-out worker; None means the primary"""
+    return _current.get()
+
+
+@contextmanager
+def use_shard(shard):
+    token = _current.set(shard)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def _touches_sharded(mapper, clause):
+    if mapper is not None:
+        return sa.inspect(mapper).local_table.name in SHARDED_TABLES
+    if clause is not None:
+        return any(t.name in SHARDED_TABLES for t in find_tables(clause, include_crud=True))
+    return False
+
+
+class ShardedSession(Session):
+    """Sends statements on sharded tables to the current shard's engine"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        shard = _current.get()
+        if shard is not None and bind is None and _touches_sharded(mapper, clause):
+            return self._db.engines[bind_key(shard)]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ShardRouter:
+
+    def __init__(self, app=None):
+        self.app = None
+        self.names = []
+        self.map = {}
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._listening = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Must run before `db.init_app`, as it adds the shard binds"""
+        app.config.setdefault('SHARD_URLS', {})
+        app.config.setdefault('SHARD_MAP', {})
+        app.config.setdefault('SHARD_FANOUT_WORKERS', 8)
+        urls = app.config['SHARD_URLS']
+        self.names = sorted(urls)
+        self.map = {key.strip().lower(): shard for key, shard in app.config['SHARD_MAP'].items()}
+        unknown = set(self.map.values()) - set(urls)
+        if unknown:
+            raise ValueError(f"SHARD_MAP routes to unknown shards: {', '.join(sorted(unknown))}")
+
+        binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+        binds.update({bind_key(name): url for name, url in urls.items()})
+        app.config['SQLALCHEMY_BINDS'] = binds
+
+        if urls:
+            from app.models.address import Address
+            if not self._listening:
+                event.listen(Address, 'after_insert', self._assign_home_shard)
+                self._listening = True
+            app.before_request(self._select_shard)
+            app.teardown_request(self._reset_shard)
+        self.app = app
+        app.extensions['shards'] = self
+
+    def route(self, city, state):
+        """Shard for an address; None for the primary"""
+        return self.map.get((city or '').strip().lower()) or self.map.get((state or '').strip().lower())
+
+    # --- per-request routing ---
+
+    def _select_shard(self):
+        shard = getattr(current_user, 'home_shard', None) if current_user.is_authenticated else None
+        if shard in self.names:
+            g._shard_token = _current.set(shard)
+
+    def _reset_shard(self, exc=None):
+        token = g.pop('_shard_token', None)
+        if token is not None:
+            _current.reset(token)
+
+    def _assign_home_shard(self, mapper, connection, target):
+        # Runs in the address's flush on the primary; users with legacy orders stay put
+        shard = self.route(target.city, target.state)
+        if shard is None:
+            return
+        from app.models.order import Order
+        from app.models.user import User
+        users, orders = User.__table__, Order.__table__
+        connection.execute(
+            users.update()
+            .where(users.c.id == target.user_id, users.c.home_shard.is_(None),
+                   ~exists().where(orders.c.user_id == users.c.id))
+            .values(home_shard=shard)
+        )
+
+    # --- schema and fan-out ---
+
+    def create_all(self):
+        db = self.app.extensions['sqlalchemy']
+        tables = [db.metadata.tables[name] for name in SHARDED_TABLES]
+        for name in self.names:
+            db.metadata.create_all(db.engines[bind_key(name)], tables=tables)
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.app.config['SHARD_FANOUT_WORKERS'],
+                        thread_name_prefix='shard-fanout'
+                    )
+        return self._executor
+
+    def fan_out(self, fn, *args, **kwargs):
+        """{shard: fn(*args, **kwargs)} run on the primary (None) and every shard concurrently"""
+        app = self.app
+
+        def run(shard):
+            with app.app_context(), use_shard(shard):
+                return fn(*args, **kwargs)
+
+        targets = [None] + self.names
+        if len(targets) == 1:
+            return {None: run(None)}
+        return dict(zip(targets, self._get_executor().map(run, targets)))
@@ -0,0 +1,48 @@
+"""Streamed rendering of long list pages.
+
+`stream_page` renders with Flask's `stream_template`, so the page head and
+the first rows go out while later rows are still being loaded. Jinja emits
+a chunk per template statement; these are coalesced into
+STREAM_BUFFER_BYTES pieces so each network write (and each gzip flush) is a
+sensible size. Rows come from `chunked`, which walks a query in keyset
+pages, so memory stays at one page however long the list is.
+"""
+from flask import Response, current_app, stream_template
+
+
+def chunked(query, column, size=None):
+    """Rows of `query`, highest `column` first, fetched `size` at a time.
+
+    `query` must not be ordered already; eager-load whatever the template
+    touches so each page costs a fixed number of queries.
+    """
+    size = size or current_app.config.get('STREAM_PAGE_SIZE', 200)
+    last = None
+    while True:
+        page = query if last is None else query.filter(column < last)
+        rows = page.order_by(column.desc()).limit(size).all()
+        yield from rows
+        if len(rows) < size:
+            return
+        last = getattr(rows[-1], column.key)
+
+
+def _coalesce(chunks, min_bytes):
+    buffer, buffered = [], 0
+    try:
+        for chunk in chunks:
+            buffer.append(chunk)
+            buffered += len(chunk)
+            if buffered >= min_bytes:
+                yield ''.join(buffer)
+                buffer, buffered = [], 0
+        if buffer:
+            yield ''.join(buffer)
+    finally:
+        chunks.close()  # ends the request context stream_template kept open
+
+
+def stream_page(template_name, **context):
+    """A streamed HTML response for `template_name`"""
+    chunks = stream_template(template_name, **context)
+    return Response(_coalesce(chunks, current_app.config.get('STREAM_BUFFER_BYTES', 8192)), mimetype='text/html')
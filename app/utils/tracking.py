@@ -0,0 +1,295 @@
+"""Live delivery-partner positions.
+
+Pings arrive in batches and only touch a ring buffer: the latest fix per
+partner plus a bounded recent trail (in process, or in Redis so every
+worker sees the same positions). Everything received since the last flush
+is also queued per partner; a background flusher drains that queue every
+TRACKING_FLUSH_INTERVAL seconds, thins each trail with Douglas-Peucker and
+writes it with one executemany INSERT, plus one UPDATE of the partners'
+last known positions.
+"""
+import logging
+import math
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from sqlalchemy import bindparam
+from app import db
+from app.models.delivery import DeliveryPartner, LocationPoint
+
+logger = logging.getLogger(__name__)
+
+METERS_PER_DEGREE = 111320.0
+
+
+def _offset_m(origin, point):
+    """Equirectangular (x, y) metres of `point` from `origin`; plenty for a city"""
+    x = (point[2] - origin[2]) * METERS_PER_DEGREE * math.cos(math.radians(origin[1]))
+    y = (point[1] - origin[1]) * METERS_PER_DEGREE
+    return x, y
+
+
+def simplify(points, tolerance_m):
+    """Douglas-Peucker over (ts, lat, lon) points, keeping both ends"""
+    if len(points) < 3 or tolerance_m <= 0:
+        return list(points)
+    origin = points[0]
+    xy = [_offset_m(origin, p) for p in points]
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        (x1, y1), (x2, y2) = xy[first], xy[last]
+        dx, dy = x2 - x1, y2 - y1
+        length = math.hypot(dx, dy)
+        worst, worst_index = 0.0, None
+        for i in range(first + 1, last):
+            x, y = xy[i]
+            if length:
+                d = abs(dy * x - dx * y + x2 * y1 - y2 * x1) / length
+            else:
+                d = math.hypot(x - x1, y - y1)
+            if d > worst:
+                worst, worst_index = d, i
+        if worst_index is not None and worst > tolerance_m:
+            keep[worst_index] = True
+            stack.append((first, worst_index))
+            stack.append((worst_index, last))
+    return [p for p, k in zip(points, keep) if k]
+
+
+class MemoryLocationStore:
+    """Per-process ring buffers, for development and single-worker setups"""
+
+    def __init__(self, trail_size=256, pending_size=4096):
+        self._latest = {}
+        self._trails = {}
+        self._pending = {}
+        self.trail_size = trail_size
+        self.pending_size = pending_size
+        self._lock = threading.Lock()
+
+    def add(self, partner_id, points):
+        with self._lock:
+            trail = self._trails.get(partner_id)
+            if trail is None:
+                trail = self._trails[partner_id] = deque(maxlen=self.trail_size)
+                self._pending[partner_id] = deque(maxlen=self.pending_size)
+            trail.extend(points)
+            self._pending[partner_id].extend(points)
+            self._latest[partner_id] = points[-1]
+
+    def latest(self, partner_id):
+        return self._latest.get(partner_id)
+
+    def latest_many(self, partner_ids):
+        return {pid: self._latest[pid] for pid in partner_ids if pid in self._latest}
+
+    def trail(self, partner_id):
+        with self._lock:
+            return list(self._trails.get(partner_id, ()))
+
+    def drain(self):
+        """{partner_id: points} received since the last drain"""
+        with self._lock:
+            drained = {pid: list(q) for pid, q in self._pending.items() if q}
+            for pid in drained:
+                self._pending[pid].clear()
+        return drained
+
+    def requeue(self, drained):
+        """Put drained points back ahead of anything received since"""
+        with self._lock:
+            for pid, points in drained.items():
+                pending = self._pending.get(pid, ())
+                self._pending[pid] = deque(list(points) + list(pending), maxlen=self.pending_size)
+
+
+class RedisLocationStore:
+    """Ring buffers shared by all workers: capped lists plus a hash of latest fixes"""
+
+    def __init__(self, url, trail_size=256, pending_size=4096, prefix='loc:'):
+        import redis
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.trail_size = trail_size
+        self.pending_size = pending_size
+        self.prefix = prefix
+
+    @staticmethod
+    def _pack(point):
+        return '%.3f,%.6f,%.6f' % point
+
+    @staticmethod
+    def _unpack(value):
+        ts, lat, lon = value.split(',')
+        return float(ts), float(lat), float(lon)
+
+    def add(self, partner_id, points):
+        packed = [self._pack(p) for p in points]
+        pipe = self.client.pipeline(transaction=False)
+        pipe.rpush(f"{self.prefix}trail:{partner_id}", *packed)
+        pipe.ltrim(f"{self.prefix}trail:{partner_id}", -self.trail_size, -1)
+        pipe.rpush(f"{self.prefix}pending:{partner_id}", *packed)
+        pipe.ltrim(f"{self.prefix}pending:{partner_id}", -self.pending_size, -1)
+        pipe.hset(f"{self.prefix}latest", partner_id, packed[-1])
+        pipe.sadd(f"{self.prefix}dirty", partner_id)
+        pipe.execute()
+
+    def latest(self, partner_id):
+        value = self.client.hget(f"{self.prefix}latest", partner_id)
+        return self._unpack(value) if value else None
+
+    def latest_many(self, partner_ids):
+        partner_ids = list(partner_ids)
+        if not partner_ids:
+            return {}
+        values = self.client.hmget(f"{self.prefix}latest", partner_ids)
+        return {pid: self._unpack(v) for pid, v in zip(partner_ids, values) if v}
+
+    def trail(self, partner_id):
+        return [self._unpack(v) for v in self.client.lrange(f"{self.prefix}trail:{partner_id}", 0, -1)]
+
+    def drain(self):
+        drained = {}
+        for pid in self.client.spop(f"{self.prefix}dirty", 10000) or []:
+            # LRANGE + DEL in one MULTI, so no ping is lost or persisted twice
+            pipe = self.client.pipeline(transaction=True)
+            pipe.lrange(f"{self.prefix}pending:{pid}", 0, -1)
+            pipe.delete(f"{self.prefix}pending:{pid}")
+            values, _ = pipe.execute()
+            if values:
+                drained[int(pid)] = [self._unpack(v) for v in values]
+        return drained
+
+    def requeue(self, drained):
+        pipe = self.client.pipeline(transaction=False)
+        for pid, points in drained.items():
+            # LPUSH reverses its arguments, so push newest first to keep time order
+            pipe.lpush(f"{self.prefix}pending:{pid}", *[self._pack(p) for p in reversed(points)])
+            pipe.ltrim(f"{self.prefix}pending:{pid}", -self.pending_size, -1)
+            pipe.sadd(f"{self.prefix}dirty", pid)
+        pipe.execute()
+
+
+class LocationTracker:
+
+    def __init__(self, app=None):
+        self.app = None
+        self.store = None
+        self._started = False
+        self._start_lock = threading.Lock()
+        self.stats = {'pings': 0, 'rejected': 0, 'persisted': 0, 'flushes': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('TRACKING_STORAGE_URL', None)
+        app.config.setdefault('TRACKING_TRAIL_SIZE', 256)
+        app.config.setdefault('TRACKING_FLUSH_INTERVAL', 30.0)
+        app.config.setdefault('TRACKING_SIMPLIFY_METERS', 15.0)
+        app.config.setdefault('TRACKING_MAX_BATCH', 500)
+        app.config.setdefault('TRACKING_MAX_AGE', 86400.0)
+        app.config.setdefault('TRACKING_MAX_CLOCK_SKEW', 300.0)
+        url = app.config['TRACKING_STORAGE_URL']
+        size = app.config['TRACKING_TRAIL_SIZE']
+        self.store = RedisLocationStore(url, trail_size=size) if url else MemoryLocationStore(trail_size=size)
+        self.app = app
+        app.extensions['tracking'] = self
+
+    def _ensure_started(self):
+        if self._started:
+            return
+        with self._start_lock:
+            if not self._started:
+                threading.Thread(target=self._flush_loop, name='location-flush', daemon=True).start()
+                self._started = True
+
+    def record(self, partner_id, pings):
+        """Buffer a batch of (epoch seconds, lat, lon) pings; returns how many were kept.
+
+        Malformed or out-of-range pings and ones no newer than the partner's
+        latest fix are dropped. Timestamps must fall between TRACKING_MAX_AGE
+        seconds ago and TRACKING_MAX_CLOCK_SKEW seconds ahead; one in
+        milliseconds would otherwise become the latest fix and shadow every
+        later ping.
+        """
+        self._ensure_started()
+        now = time.time()
+        earliest = now - self.app.config['TRACKING_MAX_AGE']
+        latest = now + self.app.config['TRACKING_MAX_CLOCK_SKEW']
+        valid = []
+        for ping in pings:
+            try:
+                ts, lat, lon = float(ping[0]), float(ping[1]), float(ping[2])
+            except (TypeError, ValueError, IndexError, KeyError):
+                continue
+            if earliest <= ts <= latest and -90 <= lat <= 90 and -180 <= lon <= 180:
+                valid.append((ts, lat, lon))
+        valid.sort()
+
+        last = self.store.latest(partner_id)
+        newest = last[0] if last else float('-inf')
+        points = []
+        for point in valid:
+            if point[0] > newest:
+                points.append(point)
+                newest = point[0]
+        if points:
+            self.store.add(partner_id, points)
+        self.stats['pings'] += len(points)
+        self.stats['rejected'] += len(pings) - len(points)
+        return len(points)
+
+    def latest(self, partner_id):
+        return self.store.latest(partner_id)
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.app.config['TRACKING_FLUSH_INTERVAL'])
+            with self.app.app_context():
+                try:
+                    self.flush()
+                except Exception:
+                    logger.exception("Failed to persist partner locations")
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
+
+    def flush(self):
+        """Persist everything buffered since the last flush; returns rows written.
+
+        If the write fails the drained points go back in the queue for the
+        next flush.
+        """
+        drained = self.store.drain()
+        if not drained:
+            return 0
+        try:
+            written = self._write(drained)
+        except Exception:
+            db.session.rollback()
+            self.store.requeue(drained)
+            raise
+        self.stats['persisted'] += written
+        self.stats['flushes'] += 1
+        return written
+
+    def _write(self, drained):
+        tolerance = self.app.config['TRACKING_SIMPLIFY_METERS']
+        rows = []
+        for partner_id, points in drained.items():
+            for ts, lat, lon in simplify(points, tolerance):
+                rows.append({'partner_id': partner_id, 'recorded_at': datetime.utcfromtimestamp(ts),
+                             'latitude': lat, 'longitude': lon})
+        db.session.execute(LocationPoint.__table__.insert(), rows)
+
+        partners = DeliveryPartner.__table__
+        db.session.execute(
+            partners.update().where(partners.c.user_id == bindparam('_user'))
+            .values(latitude=bindparam('_lat'), longitude=bindparam('_lon')),
+            [{'_user': pid, '_lat': points[-1][1], '_lon': points[-1][2]} for pid, points in drained.items()]
+        )
+        db.session.commit()
+        return len(rows)
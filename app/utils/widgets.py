@@ -0,0 +1,78 @@
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor(app):
+    """Process-wide bounded pool shared by every dashboard"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=app.config.get('DASHBOARD_WORKERS', 8),
+                    thread_name_prefix='dashboard-widget'
+                )
+    return _executor
+
+
+class Widget:
+    """One independent piece of a dashboard.
+
+    `query` is called with the dashboard's keyword params inside its own app
+    context, so it gets its own session and pooled connection. Anything a
+    template touches later must be loaded eagerly: the session is closed as
+    soon as the widget finishes.
+    """
+
+    def __init__(self, name, query, fallback=None, timeout=None):
+        self.name = name
+        self.query = query
+        self.fallback = fallback
+        self.timeout = timeout
+
+    def default(self):
+        return self.fallback() if callable(self.fallback) else self.fallback
+
+
+def _run(app, widget, params):
+    with app.app_context():
+        return widget.query(**params)
+
+
+class Dashboard:
+    """Runs its widgets concurrently; page latency tracks the slowest one"""
+
+    def __init__(self, *widgets):
+        self.widgets = widgets
+
+    def load(self, **params):
+        app = current_app._get_current_object()
+        executor = get_executor(app)
+        default_timeout = app.config.get('DASHBOARD_WIDGET_TIMEOUT', 2.0)
+
+        started = time.monotonic()
+        # Widgets see the request's context variables (e.g. the selected shard)
+        futures = [(w, executor.submit(contextvars.copy_context().run, _run, app, w, params)) for w in self.widgets]
+
+        results = {}
+        for widget, future in futures:
+            deadline = started + (widget.timeout or default_timeout)
+            try:
+                results[widget.name] = future.result(timeout=max(0, deadline - time.monotonic()))
+            except TimeoutError:
+                future.cancel()
+                logger.warning("Dashboard widget %r timed out, using fallback", widget.name)
+                results[widget.name] = widget.default()
+            except Exception:
+                logger.exception("Dashboard widget %r failed, using fallback", widget.name)
+                results[widget.name] = widget.default()
+        return results
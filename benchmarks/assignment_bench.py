@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark for batch delivery-partner assignment.
+Fills one station slot with confirmed orders scattered around the city and
+a fleet of partners, then runs the assignment end to end (load, cost
+matrix, Hungarian solve, bulk UPDATE). Checks that no partner exceeds
+their stops or tank, and compares the solved cost with a greedy
+nearest-seat baseline on the same matrix.
+
+Usage: DATABASE_URL=sqlite:////tmp/assign.db python benchmarks/assignment_bench.py [orders] [partners]
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from sqlalchemy import func
+from app import create_app, db
+from app.models import User, FuelType, Address, Order, OrderStatus, DeliveryPartner
+from app.models.fuel_station import FuelStation
+from app.utils.assignment import INFEASIBLE, assign_slot, build_cost_matrix, min_cost_assignment
+
+ORDERS = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+PARTNERS = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+SLOT = '09:00-11:00'
+CENTER = (18.5204, 73.8567)  # Pune
+
+
+def scatter(rng, km):
+    """A point within roughly `km` of the centre"""
+    return (CENTER[0] + rng.uniform(-km, km) / 111.0, CENTER[1] + rng.uniform(-km, km) / 105.0)
+
+
+def setup(suffix, day):
+    db.create_all()
+    rng = random.Random(7)
+    owner = User(username=f'assign{suffix}', email=f'assign{suffix}@example.com', phone='9000000000', role='station_owner')
+    owner.set_password('assign')
+    db.session.add(owner)
+    db.session.flush()
+    station = FuelStation(name=f'Assign {suffix}', address='Pune', owner_id=owner.id,
+                          latitude=CENTER[0], longitude=CENTER[1])
+    db.session.add(station)
+    db.session.flush()
+    fuel = FuelType(name=f'Assign Fuel {suffix}', price_per_liter=100.0, station_id=station.id)
+    db.session.add(fuel)
+    db.session.flush()
+
+    users = User.__table__
+    db.session.execute(users.insert(), [{
+        'username': f'ap{suffix}_{i}', 'email': f'ap{suffix}_{i}@example.com', 'phone': '9000000000',
+        'password_hash': 'x', 'role': 'delivery_partner', 'is_verified': True, 'is_active': True,
+    } for i in range(PARTNERS)])
+    partner_ids = [u.id for u in User.query.filter(User.username.like(f'ap{suffix}_%'))]
+    db.session.execute(DeliveryPartner.__table__.insert(), [dict(
+        zip(('latitude', 'longitude'), scatter(rng, 8)),
+        user_id=uid, station_id=station.id, vehicle_capacity_liters=rng.choice([500.0, 1000.0, 2000.0]),
+        max_stops_per_slot=4, is_active=True,
+    ) for uid in partner_ids])
+
+    db.session.execute(Address.__table__.insert(), [dict(
+        zip(('latitude', 'longitude'), scatter(rng, 10)),
+        user_id=owner.id, name='Bench', phone='9000000000', address_line1=f'{i} Bench Road',
+        city='Pune', state='Maharashtra', pincode='411001', is_default=False,
+    ) for i in range(ORDERS)])
+    address_ids = [a.id for a in Address.query.filter_by(user_id=owner.id).order_by(Address.id)]
+    db.session.execute(Order.__table__.insert(), [{
+        'order_number': f'AS{suffix}{i:05d}', 'user_id': owner.id, 'fuel_type_id': fuel.id,
+        'quantity_liters': float(rng.choice([50, 100, 200, 400])), 'price_per_liter': 100.0,
+        'total_fuel_cost': 0.0, 'delivery_address_id': address_ids[i], 'delivery_date': day,
+        'delivery_time_slot': SLOT, 'total_amount': 0.0, 'status': OrderStatus.CONFIRMED, 'version': 1,
+    } for i in range(ORDERS)])
+    db.session.commit()
+    return station.id, fuel.id
+
+
+def greedy(cost):
+    """Each order in turn takes its cheapest free seat"""
+    taken, total = set(), 0.0
+    for row in cost:
+        for j in np.argsort(row):
+            if j not in taken and row[j] < INFEASIBLE:
+                taken.add(j)
+                total += row[j]
+                break
+    return total
+
+
+def main():
+    app = create_app(os.getenv('FLASK_CONFIG') or 'default')
+    weight = app.config.get('ASSIGNMENT_LOAD_WEIGHT', 2.0)
+    day = date.today() + timedelta(days=1)
+    suffix = int(time.time())
+
+    with app.app_context():
+        station_id, fuel_id = setup(suffix, day)
+        print(f"📥 {ORDERS} orders and {PARTNERS} partners ({PARTNERS * 4} seats) in one slot")
+
+        # Solver alone, on the same matrix assign_slot will build
+        rng = np.random.default_rng(7)
+        orders = [(i, float(rng.choice([50, 100, 200, 400])), *scatter(random.Random(i), 10)) for i in range(ORDERS)]
+        partners = [(i, *scatter(random.Random(10000 + i), 8), float(rng.choice([500, 1000, 2000])), 4, 0)
+                    for i in range(PARTNERS)]
+        cost, _ = build_cost_matrix(orders, partners, weight)
+        t = time.perf_counter()
+        pairs = min_cost_assignment(cost)
+        solve = time.perf_counter() - t
+        optimal = sum(cost[i, j] for i, j in pairs if cost[i, j] < INFEASIBLE)
+        baseline = greedy(cost)
+        print(f"🧮 Hungarian on {cost.shape[0]}x{cost.shape[1]}: {solve:.2f}s, "
+              f"cost {optimal:,.1f} vs greedy {baseline:,.1f} ({(1 - optimal / baseline) * 100:.1f}% lower)")
+
+        t = time.perf_counter()
+        written = assign_slot(station_id, day, SLOT, load_weight=weight)
+        total = time.perf_counter() - t
+        print(f"🚚 assign_slot wrote {written} assignments in {total:.2f}s end to end")
+
+        loads = db.session.query(
+            Order.delivery_partner_id, func.count(Order.id), func.sum(Order.quantity_liters),
+            DeliveryPartner.vehicle_capacity_liters, DeliveryPartner.max_stops_per_slot
+        ).join(DeliveryPartner, DeliveryPartner.user_id == Order.delivery_partner_id)\
+            .filter(Order.fuel_type_id == fuel_id).group_by(
+                Order.delivery_partner_id, DeliveryPartner.vehicle_capacity_liters, DeliveryPartner.max_stops_per_slot
+            ).all()
+        over = [row for row in loads if row[1] > row[4] or row[2] > row[3] + 1e-6]
+        print(f"   • Partners used: {len(loads)}, overloaded: {len(over)}")
+
+    if written and not over:
+        print("✅ Every assignment fits its partner's stops and tank")
+        return 0
+    print("❌ Assignment violated partner limits" if over else "❌ Nothing was assigned")
+    return 1
+
+
+if __name__ == "__main__":
+    exit(main())
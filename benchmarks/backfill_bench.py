@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark for chunked online backfills.
+Loads synthetic orders, blanks their status_updated_at, and refills it
+twice while a writer thread keeps updating single orders the way the app
+does: once with one whole-table UPDATE, once with `Backfill` in
+primary-key ranges. Reports throughput and the longest the writer had to
+wait for each. The chunked run is killed a third of the way through and
+resumed, and must finish with every row filled exactly once.
+
+Usage: DATABASE_URL=sqlite:////tmp/backfill.db python benchmarks/backfill_bench.py [orders] [batch_size]
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sqlalchemy as sa
+from app import create_app, db
+from app.models import Order, BackfillCheckpoint
+from app.utils.backfill import Backfill
+from app.utils.datagen import generate
+
+ORDERS = int(sys.argv[1]) if len(sys.argv) > 1 else 300000
+BATCH_SIZE = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+orders = sa.table('orders', sa.column('id'), sa.column('created_at'), sa.column('status_updated_at'),
+                  sa.column('special_instructions'))
+
+
+class Writer(threading.Thread):
+    """Single-order updates in their own transactions; records the slowest"""
+
+    def __init__(self, url, low, high):
+        super().__init__(daemon=True)
+        self.engine = sa.create_engine(url, connect_args={'timeout': 600} if url.startswith('sqlite') else {})
+        self.low, self.high = low, high
+        self.stop = threading.Event()
+        self.slowest = 0.0
+        self.writes = 0
+
+    def run(self):
+        rng = random.Random(3)
+        while not self.stop.is_set():
+            started = time.perf_counter()
+            with self.engine.begin() as conn:
+                conn.execute(orders.update().where(orders.c.id == rng.randint(self.low, self.high))
+                             .values(special_instructions='Call on arrival'))
+            self.slowest = max(self.slowest, time.perf_counter() - started)
+            self.writes += 1
+            time.sleep(0.005)
+
+
+def blank(first):
+    with db.engine.begin() as conn:
+        conn.execute(orders.update().where(orders.c.id >= first).values(status_updated_at=None))
+        conn.execute(BackfillCheckpoint.__table__.delete())
+
+
+def with_writer(url, first, last, job):
+    writer = Writer(url, first, last)
+    writer.start()
+    time.sleep(0.2)
+    try:
+        result = job()
+    finally:
+        writer.stop.set()
+        writer.join()
+        writer.engine.dispose()
+    return result, writer
+
+
+class Killed(Exception):
+    pass
+
+
+def main():
+    app = create_app(os.getenv('FLASK_CONFIG') or 'default')
+    with app.app_context():
+        db.create_all()
+        first = (db.session.query(sa.func.max(Order.id)).scalar() or 0) + 1
+        generate(users=max(1, ORDERS // 10), orders=ORDERS, stations=20, workers=1)
+        last = first + ORDERS - 1
+        url = db.engine.url.render_as_string(hide_password=False)
+        pending = orders.c.status_updated_at.is_(None)
+        print(f"📥 {ORDERS:,} orders loaded (ids {first:,}-{last:,})")
+
+        blank(first)
+
+        def whole_table():
+            started = time.perf_counter()
+            with db.engine.begin() as conn:
+                rows = conn.execute(orders.update().where(pending).values(status_updated_at=orders.c.created_at)).rowcount
+            return rows, time.perf_counter() - started
+
+        (rows, seconds), writer = with_writer(url, first, last, whole_table)
+        print(f"🧱 One UPDATE: {rows:,} rows in {seconds:.2f}s ({rows / seconds:,.0f} rows/s); "
+              f"writer's slowest write {writer.slowest * 1000:,.0f}ms")
+
+        blank(first)
+        job = Backfill('bench-status-updated-at', orders, values={'status_updated_at': orders.c.created_at},
+                       where=pending, batch_size=BATCH_SIZE, sleep=0.01)
+
+        def kill_at_a_third(stats):
+            if stats['last_key'] >= first + ORDERS // 3:
+                raise Killed()
+
+        def chunked():
+            try:
+                job.run(db.engine, progress=kill_at_a_third)
+            except Killed:
+                pass
+            checkpoint = db.session.get(BackfillCheckpoint, job.name)
+            done_when_killed = checkpoint.rows
+            db.session.remove()
+            return done_when_killed, job.run(db.engine)
+
+        (killed_at, result), writer = with_writer(url, first, last, chunked)
+        print(f"🧩 Backfill: killed after {killed_at:,} rows, resumed from key {result['resumed_from']:,}; "
+              f"{result['rows']:,} more rows in {result['batches']:,} batches, {result['seconds']:.2f}s "
+              f"({result['rows_per_second']:,.0f} rows/s); writer's slowest write {writer.slowest * 1000:,.0f}ms "
+              f"over {writer.writes:,} writes")
+
+        left = db.session.execute(sa.select(sa.func.count()).select_from(orders).where(pending)).scalar()
+        checkpoint = db.session.get(BackfillCheckpoint, job.name)
+        print(f"🔎 {left} rows left unfilled; checkpoint says {checkpoint.rows:,} rows, "
+              f"finished {checkpoint.finished_at is not None}")
+
+    if left == 0 and checkpoint.rows == ORDERS and killed_at + result['rows'] == ORDERS \
+            and checkpoint.finished_at is not None:
+        print("✅ Backfill resumed where it stopped and filled every row once")
+        return 0
+    print("❌ Backfill missed or repeated rows")
+    return 1
+
+
+if __name__ == "__main__":
+    exit(main())
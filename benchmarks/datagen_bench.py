@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the synthetic data generator.
+Loads customers, stations and orders (with tracking rows and payments)
+through `generate`, reports the order rate and the time 10M orders would
+take at that rate, then checks the data hangs together:
+  • row counts in the database match what the generator reports,
+  • every order is delivered to one of its own customer's addresses,
+  • every order's last tracking row carries the order's status,
+  • a generated customer can open their order history.
+
+Usage: DATABASE_URL=sqlite:////tmp/datagen.db python benchmarks/datagen_bench.py [customers] [orders] [workers]
+"""
+
+import os
+import sys
+import time
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, select
+from app import create_app, db, shards
+from app.models import User, Address, Order, OrderTracking, Payment
+from app.utils.datagen import generate
+
+CUSTOMERS = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+ORDERS = int(sys.argv[2]) if len(sys.argv) > 2 else 500000
+WORKERS = int(sys.argv[3]) if len(sys.argv) > 3 else None
+TARGET = 10_000_000
+
+
+def counts(first_order):
+    """Orders, tracking rows and payments from `first_order` on, and orders sent to a foreign address"""
+    o, t, p = Order.__table__, OrderTracking.__table__, Payment.__table__
+    orders = db.session.execute(select(func.count()).where(o.c.id >= first_order)).scalar()
+    tracking = db.session.execute(select(func.count()).where(t.c.order_id >= first_order)).scalar()
+    payments = db.session.execute(select(func.count()).where(p.c.order_id >= first_order)).scalar()
+    # Last tracking row per order vs the order's own status
+    last = select(t.c.order_id, func.max(t.c.id).label('id')).where(t.c.order_id >= first_order) \
+        .group_by(t.c.order_id).subquery()
+    mismatched = db.session.execute(
+        select(func.count()).select_from(last.join(t, t.c.id == last.c.id).join(o, o.c.id == last.c.order_id))
+        .where(t.c.status != o.c.status)
+    ).scalar()
+    return orders, tracking, payments, mismatched
+
+
+def main():
+    app = create_app(os.getenv('FLASK_CONFIG') or 'default')
+    app.config.update(RATELIMIT_ENABLED=False, ADMISSION_ENABLED=False)
+    with app.app_context():
+        db.create_all()
+        shards.create_all()
+        first_order = max(shards.fan_out(lambda: db.session.query(func.max(Order.id)).scalar() or 0).values()) + 1
+
+        result = generate(users=CUSTOMERS, orders=ORDERS, stations=max(20, CUSTOMERS // 500), workers=WORKERS)
+        rate = result['orders'] / result['seconds']
+        rows = result['orders'] + result['tracking'] + result['payments'] + result['users'] + result['addresses']
+        print(f"🏭 {result['users']:,} customers, {result['orders']:,} orders, {result['tracking']:,} tracking rows, "
+              f"{result['payments']:,} payments in {result['seconds']}s ({WORKERS or os.cpu_count()} workers)")
+        print(f"   • {rate:,.0f} orders/s, {rows / result['seconds']:,.0f} rows/s "
+              f"→ {TARGET:,} orders in ~{TARGET / rate / 60:.1f} min")
+
+        found = {}
+        for shard, shard_counts in shards.fan_out(counts, first_order).items():
+            for key, value in zip(('orders', 'tracking', 'payments', 'mismatched'), shard_counts):
+                found[key] = found.get(key, 0) + value
+        foreign = db.session.execute(
+            select(func.count()).select_from(Order).join(Address, Address.id == Order.delivery_address_id)
+            .where(Order.id >= first_order, Address.user_id != Order.user_id)
+        ).scalar() if not shards.names else 0
+        print(f"🔎 In the database: {found['orders']:,} orders, {found['tracking']:,} tracking rows, "
+              f"{found['payments']:,} payments; {found['mismatched']} status mismatches, "
+              f"{foreign} orders to someone else's address")
+        customer = db.session.execute(
+            select(User.id).where(User.username.like('syn%'), User.role == 'customer').order_by(User.id.desc())
+        ).scalar()
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(customer)
+        session['_fresh'] = True
+    started = time.perf_counter()
+    page = client.get('/customer/orders')
+    print(f"👤 Customer {customer}'s order history: HTTP {page.status_code} in "
+          f"{(time.perf_counter() - started) * 1000:.0f}ms")
+
+    ok = (found['orders'], found['tracking'], found['payments']) == \
+        (result['orders'], result['tracking'], result['payments']) \
+        and found['mismatched'] == 0 and foreign == 0 and page.status_code == 200
+    if ok:
+        print("✅ Synthetic data loaded consistently")
+        return 0
+    print("❌ Synthetic data is inconsistent")
+    return 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Stress test for the fuel stock ledger.
+Many threads race to place orders against one station fuel with less stock
+than they ask for in total, and some cancel straight away. Stock must
+never go negative, every litre must be accounted for by the movement
+ledger, and the fuel must sell out exactly (no oversell, no leaked litres).
+A negative-quantity order is tried first and must be refused without
+touching stock or the ledger.
+
+Usage: DATABASE_URL=sqlite:////tmp/stock.db python benchmarks/inventory_stress.py
+"""
+
+import os
+import sys
+import threading
+import time
+from datetime import date
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func
+from sqlalchemy.exc import OperationalError
+from app import create_app, db, inventory
+from app.models import User, FuelType, Address, Order, OrderStatus, FuelStock, StockMovement
+from app.utils.inventory import InsufficientStock
+
+THREADS = int(os.environ.get('STRESS_THREADS', 16))
+ORDERS_PER_THREAD = int(os.environ.get('STRESS_ORDERS', 40))
+LITERS = 7.0
+STOCK = float(os.environ.get('STRESS_STOCK', 1000))
+CANCEL_EVERY = 5  # every 5th successful order is cancelled again
+
+
+def setup(suffix):
+    """A throwaway customer and a fresh tracked fuel holding STOCK litres"""
+    db.create_all()
+    user = User(username=f'stock{suffix}', email=f'stock{suffix}@example.com', phone='9000000000')
+    user.set_password('stock')
+    fuel = FuelType(name=f'Stock Fuel {suffix}', price_per_liter=100.0)
+    db.session.add_all([user, fuel])
+    db.session.flush()
+    address = Address(user_id=user.id, name='Stock', phone='9000000000', address_line1='1 Test Road',
+                      city='Pune', state='Maharashtra', pincode='411001')
+    db.session.add(address)
+    inventory.restock(fuel, STOCK)
+    db.session.commit()
+    return user.id, fuel.id, address.id
+
+
+def negative_order(ids):
+    """Try to reserve -LITERS; True if refused and nothing changed"""
+    user_id, fuel_id, address_id = ids
+    before = FuelStock.query.filter_by(fuel_type_id=fuel_id).one().available_liters
+    order = Order(order_number=f"SKNEG{int(time.time() * 1000) % 10 ** 8}", user_id=user_id,
+                  fuel_type_id=fuel_id, quantity_liters=-LITERS, price_per_liter=100.0,
+                  total_fuel_cost=-LITERS * 100, delivery_address_id=address_id, delivery_date=date.today(),
+                  delivery_time_slot='09:00-11:00', total_amount=-LITERS * 100)
+    db.session.add(order)
+    db.session.flush()
+    try:
+        inventory.reserve(fuel_id, -LITERS, order_id=order.id)
+        refused = False
+    except ValueError:
+        refused = True
+    db.session.rollback()
+    after = FuelStock.query.filter_by(fuel_type_id=fuel_id).one().available_liters
+    movements = StockMovement.query.filter_by(fuel_type_id=fuel_id).count()
+    return refused and after == before and movements == 1  # just the initial restock
+
+
+def worker(app, ids, index, results):
+    user_id, fuel_id, address_id = ids
+    placed = cancelled = refused = 0
+    with app.app_context():
+        for n in range(ORDERS_PER_THREAD):
+            placed_order = None
+            for _ in range(50):  # SQLite only lets one writer in at a time
+                try:
+                    order = Order(order_number=f"SK{index:02d}{n:04d}{int(time.time()) % 100000}",
+                                  user_id=user_id, fuel_type_id=fuel_id, quantity_liters=LITERS,
+                                  price_per_liter=100.0, total_fuel_cost=LITERS * 100,
+                                  delivery_address_id=address_id, delivery_date=date.today(),
+                                  delivery_time_slot='09:00-11:00', total_amount=LITERS * 100)
+                    db.session.add(order)
+                    db.session.flush()
+                    inventory.reserve(fuel_id, LITERS, order_id=order.id)
+                    db.session.commit()
+                    placed += 1
+                    placed_order = order
+                    break
+                except InsufficientStock:
+                    db.session.rollback()
+                    refused += 1
+                    break
+                except OperationalError:
+                    db.session.rollback()
+                    time.sleep(0.01)
+            if placed_order is not None and placed % CANCEL_EVERY == 0:
+                for _ in range(50):
+                    try:
+                        placed_order.update_status(OrderStatus.CANCELLED, expected_status=OrderStatus.PENDING)
+                        cancelled += 1
+                        break
+                    except OperationalError:
+                        db.session.rollback()
+                        time.sleep(0.01)
+        db.session.remove()
+    results[index] = (placed, cancelled, refused)
+
+
+def main():
+    app = create_app(os.getenv('FLASK_CONFIG') or 'default')
+    with app.app_context():
+        ids = setup(int(time.time() * 1000))
+        negative_refused = negative_order(ids)
+    fuel_id = ids[1]
+
+    results = {}
+    threads = [threading.Thread(target=worker, args=(app, ids, i, results)) for i in range(THREADS)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    placed = sum(r[0] for r in results.values())
+    cancelled = sum(r[1] for r in results.values())
+    refused = sum(r[2] for r in results.values())
+
+    with app.app_context():
+        available = FuelStock.query.filter_by(fuel_type_id=fuel_id).one().available_liters
+        ledger = db.session.query(func.sum(StockMovement.change_liters)).filter_by(fuel_type_id=fuel_id).scalar()
+        live = Order.query.filter(Order.fuel_type_id == fuel_id, Order.status != OrderStatus.CANCELLED).count()
+
+    requested = THREADS * ORDERS_PER_THREAD * LITERS
+    print(f"🧵 {THREADS} threads x {ORDERS_PER_THREAD} orders of {LITERS:g} L against {STOCK:g} L "
+          f"({requested:g} L requested) in {elapsed:.2f}s")
+    print(f"   • Orders placed:     {placed} ({cancelled} cancelled, {live} live)")
+    print(f"   • Orders refused:    {refused}")
+    print(f"   • Stock left:        {available:g} L (ledger says {ledger:g} L)")
+    print(f"   • Negative order:    {'refused' if negative_refused else 'ACCEPTED'}")
+
+    ok = negative_refused and available >= 0 and abs(available - ledger) < 1e-6 \
+        and abs(available - (STOCK - live * LITERS)) < 1e-6
+    if requested > STOCK:
+        ok = ok and available < LITERS  # sold out: nothing left that could fill an order
+    if ok:
+        print("✅ No oversell, every litre accounted for")
+        return 0
+    print("❌ Stock and orders disagree")
+    return 1
+
+
+if __name__ == "__main__":
+    exit(main())
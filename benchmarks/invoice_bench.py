@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark for monthly statement runs.
+Creates customers with a few orders (and payments) each in one month, then
+renders every statement as HTML and PDF on the process pool, twice: the
+first run renders everything, the second should find everything in the
+disk cache. Changing one order's payment must re-render exactly that
+customer's statements. Prints the rate extrapolated to 100k customers.
+
+Usage: DATABASE_URL=sqlite:////tmp/invoice.db python benchmarks/invoice_bench.py [customers] [orders_each]
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db, invoicer
+from app.models import User, FuelType, Address, Order, OrderStatus, Payment
+from app.models.fuel_station import FuelStation
+from app.models.payment import PaymentStatus
+
+CUSTOMERS = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+ORDERS = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+YEAR, MONTH = 2001, 2  # a month no real data lives in
+
+
+def setup(suffix):
+    db.create_all()
+    rng = random.Random(9)
+    owner = User(username=f'inv{suffix}', email=f'inv{suffix}@example.com', phone='9000000000', role='station_owner')
+    owner.set_password('x')
+    db.session.add(owner)
+    db.session.flush()
+    station = FuelStation(name=f'Invoice {suffix}', address='FC Road, Pune', owner_id=owner.id)
+    db.session.add(station)
+    db.session.flush()
+    fuels = [FuelType(name=f'{name} {suffix}', price_per_liter=price, station_id=station.id)
+             for name, price in (('Petrol', 106.3), ('Diesel', 92.8))]
+    db.session.add_all(fuels)
+    db.session.flush()
+
+    for start in range(0, CUSTOMERS, 5000):
+        batch = range(start, min(CUSTOMERS, start + 5000))
+        db.session.execute(User.__table__.insert(), [{
+            'username': f'ic{suffix}_{i}', 'email': f'ic{suffix}_{i}@example.com', 'phone': '9000000000',
+            'password_hash': 'x', 'role': 'customer', 'is_verified': True, 'is_active': True,
+        } for i in batch])
+    user_ids = [row[0] for row in db.session.query(User.id).filter(User.username.like(f'ic{suffix}_%'))]
+    for start in range(0, len(user_ids), 5000):
+        db.session.execute(Address.__table__.insert(), [{
+            'user_id': uid, 'name': 'Home', 'phone': '9000000000', 'address_line1': f'{uid} Invoice Lane',
+            'city': 'Pune', 'state': 'Maharashtra', 'pincode': '411004', 'is_default': True,
+        } for uid in user_ids[start:start + 5000]])
+    addresses = dict(db.session.query(Address.user_id, Address.id).join(User, User.id == Address.user_id)
+                     .filter(User.username.like(f'ic{suffix}_%')).all())
+
+    rows = []
+    for uid in user_ids:
+        for n in range(ORDERS):
+            fuel = rng.choice(fuels)
+            liters = float(rng.choice([20, 50, 100, 200]))
+            rows.append({
+                'order_number': f'IV{uid}-{n}', 'user_id': uid, 'fuel_type_id': fuel.id, 'quantity_liters': liters,
+                'price_per_liter': fuel.price_per_liter, 'total_fuel_cost': liters * fuel.price_per_liter,
+                'delivery_fee': 50.0, 'total_amount': liters * fuel.price_per_liter + 50.0,
+                'delivery_address_id': addresses[uid], 'delivery_date': datetime(YEAR, MONTH, 1 + n % 27).date(),
+                'delivery_time_slot': '09:00-11:00', 'status': OrderStatus.DELIVERED, 'version': 1,
+                'created_at': datetime(YEAR, MONTH, 1 + n % 27, 10), 'status_updated_at': datetime(YEAR, MONTH, 1, 10),
+            })
+    for start in range(0, len(rows), 10000):
+        db.session.execute(Order.__table__.insert(), rows[start:start + 10000])
+    order_ids = [row[0] for row in db.session.query(Order.id).filter(Order.order_number.like('IV%'))]
+    for start in range(0, len(order_ids), 10000):
+        db.session.execute(Payment.__table__.insert(), [{
+            'order_id': oid, 'amount': 0.0, 'payment_mode': 'COD', 'status': PaymentStatus.COMPLETED, 'version': 1,
+        } for oid in order_ids[start:start + 10000]])
+    db.session.commit()
+    return order_ids[0]
+
+
+def main():
+    app = create_app(os.getenv('FLASK_CONFIG') or 'default')
+    cache_dir = tempfile.mkdtemp(prefix='fuelexpress-invoices-')
+    app.config['INVOICE_CACHE_DIR'] = cache_dir
+    suffix = int(time.time())
+    try:
+        with app.app_context():
+            first_order = setup(suffix)
+            print(f"📥 {CUSTOMERS:,} customers with {ORDERS} orders each in {YEAR}-{MONTH:02d}; "
+                  f"{os.cpu_count()} render processes")
+
+            cold = invoicer.run_month(YEAR, MONTH)
+            print(f"🧾 Cold run: {cold['rendered']:,} documents in {cold['seconds']}s "
+                  f"(loading {cold['load_seconds']}s) → 100k customers in ~{cold['seconds'] * 100000 / CUSTOMERS / 60:.1f} min")
+
+            warm = invoicer.run_month(YEAR, MONTH)
+            print(f"♻️  Re-run: {warm['cached']:,} cached, {warm['rendered']} rendered in {warm['seconds']}s")
+
+            payment = Payment.query.filter_by(order_id=first_order).first()
+            payment.transaction_id = f'TXN{suffix}'
+            db.session.commit()
+            changed = invoicer.run_month(YEAR, MONTH)
+            print(f"✏️  After one payment changed: {changed['rendered']} re-rendered")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    if cold['rendered'] == 2 * CUSTOMERS and warm['rendered'] == 0 and changed['rendered'] == 2:
+        print("✅ Statements rendered once and served from the cache afterwards")
+        return 0
+    print("❌ Cache keys did not follow the invoice inputs")
+    return 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for order status notifications.
+Walks a batch of orders through CONFIRMED -> PREPARING -> OUT_FOR_DELIVERY
+in quick succession, then waits for the dispatcher to drain. Reports the
+cost the producer pays per status change, end-to-end delivery rate, and
+checks that every order produced exactly one (coalesced) notification per
+channel.
+
+Usage: DATABASE_URL=sqlite:////tmp/notify.db python benchmarks/notification_bench.py [orders]
+"""
+
+import os
+import sys
+import time
+from datetime import date
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db, notifier
+from app.models import User, FuelType, Address, Order, OrderStatus
+
+ORDERS = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+COMMIT_EVERY = 200
+STEPS = [OrderStatus.CONFIRMED, OrderStatus.PREPARING, OrderStatus.OUT_FOR_DELIVERY]
+
+
+def setup_orders(suffix):
+    """Bulk insert ORDERS pending orders for one throwaway customer"""
+    db.create_all()
+    user = User(username=f'notify{suffix}', email=f'notify{suffix}@example.com', phone='9000000000')
+    user.set_password('notify')
+    fuel = FuelType.query.filter_by(name='Notify Fuel').first() or FuelType(name='Notify Fuel', price_per_liter=100.0)
+    db.session.add_all([user, fuel])
+    db.session.flush()
+    address = Address(user_id=user.id, name='Notify', phone='9000000000', address_line1='1 Test Road',
+                      city='Pune', state='Maharashtra', pincode='411001')
+    db.session.add(address)
+    db.session.commit()
+
+    db.session.execute(Order.__table__.insert(), [{
+        'order_number': f"NT{suffix}{i:06d}", 'user_id': user.id, 'fuel_type_id': fuel.id,
+        'quantity_liters': 10, 'price_per_liter': 100.0, 'total_fuel_cost': 1000.0,
+        'delivery_address_id': address.id, 'delivery_date': date.today(),
+        'delivery_time_slot': '09:00-11:00', 'total_amount': 1000.0,
+        'status': OrderStatus.PENDING, 'version': 1,
+    } for i in range(ORDERS)])
+    db.session.commit()
+    return [o.id for o in Order.query.with_entities(Order.id).filter_by(user_id=user.id)]
+
+
+def main():
+    app = create_app(os.getenv('FLASK_CONFIG') or 'default')
+    app.config.update(NOTIFICATION_STUBS=True, NOTIFICATIONS_ENABLED=True,
+                      NOTIFICATION_COALESCE_WINDOW=1.0, NOTIFICATION_MAX_DELAY=30.0)
+    notifier.init_app(app)
+    suffix = int(time.time())
+
+    with app.app_context():
+        order_ids = setup_orders(suffix)
+        print(f"📥 Created {len(order_ids):,} orders")
+
+        started = time.perf_counter()
+        for start in range(0, len(order_ids), COMMIT_EVERY):
+            # Each chunk races through every step, one commit per step
+            orders = Order.query.filter(Order.id.in_(order_ids[start:start + COMMIT_EVERY])).all()
+            for step in STEPS:
+                for order in orders:
+                    order.update_status(step, commit=False)
+                db.session.commit()
+        produced = time.perf_counter() - started
+        changes = len(order_ids) * len(STEPS)
+        print(f"🔁 Applied {changes:,} status changes in {produced:.2f}s "
+              f"({changes / produced:,.0f}/s, notification cost included)")
+
+    channels = notifier.channels
+    expected = len(order_ids)
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if all(c.count >= expected for c in channels.values()) and not notifier.status()['queued']:
+            break
+        time.sleep(0.05)
+    total = time.perf_counter() - started
+
+    stats = notifier.status()
+    print(f"📨 Delivered in {total:.2f}s end to end (includes the {app.config['NOTIFICATION_COALESCE_WINDOW']}s "
+          f"coalescing window)")
+    print(f"   • Events: {stats['events']:,}, coalesced away: {stats['coalesced']:,}")
+    for name, channel in channels.items():
+        print(f"   • {name}: {channel.count:,} notifications")
+
+    if all(c.count == expected for c in channels.values()):
+        print("✅ Exactly one notification per order per channel")
+        return 0
+    print(f"❌ Expected {expected:,} notifications per channel")
+    return 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Stress test for optimistic locking on Order status changes.
+Many threads hammer the same few orders with status updates; every update
+must land exactly once (no lost updates) and nobody waits on row locks.
+
+Usage: DATABASE_URL=sqlite:////tmp/stress.db python benchmarks/order_status_stress.py
+"""
+
+import os
+import sys
+import threading
+import time
+from datetime import date
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models import User, FuelType, Address, Order, OrderTracking, OrderStatus
+from app.utils.concurrency import retry_on_conflict
+
+THREADS = int(os.environ.get('STRESS_THREADS', 16))
+UPDATES_PER_THREAD = int(os.environ.get('STRESS_UPDATES', 50))
+ORDERS = int(os.environ.get('STRESS_ORDERS', 2))
+
+CYCLE = [OrderStatus.CONFIRMED, OrderStatus.PREPARING, OrderStatus.OUT_FOR_DELIVERY]
+
+
+def setup_orders():
+    """Create a throwaway customer and a handful of pending orders"""
+    db.create_all()
+    suffix = int(time.time() * 1000)
+    user = User(username=f'stress{suffix}', email=f'stress{suffix}@example.com', phone='9000000000')
+    user.set_password('stress')
+    fuel = FuelType.query.filter_by(name='Stress Fuel').first() or FuelType(name='Stress Fuel', price_per_liter=100.0)
+    db.session.add_all([user, fuel])
+    db.session.flush()
+    address = Address(user_id=user.id, name='Stress', phone='9000000000', address_line1='1 Test Road',
+                      city='Pune', state='Maharashtra', pincode='411001')
+    db.session.add(address)
+    db.session.flush()
+
+    orders = []
+    for i in range(ORDERS):
+        order = Order(order_number=f"ST{suffix}{i:03d}", user_id=user.id, fuel_type_id=fuel.id,
+                      quantity_liters=10, price_per_liter=100.0, total_fuel_cost=1000.0,
+                      delivery_address_id=address.id, delivery_date=date.today(),
+                      delivery_time_slot='09:00-11:00', total_amount=1000.0)
+        db.session.add(order)
+        orders.append(order)
+    db.session.commit()
+    return [o.id for o in orders]
+
+
+def worker(app, order_ids, index, results):
+    attempts = applied = 0
+    with app.app_context():
+        for n in range(UPDATES_PER_THREAD):
+            order_id = order_ids[(index + n) % len(order_ids)]
+            status = CYCLE[n % len(CYCLE)]
+
+            def change():
+                nonlocal attempts
+                attempts += 1
+                order = db.session.get(Order, order_id)
+                order.update_status(status, message=f"t{index}-{n}")
+
+            retry_on_conflict(change, attempts=50)
+            applied += 1
+        db.session.remove()
+    results[index] = (applied, attempts)
+
+
+def main():
+    app = create_app(os.getenv('FLASK_CONFIG') or 'default')
+    with app.app_context():
+        order_ids = setup_orders()
+        start_versions = {o.id: o.version for o in Order.query.filter(Order.id.in_(order_ids))}
+
+    results = {}
+    threads = [threading.Thread(target=worker, args=(app, order_ids, i, results)) for i in range(THREADS)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    applied = sum(r[0] for r in results.values())
+    attempts = sum(r[1] for r in results.values())
+
+    with app.app_context():
+        versions = {o.id: o.version for o in Order.query.filter(Order.id.in_(order_ids))}
+        version_delta = sum(versions[i] - start_versions[i] for i in order_ids)
+        tracked = OrderTracking.query.filter(OrderTracking.order_id.in_(order_ids)).count()
+
+    print(f"🧵 {THREADS} threads x {UPDATES_PER_THREAD} updates over {ORDERS} orders in {elapsed:.2f}s")
+    print(f"   • Updates applied:  {applied}")
+    print(f"   • Attempts:         {attempts} ({attempts - applied} conflicts retried)")
+    print(f"   • Version bumps:    {version_delta}")
+    print(f"   • Tracking rows:    {tracked}")
+
+    if applied == version_delta == tracked:
+        print("✅ No lost updates")
+        return 0
+    print("❌ Lost updates detected")
+    return 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the streaming payment reconciliation job.
+Loads synthetic online payments, writes a settlement file of the same size
+with a sprinkling of planted mismatches (and rows with a blank amount), reconciles it and reports throughput
+and peak memory.
+
+Usage: DATABASE_URL=sqlite:////tmp/recon.db python benchmarks/reconciliation_bench.py [rows]
+"""
+
+import csv
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models import User, FuelType, Address, Order, Payment, PaymentStatus
+from app.utils.reconciliation import Reconciler
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+INSERT_CHUNK = 20000
+MISMATCH_RATE = 0.001
+
+
+def setup_payments(run_id):
+    """Bulk insert ROWS online payments against a single throwaway order"""
+    db.create_all()
+    user = User(username=f'recon{run_id}', email=f'recon{run_id}@example.com', phone='9000000000')
+    user.set_password('recon')
+    fuel = FuelType.query.filter_by(name='Recon Fuel').first() or FuelType(name='Recon Fuel', price_per_liter=100.0)
+    db.session.add_all([user, fuel])
+    db.session.flush()
+    address = Address(user_id=user.id, name='Recon', phone='9000000000', address_line1='1 Test Road',
+                      city='Pune', state='Maharashtra', pincode='411001')
+    db.session.add(address)
+    db.session.flush()
+    order = Order(order_number=f"RC{run_id}", user_id=user.id, fuel_type_id=fuel.id, quantity_liters=10,
+                  price_per_liter=100.0, total_fuel_cost=1000.0, delivery_address_id=address.id,
+                  delivery_date=date.today(), delivery_time_slot='09:00-11:00', total_amount=1000.0)
+    db.session.add(order)
+    db.session.commit()
+
+    now = datetime.utcnow()
+    table = Payment.__table__
+    for start in range(0, ROWS, INSERT_CHUNK):
+        db.session.execute(table.insert(), [{
+            'order_id': order.id,
+            'amount': round(100 + (i % 5000) * 0.37, 2),
+            'payment_mode': 'Online',
+            'status': PaymentStatus.COMPLETED,
+            'transaction_id': f"pi_{run_id}_{i:08d}",
+            'created_at': now,
+            'updated_at': now,
+            'version': 1,
+        } for i in range(start, min(start + INSERT_CHUNK, ROWS))])
+        db.session.commit()
+    return now
+
+
+def write_settlement_file(path, run_id):
+    """Same payments as the DB, with planted amount/status/missing/malformed mismatches"""
+    rng = random.Random(42)
+    planted = 0
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['transaction_id', 'amount', 'status', 'settled_at'])
+        for i in range(ROWS):
+            txn = f"pi_{run_id}_{i:08d}"
+            amount = round(100 + (i % 5000) * 0.37, 2)
+            status = 'succeeded'
+            roll = rng.random()
+            if roll < MISMATCH_RATE:
+                amount += 1.0
+                planted += 1
+            elif roll < 2 * MISMATCH_RATE:
+                status = 'failed'
+                planted += 1
+            elif roll < 3 * MISMATCH_RATE:
+                planted += 1
+                continue  # gateway "forgot" it -> missing in file
+            elif roll < 4 * MISMATCH_RATE:
+                writer.writerow([txn, '', status, '2026-01-01T00:00:00Z'])
+                planted += 1
+                continue
+            writer.writerow([txn, f"{amount:.2f}", status, '2026-01-01T00:00:00Z'])
+        for i in range(int(ROWS * MISMATCH_RATE)):
+            writer.writerow([f"pi_unknown_{i:08d}", '10.00', 'succeeded', '2026-01-01T00:00:00Z'])
+            planted += 1
+    return planted
+
+
+def main():
+    app = create_app(os.getenv('FLASK_CONFIG') or 'default')
+    run_id = int(time.time())
+    workdir = tempfile.mkdtemp()
+    settlement = os.path.join(workdir, 'settlement.csv')
+    report = os.path.join(workdir, 'report.csv')
+
+    with app.app_context():
+        t = time.perf_counter()
+        since = setup_payments(run_id)
+        print(f"📥 Loaded {ROWS:,} payments in {time.perf_counter() - t:.1f}s")
+
+        t = time.perf_counter()
+        planted = write_settlement_file(settlement, run_id)
+        print(f"📝 Wrote settlement file ({os.path.getsize(settlement) / 1e6:.1f} MB, {planted:,} planted mismatches) "
+              f"in {time.perf_counter() - t:.1f}s")
+
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        counts = Reconciler().run(settlement, report, since=since)
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    found = sum(counts[k] for k in ('missing_in_db', 'missing_in_file', 'amount_differs', 'status_differs', 'malformed'))
+    print(f"⚖️  Reconciled {counts['file_rows']:,} rows in {counts['seconds']}s "
+          f"({counts['file_rows'] / max(counts['seconds'], 0.001):,.0f} rows/s)")
+    for key in ('matched', 'missing_in_db', 'missing_in_file', 'amount_differs', 'status_differs', 'malformed'):
+        print(f"   • {key}: {counts[key]:,}")
+    print(f"   • Peak RSS growth during reconciliation: {(rss_after - rss_before) / 1024:.1f} MB")
+    print(f"   • Report: {report}")
+
+    if found == planted:
+        print("✅ Every planted mismatch was reported")
+        return 0
+    print(f"❌ Planted {planted:,} mismatches but reported {found:,}")
+    return 1
+
+
+if __name__ == "__main__":
+    exit(main())
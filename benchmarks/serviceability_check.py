@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+End-to-end check of delivery serviceability with enforcement on.
+Sets up one station with coordinates and a 10 km radius in Pune and one
+with only a free-text address (no coordinates, no radius), then places
+orders through /customer/order-fuel and verifies that:
+  • a Pune pincode inside the radius is accepted,
+  • a Delhi pincode from the bundled dataset, outside the radius, is refused,
+  • a pincode missing from the bundled dataset is accepted,
+  • the address-only station accepts every pincode ("Bangalore" included).
+
+Usage: python benchmarks/serviceability_check.py
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORKDIR = tempfile.mkdtemp(prefix='fuelexpress-serviceability-')
+os.environ['DATABASE_URL'] = f"sqlite:///{WORKDIR}/app.db"
+os.environ['SERVICEABILITY_ENFORCED'] = 'true'
+
+from app import create_app, db
+from app.models import User, FuelType, Address, Order
+from app.models.fuel_station import FuelStation
+
+PINCODES = [
+    # (pincode, city, state, expected for the Pune station, expected for the address-only station)
+    ('411001', 'Pune', 'Maharashtra', True, True),
+    ('110001', 'New Delhi', 'Delhi', False, True),
+    ('999999', 'Nowhere', 'Unknown', True, True),
+    ('560001', 'Bengaluru', 'Karnataka', False, True),
+]
+
+
+def setup():
+    db.create_all()
+    owner = User(username='svcowner', email='svcowner@example.com', phone='9000000000', role='station_owner')
+    customer = User(username='svccustomer', email='svccustomer@example.com', phone='9000000001', role='customer')
+    for user in (owner, customer):
+        user.set_password('x')
+    db.session.add_all([owner, customer])
+    db.session.flush()
+    mapped = FuelStation(name='Pune Station', address='Koregaon Park', latitude=18.5362, longitude=73.8940,
+                         service_radius_km=10.0, owner_id=owner.id)
+    unmapped = FuelStation(name='Old Station', address='MG Road, Bangalore', owner_id=owner.id)
+    db.session.add_all([mapped, unmapped])
+    db.session.flush()
+    fuels = [FuelType(name=f'{station.name} Diesel', price_per_liter=90.0, station_id=station.id)
+             for station in (mapped, unmapped)]
+    db.session.add_all(fuels)
+    db.session.flush()
+    addresses = {}
+    for pincode, city, state, _, _ in PINCODES:
+        address = Address(user_id=customer.id, name='Home', phone='9000000001', address_line1='1 Main Road',
+                          city=city, state=state, pincode=pincode)
+        db.session.add(address)
+        db.session.flush()
+        addresses[pincode] = address.id
+    db.session.commit()
+    return customer.id, [fuel.id for fuel in fuels], addresses
+
+
+def order(client, fuel_id, address_id):
+    before = Order.query.count()
+    when = datetime.now() + timedelta(days=1)
+    client.post('/customer/order-fuel', data={
+        'fuel_id': fuel_id, 'address_id': address_id, 'quantity': '20',
+        'delivery_date': when.strftime('%Y-%m-%d'), 'delivery_time': '10:00',
+    })
+    if Order.query.count() == before:
+        return False
+    # Order numbers are per second; free this one up for the next order
+    Order.query.update({Order.order_number: 'CHK' + db.cast(Order.id, db.String)})
+    db.session.commit()
+    return True
+
+
+def main():
+    app = create_app(os.getenv('FLASK_CONFIG') or 'default')
+    app.config['WTF_CSRF_ENABLED'] = False
+    failures = 0
+    with app.app_context():
+        customer_id, (mapped_fuel, unmapped_fuel), addresses = setup()
+        print(f"📍 Enforcement {'on' if app.config['SERVICEABILITY_ENFORCED'] else 'off'}, "
+              f"database in {WORKDIR}")
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(customer_id)
+        for pincode, city, _, mapped_expected, unmapped_expected in PINCODES:
+            for label, fuel_id, expected in (('Pune station', mapped_fuel, mapped_expected),
+                                             ('address-only station', unmapped_fuel, unmapped_expected)):
+                accepted = order(client, fuel_id, addresses[pincode])
+                ok = accepted == expected
+                failures += not ok
+                print(f"  {'✓' if ok else '✗'} {pincode} ({city}) via {label}: "
+                      f"{'accepted' if accepted else 'refused'}")
+
+    if failures:
+        print(f"❌ {failures} orders were accepted or refused wrongly")
+        return 1
+    print("✅ Serviceability refuses only pincodes it knows a mapped station can't reach")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
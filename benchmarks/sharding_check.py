@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+End-to-end check of city-based sharding on local SQLite databases.
+Creates a primary plus `west` and `south` shard databases, signs up
+customers in Pune, Bengaluru and an unmapped city, and has each place
+orders (with tracking rows and payments) inside their own shard. Then
+verifies that:
+  • every shard holds exactly its own customers' orders, tracking and payments,
+  • customers' own pages and delta sync read from their shard,
+  • the admin report fans out across all databases and adds up.
+Also times the fan-out report against querying each database in turn.
+
+Usage: python benchmarks/sharding_check.py [customers_per_city] [orders_per_customer]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORKDIR = tempfile.mkdtemp(prefix='fuelexpress-shards-')
+os.environ['DATABASE_URL'] = f"sqlite:///{WORKDIR}/primary.db"
+os.environ['SHARD_URLS'] = f"west=sqlite:///{WORKDIR}/west.db,south=sqlite:///{WORKDIR}/south.db"
+os.environ['SHARD_MAP'] = "pune=west,maharashtra=west,bengaluru=south,karnataka=south"
+
+from sqlalchemy import func, select
+from app import create_app, db, shards
+from app.models import User, FuelType, Address, Order, OrderStatus, OrderTracking, Payment
+from app.models.fuel_station import FuelStation
+from app.routes.admin import _daily_order_totals
+from app.utils.sharding import bind_key, use_shard
+
+CUSTOMERS = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+ORDERS = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+ROUNDS = 5
+CITIES = [('Pune', 'Maharashtra', 'west'), ('Bengaluru', 'Karnataka', 'south'), ('Jaipur', 'Rajasthan', None)]
+
+
+def setup():
+    db.create_all()
+    shards.create_all()
+    owner = User(username='shardowner', email='shardowner@example.com', phone='9000000000', role='station_owner')
+    owner.set_password('x')
+    admin = User(username='shardadmin', email='shardadmin@example.com', phone='9000000000', role='admin')
+    admin.set_password('x')
+    db.session.add_all([owner, admin])
+    db.session.flush()
+    station = FuelStation(name='Shard Station', address='Pune', owner_id=owner.id)
+    db.session.add(station)
+    db.session.flush()
+    fuel = FuelType(name='Shard Petrol', price_per_liter=100.0, station_id=station.id)
+    db.session.add(fuel)
+    db.session.commit()
+
+    customers = []
+    for city, state, _ in CITIES:
+        for i in range(CUSTOMERS):
+            user = User(username=f'{city.lower()}{i}', email=f'{city.lower()}{i}@example.com',
+                        phone='9000000000', role='customer')
+            user.set_password('x')
+            db.session.add(user)
+            db.session.flush()
+            db.session.add(Address(user_id=user.id, name='Home', phone='9000000000', address_line1='1 Main Road',
+                                   city=city, state=state, pincode='400001', is_default=True))
+            db.session.flush()
+            customers.append(user.id)
+    db.session.commit()
+    return fuel.id, admin.id, customers
+
+
+def place_orders(fuel_id, customers):
+    rng = random.Random(5)
+    homes = dict(db.session.execute(select(User.id, User.home_shard).where(User.id.in_(customers))).all())
+    addresses = dict(db.session.execute(select(Address.user_id, Address.id).where(Address.user_id.in_(customers))).all())
+    for user_id in customers:
+        with use_shard(homes[user_id]):
+            for n in range(ORDERS):
+                liters = float(rng.choice([20, 50, 100]))
+                order = Order(order_number=f'SH{user_id:05d}{n:04d}', user_id=user_id, fuel_type_id=fuel_id,
+                              quantity_liters=liters, price_per_liter=100.0, total_fuel_cost=liters * 100,
+                              delivery_address_id=addresses[user_id],
+                              delivery_date=date.today() + timedelta(days=1), delivery_time_slot='09:00-11:00',
+                              total_amount=liters * 100, status=OrderStatus.PENDING)
+                db.session.add(order)
+                db.session.flush()
+                order.update_status(OrderStatus.CONFIRMED, commit=False)
+                db.session.add(Payment(order_id=order.id, amount=order.total_amount, payment_mode='COD'))
+            db.session.commit()
+    return homes
+
+
+def counts(engine):
+    with engine.connect() as conn:
+        return tuple(conn.execute(select(func.count()).select_from(t)).scalar()
+                     for t in (Order.__table__, OrderTracking.__table__, Payment.__table__))
+
+
+def login(app, user_id):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    return client
+
+
+def main():
+    app = create_app(os.getenv('FLASK_CONFIG') or 'default')
+    app.config.update(WTF_CSRF_ENABLED=False, RATELIMIT_ENABLED=False, ADMISSION_ENABLED=False)
+    ok = True
+
+    with app.app_context():
+        fuel_id, admin_id, customers = setup()
+        homes = place_orders(fuel_id, customers)
+        expected = {shard: sum(ORDERS for uid in customers if homes[uid] == shard) for _, _, shard in CITIES}
+        for _, _, shard in CITIES:
+            engine = db.engines[bind_key(shard)] if shard else db.engines[None]
+            found = counts(engine)
+            good = found == (expected[shard],) * 3
+            ok &= good
+            print(f"{'🗄️ ' if good else '❌'} {shard or 'primary'}: {found[0]:,} orders, "
+                  f"{found[1]:,} tracking rows, {found[2]:,} payments (expected {expected[shard]:,} orders)")
+
+    for user_id in (customers[0], customers[CUSTOMERS], customers[-1]):
+        client = login(app, user_id)
+        page = client.get('/customer/orders').get_data(as_text=True)
+        sync = client.get('/customer/api/orders/sync?limit=500').get_json()
+        mine = page.count(f'SH{user_id:05d}') == ORDERS and len(sync['orders']) == ORDERS
+        ok &= mine
+        print(f"{'👤' if mine else '❌'} Customer {user_id} ({homes[user_id] or 'primary'}) "
+              f"sees {len(sync['orders'])} of their {ORDERS} orders")
+
+    report = login(app, admin_id).get('/admin/api/reports/orders?days=7').get_json()
+    total = sum(day['orders'] for day in report['days'])
+    ok &= total == ORDERS * len(customers)
+    print(f"📊 Admin report: {total:,} orders across {report['shards']}")
+
+    since = date.today() - timedelta(days=7)
+    with app.app_context():
+        started = time.perf_counter()
+        for _ in range(ROUNDS):
+            shards.fan_out(_daily_order_totals, since)
+        fanned = (time.perf_counter() - started) / ROUNDS
+        started = time.perf_counter()
+        for _ in range(ROUNDS):
+            for _, _, shard in CITIES:
+                with use_shard(shard):
+                    _daily_order_totals(since)
+        sequential = (time.perf_counter() - started) / ROUNDS
+    print(f"   • Fan-out {fanned * 1000:.0f}ms vs one database at a time {sequential * 1000:.0f}ms")
+
+    if ok:
+        print("✅ Order data routed by city and merged for admins")
+        return 0
+    print("❌ Sharding routed data to the wrong place")
+    return 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Time-to-first-byte benchmark for the streamed order history.
+Gives one customer growing order histories and fetches /customer/orders
+(gzip negotiated) for each size, measuring time to the first chunk, total
+time and peak Python memory. The same list rendered the old way (whole
+list loaded, page built as one string) is measured alongside.
+
+Usage: DATABASE_URL=sqlite:////tmp/stream.db python benchmarks/streaming_bench.py [sizes...]
+"""
+
+import gzip
+import os
+import sys
+import time
+import tracemalloc
+from datetime import date
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import render_template
+from app import create_app, db
+from app.models import User, FuelType, Address, Order, OrderStatus
+from app.models.fuel_station import FuelStation
+
+SIZES = [int(s) for s in sys.argv[1:]] or [500, 5000, 50000]
+
+
+def setup(suffix):
+    db.create_all()
+    owner = User(username=f'st{suffix}', email=f'st{suffix}@example.com', phone='9000000000', role='station_owner')
+    owner.set_password('x')
+    db.session.add(owner)
+    db.session.flush()
+    station = FuelStation(name=f'Stream {suffix}', address='Pune', owner_id=owner.id)
+    db.session.add(station)
+    db.session.flush()
+    fuel = FuelType(name=f'Stream Fuel {suffix}', price_per_liter=100.0, station_id=station.id)
+    db.session.add(fuel)
+    db.session.commit()
+    return fuel.id
+
+
+def customer_with_orders(suffix, fuel_id, count):
+    user = User(username=f'sc{suffix}_{count}', email=f'sc{suffix}_{count}@example.com', phone='9000000000',
+                role='customer')
+    user.set_password('x')
+    db.session.add(user)
+    db.session.flush()
+    address = Address(user_id=user.id, name='Home', phone='9000000000', address_line1='1 Main Road',
+                      city='Pune', state='Maharashtra', pincode='411001', is_default=True)
+    db.session.add(address)
+    db.session.flush()
+    for start in range(0, count, 10000):
+        db.session.execute(Order.__table__.insert(), [{
+            'order_number': f'SB{suffix}{count}-{i}', 'user_id': user.id, 'fuel_type_id': fuel_id,
+            'quantity_liters': 50.0, 'price_per_liter': 100.0, 'total_fuel_cost': 5000.0,
+            'delivery_address_id': address.id, 'delivery_date': date.today(), 'delivery_time_slot': '09:00-11:00',
+            'total_amount': 5000.0, 'status': OrderStatus.DELIVERED, 'version': 1,
+        } for i in range(start, min(count, start + 10000))])
+    db.session.commit()
+    return user.id
+
+
+def streamed(app, user_id):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    tracemalloc.start()
+    started = time.perf_counter()
+    response = client.get('/customer/orders', headers={'Accept-Encoding': 'gzip'}, buffered=False)
+    chunks = iter(response.response)
+    body = [next(chunks)]
+    first = time.perf_counter() - started
+    body.extend(chunks)
+    total = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    response.close()
+    return first, total, peak, len(gzip.decompress(b''.join(body)))
+
+
+def rendered(app, user_id):
+    with app.test_request_context():
+        tracemalloc.start()
+        started = time.perf_counter()
+        orders = Order.query.filter_by(user_id=user_id).all()
+        html = render_template('customer/orders.html', orders=orders)
+        gzip.compress(html.encode(), compresslevel=6)
+        total = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        db.session.remove()
+    return total, peak
+
+
+def main():
+    app = create_app(os.getenv('FLASK_CONFIG') or 'default')
+    app.config.update(RATELIMIT_ENABLED=False, ADMISSION_ENABLED=False)
+    suffix = int(time.time())
+    with app.app_context():
+        fuel_id = setup(suffix)
+        users = {n: customer_with_orders(suffix, fuel_id, n) for n in SIZES}
+
+    firsts = []
+    for n in SIZES:
+        first, total, peak, size = streamed(app, users[n])
+        old_total, old_peak = rendered(app, users[n])
+        firsts.append(first)
+        print(f"📜 {n:>7,} orders: first byte {first * 1000:6.1f}ms, done {total:5.2f}s, peak {peak / 2**20:6.1f} MiB "
+              f"({size / 2**20:.1f} MiB of HTML) | one-shot render {old_total:5.2f}s, peak {old_peak / 2**20:6.1f} MiB")
+
+    if max(firsts) < 5 * min(firsts) + 0.05:
+        print("✅ Time to first byte stays flat as the history grows")
+        return 0
+    print("❌ Time to first byte grows with the history")
+    return 1
+
+
+if __name__ == "__main__":
+    exit(main())
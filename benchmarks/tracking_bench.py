@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for partner GPS ingestion.
+Simulates a fleet of partners driving noisy straight-ish routes and posts
+their pings in batches through the real endpoint on one worker, then runs
+a flush. Reports pings/second accepted, the Douglas-Peucker reduction and
+how long the bulk write took.
+
+Usage: DATABASE_URL=sqlite:////tmp/tracking.db python benchmarks/tracking_bench.py [partners] [pings_per_partner]
+"""
+
+import math
+import os
+import random
+import sys
+import time
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db, tracker
+from app.models import User, LocationPoint
+
+PARTNERS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+PINGS = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+BATCH = 50  # pings per request, roughly 2.5 minutes of 3-second fixes
+CENTER = (18.5204, 73.8567)
+
+
+def route(rng, start_ts):
+    """A partner heading somewhere at ~30 km/h, turning now and then, with GPS jitter"""
+    lat, lon = CENTER[0] + rng.uniform(-0.05, 0.05), CENTER[1] + rng.uniform(-0.05, 0.05)
+    heading = rng.uniform(0, 2 * math.pi)
+    for i in range(PINGS):
+        if rng.random() < 0.02:
+            heading += rng.uniform(-math.pi / 2, math.pi / 2)
+        step = 25 / 111320.0  # metres per 3 s at 30 km/h
+        lat += step * math.cos(heading) + rng.gauss(0, 2 / 111320.0)
+        lon += step * math.sin(heading) + rng.gauss(0, 2 / 111320.0)
+        yield [start_ts + i * 3, round(lat, 6), round(lon, 6)]
+
+
+def main():
+    app = create_app(os.getenv('FLASK_CONFIG') or 'default')
+    app.config.update(WTF_CSRF_ENABLED=False, RATELIMIT_ENABLED=False, ADMISSION_ENABLED=False,
+                      TRACKING_FLUSH_INTERVAL=3600)
+    suffix = int(time.time())
+
+    with app.app_context():
+        db.create_all()
+        db.session.execute(User.__table__.insert(), [{
+            'username': f'tp{suffix}_{i}', 'email': f'tp{suffix}_{i}@example.com', 'phone': '9000000000',
+            'password_hash': 'x', 'role': 'delivery_partner', 'is_verified': True, 'is_active': True,
+        } for i in range(PARTNERS)])
+        db.session.commit()
+        partner_ids = [u.id for u in User.query.filter(User.username.like(f'tp{suffix}_%'))]
+        before = LocationPoint.query.count()
+
+    rng = random.Random(3)
+    batches = []
+    for pid in partner_ids:
+        pings = list(route(rng, time.time() - PINGS * 3))
+        batches.extend((pid, pings[i:i + BATCH]) for i in range(0, len(pings), BATCH))
+    rng.shuffle(batches)
+
+    clients = {}
+    for pid in partner_ids:
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(pid)
+            session['_fresh'] = True
+        clients[pid] = client
+
+    # Keep each partner's batches in time order, interleaving partners
+    batches.sort(key=lambda b: b[1][0][0])
+    accepted = 0
+    started = time.perf_counter()
+    for pid, pings in batches:
+        response = clients[pid].post('/delivery/api/pings', json={'pings': pings})
+        accepted += response.get_json()['accepted']
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        t = time.perf_counter()
+        written = tracker.flush()
+        flushed = time.perf_counter() - t
+        stored = LocationPoint.query.count() - before
+
+    total = PARTNERS * PINGS
+    print(f"📡 {accepted:,}/{total:,} pings from {PARTNERS} partners in {len(batches):,} requests: "
+          f"{elapsed:.2f}s ({accepted / elapsed:,.0f} pings/s through the endpoint)")
+    print(f"🗜️  Douglas-Peucker kept {written:,} points ({written / max(accepted, 1) * 100:.1f}%)")
+    print(f"💾 Flush wrote {stored:,} rows in {flushed:.2f}s")
+
+    if accepted == total and stored == written:
+        print("✅ Every ping accepted and the thinned trail persisted")
+        return 0
+    print("❌ Pings were lost")
+    return 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -13,7 +13,8 @@ class Config:
     MYSQL_PASSWORD = os.environ.get('MYSQL_PASSWORD') or ''
     MYSQL_DB = os.environ.get('MYSQL_DB') or 'fuel_delivery'
     
-    SQLALCHEMY_DATABASE_URI = f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}/{MYSQL_DB}"
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
+        f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}/{MYSQL_DB}"
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
     # Mail Configuration
@@ -36,9 +37,116 @@ class Config:
     # Payment Gateway (example for Stripe)
     STRIPE_PUBLISHABLE_KEY = os.environ.get('STRIPE_PUBLISHABLE_KEY')
     STRIPE_SECRET_KEY = os.environ.get('STRIPE_SECRET_KEY')
+    PAYMENT_GATEWAY_URL = os.environ.get('PAYMENT_GATEWAY_URL') or 'http://127.0.0.1:8765'  # local stub
+    PAYMENT_WEBHOOK_SECRET = os.environ.get('PAYMENT_WEBHOOK_SECRET')  # required outside development
+    PAYMENT_WORKERS = int(os.environ.get('PAYMENT_WORKERS') or 2)
+    PAYMENT_RESUME_HOURS = 24  # unsent PENDING payments this recent are requeued on startup
+
+    # Redis (shared state for rate limits etc.; in-process fallback when unset)
+    REDIS_URL = os.environ.get('REDIS_URL')
+
+    # Rate limiting
+    RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', 'true').lower() in ['true', 'on', '1']
+    RATELIMIT_STORAGE_URL = os.environ.get('RATELIMIT_STORAGE_URL') or REDIS_URL
+
+    # One-time passwords (kept out of the users table)
+    OTP_STORAGE_URL = os.environ.get('OTP_STORAGE_URL') or REDIS_URL
+    OTP_TTL = 10 * 60  # seconds
+    OTP_MAX_ATTEMPTS = 5
+
+    # Idempotency keys for order/payment POSTs
+    IDEMPOTENCY_STORAGE_URL = os.environ.get('IDEMPOTENCY_STORAGE_URL') or REDIS_URL
+    IDEMPOTENCY_TTL = 24 * 60 * 60
+
+    # Admission control (shed low-priority pages first under load)
+    ADMISSION_ENABLED = os.environ.get('ADMISSION_ENABLED', 'true').lower() in ['true', 'on', '1']
+    ADMISSION_MAX_IN_FLIGHT = int(os.environ.get('ADMISSION_MAX_IN_FLIGHT') or 64)
+    ADMISSION_DB_LATENCY_MS = int(os.environ.get('ADMISSION_DB_LATENCY_MS') or 250)
+    ADMISSION_STALE_TTL = 300  # seconds a cached low-priority page may be served
+    ADMISSION_TIERS = {}  # endpoint or 'blueprint.*' -> 'critical' / 'normal' / 'low'
+
+    # Refuse orders to pincodes no station serves (needs station coordinates and radii)
+    SERVICEABILITY_ENFORCED = os.environ.get('SERVICEABILITY_ENFORCED', 'false').lower() in ['true', 'on', '1']
+    SERVICEABILITY_REBUILD_INTERVAL = 5 * 60  # seconds; picks up other workers' station edits
+
+    # Order search: full rebuild interval; new orders are picked up on every search
+    SEARCH_REBUILD_INTERVAL = int(os.environ.get('SEARCH_REBUILD_INTERVAL') or 30 * 60)
+
+    # Order status notifications (stubs log instead of sending)
+    NOTIFICATIONS_ENABLED = os.environ.get('NOTIFICATIONS_ENABLED', 'true').lower() in ['true', 'on', '1']
+    NOTIFICATION_CHANNELS = os.environ.get('NOTIFICATION_CHANNELS') or 'email,sms,push'
+    NOTIFICATION_STUBS = os.environ.get('NOTIFICATION_STUBS', 'true').lower() in ['true', 'on', '1']
+    NOTIFICATION_COALESCE_WINDOW = 3.0  # seconds of quiet before an order's update is sent
+    NOTIFICATION_MAX_DELAY = 15.0  # ...but never hold one longer than this
+    NOTIFICATION_BATCH_SIZE = 500
+
+    # Order delta sync re-sends changes this recent in case a slow commit landed behind a cursor
+    SYNC_SAFETY_WINDOW = 30  # seconds
+
+    # Station stock shown on the order form may lag reservations by this much
+    INVENTORY_SNAPSHOT_TTL = 5  # seconds
+
+    # Demand forecasts on the owner dashboard
+    FORECAST_HISTORY_DAYS = 26 * 7
+    FORECAST_CACHE_TTL = 6 * 60 * 60  # seconds; rebuilt in the background when stale
+
+    # Delivery assignment: km of detour worth one fewer stop on a busy partner
+    ASSIGNMENT_LOAD_WEIGHT = 2.0
+
+    # Partner GPS pings: buffered (Redis if set), downsampled and persisted in bulk
+    TRACKING_STORAGE_URL = os.environ.get('TRACKING_STORAGE_URL') or REDIS_URL
+    TRACKING_TRAIL_SIZE = 256  # recent points kept per partner for live views
+    TRACKING_FLUSH_INTERVAL = 30.0  # seconds between bulk writes
+    TRACKING_SIMPLIFY_METERS = 15.0  # Douglas-Peucker tolerance
+    TRACKING_MAX_BATCH = 500  # pings per request
+    TRACKING_MAX_AGE = 86400.0  # seconds; older ping timestamps are rejected
+    TRACKING_MAX_CLOCK_SKEW = 300.0  # seconds a ping may be ahead of the server clock
+
+    # Delivery ETAs: straight-line km x road factor at a (per-hour) speed
+    ETA_SPEED_KMH = float(os.environ.get('ETA_SPEED_KMH') or 25)
+    ETA_HOURLY_SPEED_KMH = {9: 18.0, 10: 20.0, 18: 15.0, 19: 16.0}  # rush hours
+    ETA_ROAD_FACTOR = 1.3
+    ETA_STOP_MINUTES = 10.0  # time spent fuelling at each stop
+    ETA_GRID_DEGREES = 0.005  # ~500 m cells for the travel cache
+    ETA_CACHE_SIZE = 50000
+
+    # City-based sharding of orders, tracking and payments ("name=url,..." and
+    # "city or state=name,..."); unmapped cities stay on the primary database
+    SHARD_URLS = dict(item.split('=', 1) for item in (os.environ.get('SHARD_URLS') or '').split(',') if item)
+    SHARD_MAP = dict(item.split('=', 1) for item in (os.environ.get('SHARD_MAP') or '').split(',') if item)
+    SHARD_FANOUT_WORKERS = 8
+
+    # Long lists stream in keyset pages; HTML and JSON are gzipped when accepted
+    STREAM_PAGE_SIZE = 200  # rows per query
+    STREAM_BUFFER_BYTES = 8192  # rendered bytes per network write
+    COMPRESS_LEVEL = 6
+    COMPRESS_MIN_SIZE = 500  # bytes; smaller bodies go out as-is
+
+    # Invoices and monthly statements, cached on disk by a hash of their inputs
+    INVOICE_CACHE_DIR = os.environ.get('INVOICE_CACHE_DIR')  # default: <instance path>/invoices
+    INVOICE_SELLER_NAME = 'FuelExpress'
+    INVOICE_SELLER_GSTIN = os.environ.get('INVOICE_SELLER_GSTIN')
+    INVOICE_WORKERS = int(os.environ.get('INVOICE_WORKERS') or 0) or None  # None: one per CPU
+    INVOICE_BATCH_SIZE = 200  # statements per process-pool task
+
+    # Chunked online backfills (`flask backfill`, app.utils.backfill in revisions)
+    BACKFILL_BATCH_SIZE = int(os.environ.get('BACKFILL_BATCH_SIZE') or 1000)  # primary keys per transaction
+    BACKFILL_SLEEP = float(os.environ.get('BACKFILL_SLEEP') or 0.05)  # seconds between batches
+    BACKFILL_REPORT_SECONDS = 10.0  # how often progress is logged
+
+    # Dashboard widgets run concurrently on a bounded pool
+    DASHBOARD_WORKERS = int(os.environ.get('DASHBOARD_WORKERS') or 8)
+    DASHBOARD_WIDGET_TIMEOUT = 2.0  # seconds before a widget falls back
+
+    # Static assets (built with `flask build-assets`)
+    ASSETS_DIST_DIR = 'dist'
+    ASSETS_FINGERPRINT = True
+    ASSETS_MAX_AGE = 365 * 24 * 60 * 60  # 1 year, names change with content
 
 class DevelopmentConfig(Config):
     DEBUG = True
+    PAYMENT_WEBHOOK_SECRET = os.environ.get('PAYMENT_WEBHOOK_SECRET') or 'whsec_local'  # the local stub's
+    ASSETS_FINGERPRINT = False  # serve raw files so edits show up immediately
 
 class ProductionConfig(Config):
     DEBUG = False
@@ -0,0 +1,56 @@
+"""Add delivery partners and order assignment
+
+Revision ID: 0a6c3e8d5b21
+Revises: f2b7d4a9c1e6
+Create Date: 2026-10-19 14:48:21.550317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a6c3e8d5b21'
+down_revision = 'f2b7d4a9c1e6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('delivery_partners',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('station_id', sa.Integer(), nullable=False),
+    sa.Column('vehicle_capacity_liters', sa.Float(), nullable=False),
+    sa.Column('max_stops_per_slot', sa.Integer(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('latitude', sa.Float(), nullable=True),
+    sa.Column('longitude', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['station_id'], ['fuel_stations.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id')
+    )
+    with op.batch_alter_table('delivery_partners', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_delivery_partners_station_id'), ['station_id'], unique=False)
+
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('delivery_partner_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('assigned_at', sa.DateTime(), nullable=True))
+        batch_op.create_foreign_key('fk_orders_delivery_partner_id', 'users', ['delivery_partner_id'], ['id'])
+        batch_op.create_index(batch_op.f('ix_orders_delivery_partner_id'), ['delivery_partner_id'], unique=False)
+        batch_op.create_index('ix_orders_delivery_slot', ['delivery_date', 'delivery_time_slot'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_index('ix_orders_delivery_slot')
+        batch_op.drop_index(batch_op.f('ix_orders_delivery_partner_id'))
+        batch_op.drop_constraint('fk_orders_delivery_partner_id', type_='foreignkey')
+        batch_op.drop_column('assigned_at')
+        batch_op.drop_column('delivery_partner_id')
+
+    with op.batch_alter_table('delivery_partners', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_delivery_partners_station_id'))
+    op.drop_table('delivery_partners')
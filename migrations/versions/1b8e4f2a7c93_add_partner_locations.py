@@ -0,0 +1,36 @@
+"""Add partner location trail
+
+Revision ID: 1b8e4f2a7c93
+Revises: 0a6c3e8d5b21
+Create Date: 2026-10-19 15:22:48.106733
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1b8e4f2a7c93'
+down_revision = '0a6c3e8d5b21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('partner_locations',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+    sa.Column('partner_id', sa.Integer(), nullable=False),
+    sa.Column('recorded_at', sa.DateTime(), nullable=False),
+    sa.Column('latitude', sa.Float(), nullable=False),
+    sa.Column('longitude', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['partner_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('partner_locations', schema=None) as batch_op:
+        batch_op.create_index('ix_partner_locations_partner_recorded', ['partner_id', 'recorded_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('partner_locations', schema=None) as batch_op:
+        batch_op.drop_index('ix_partner_locations_partner_recorded')
+    op.drop_table('partner_locations')
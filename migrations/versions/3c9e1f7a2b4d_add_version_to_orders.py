@@ -0,0 +1,26 @@
+"""Add version column to orders for optimistic locking
+
+Revision ID: 3c9e1f7a2b4d
+Revises: e65a77753517
+Create Date: 2026-10-19 10:12:41.118203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c9e1f7a2b4d'
+down_revision = 'e65a77753517'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade():
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_column('version')
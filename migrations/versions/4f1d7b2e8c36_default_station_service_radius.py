@@ -0,0 +1,30 @@
+"""Default fuel stations' service radius
+
+Revision ID: 4f1d7b2e8c36
+Revises: b7c3e9d2f5a1
+Create Date: 2026-10-19 20:05:44.183620
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4f1d7b2e8c36'
+down_revision = 'b7c3e9d2f5a1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # d8e2b7f4c915 added the column without a default, leaving existing stations at NULL
+    stations = sa.table('fuel_stations', sa.column('service_radius_km'))
+    op.execute(stations.update().where(stations.c.service_radius_km.is_(None)).values(service_radius_km=15.0))
+
+    with op.batch_alter_table('fuel_stations', schema=None) as batch_op:
+        batch_op.alter_column('service_radius_km', existing_type=sa.Float(), server_default='15')
+
+
+def downgrade():
+    with op.batch_alter_table('fuel_stations', schema=None) as batch_op:
+        batch_op.alter_column('service_radius_km', existing_type=sa.Float(), server_default=None)
@@ -0,0 +1,26 @@
+"""Add home shard to users
+
+Revision ID: 5d2c8e1f0a47
+Revises: 1b8e4f2a7c93
+Create Date: 2026-10-19 16:05:12.447091
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2c8e1f0a47'
+down_revision = '1b8e4f2a7c93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('home_shard', sa.String(length=32), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('home_shard')
@@ -0,0 +1,52 @@
+"""Payment intent state machine: processing status, failure reason, version
+
+Revision ID: 7d2a5c8e9f10
+Revises: 3c9e1f7a2b4d
+Create Date: 2026-10-19 11:02:17.504311
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d2a5c8e9f10'
+down_revision = '3c9e1f7a2b4d'
+branch_labels = None
+depends_on = None
+
+OLD_STATUS = sa.Enum('PENDING', 'COMPLETED', 'FAILED', name='paymentstatus')
+NEW_STATUS = sa.Enum('PENDING', 'PROCESSING', 'COMPLETED', 'FAILED', name='paymentstatus')
+
+
+def upgrade():
+    # `payments` was only ever created by db.create_all(), so it may be missing
+    if not sa.inspect(op.get_bind()).has_table('payments'):
+        op.create_table('payments',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('order_id', sa.Integer(), nullable=False),
+        sa.Column('amount', sa.Float(), nullable=False),
+        sa.Column('payment_mode', sa.String(length=20), nullable=False),
+        sa.Column('status', NEW_STATUS, nullable=True),
+        sa.Column('transaction_id', sa.String(length=50), nullable=True),
+        sa.Column('failure_reason', sa.String(length=200), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('version', sa.Integer(), server_default='1', nullable=False),
+        sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('transaction_id')
+        )
+        return
+
+    with op.batch_alter_table('payments', schema=None) as batch_op:
+        batch_op.alter_column('status', existing_type=OLD_STATUS, type_=NEW_STATUS, existing_nullable=True)
+        batch_op.add_column(sa.Column('failure_reason', sa.String(length=200), nullable=True))
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('payments', schema=None) as batch_op:
+        batch_op.drop_column('version')
+        batch_op.drop_column('failure_reason')
+        batch_op.alter_column('status', existing_type=NEW_STATUS, type_=OLD_STATUS, existing_nullable=True)
@@ -0,0 +1,26 @@
+"""Add (user_id, id) index for streamed order history
+
+Revision ID: 8e4a1c6b3f90
+Revises: 5d2c8e1f0a47
+Create Date: 2026-10-19 16:41:37.902214
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e4a1c6b3f90'
+down_revision = '5d2c8e1f0a47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.create_index('ix_orders_user_id', ['user_id', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_index('ix_orders_user_id')
@@ -0,0 +1,29 @@
+"""Move OTP state out of users into the OTP store
+
+Revision ID: 9b4e6d1c3a27
+Revises: 7d2a5c8e9f10
+Create Date: 2026-10-19 11:48:03.270915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b4e6d1c3a27'
+down_revision = '7d2a5c8e9f10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Unverified users with a pending code can request a fresh one via refresh-otp
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('otp_expiry')
+        batch_op.drop_column('otp_code')
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('otp_code', sa.String(length=6), nullable=True))
+        batch_op.add_column(sa.Column('otp_expiry', sa.DateTime(), nullable=True))
@@ -0,0 +1,36 @@
+"""Add backfill checkpoints
+
+Revision ID: b7c3e9d2f5a1
+Revises: 8e4a1c6b3f90
+Create Date: 2026-10-19 18:12:05.417390
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7c3e9d2f5a1'
+down_revision = '8e4a1c6b3f90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Earlier revisions' backfills create it on first use
+    if sa.inspect(op.get_bind()).has_table('backfill_checkpoints'):
+        return
+    op.create_table('backfill_checkpoints',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('last_key', sa.BigInteger(), nullable=False),
+    sa.Column('end_key', sa.BigInteger(), nullable=False),
+    sa.Column('rows', sa.BigInteger(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('backfill_checkpoints')
@@ -0,0 +1,26 @@
+"""Add index on users.phone
+
+Revision ID: c41f8a2d6e53
+Revises: 9b4e6d1c3a27
+Create Date: 2026-10-19 12:20:44.816502
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41f8a2d6e53'
+down_revision = '9b4e6d1c3a27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_users_phone'), ['phone'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_phone'))
@@ -0,0 +1,30 @@
+"""Add delivery coverage (coordinates, radius) to fuel stations
+
+Revision ID: d8e2b7f4c915
+Revises: c41f8a2d6e53
+Create Date: 2026-10-19 12:51:09.402287
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8e2b7f4c915'
+down_revision = 'c41f8a2d6e53'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('fuel_stations', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('latitude', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('longitude', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('service_radius_km', sa.Float(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('fuel_stations', schema=None) as batch_op:
+        batch_op.drop_column('service_radius_km')
+        batch_op.drop_column('longitude')
+        batch_op.drop_column('latitude')
@@ -0,0 +1,52 @@
+"""Add keyset indexes for order delta sync
+
+Revision ID: e3a9c6f1b742
+Revises: d8e2b7f4c915
+Create Date: 2026-10-19 13:40:12.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.utils.backfill import Backfill, forget_in_migration, run_in_migration
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3a9c6f1b742'
+down_revision = 'd8e2b7f4c915'
+branch_labels = None
+depends_on = None
+
+FILL_STATUS_UPDATED_AT = 'e3a9c6f1b742-orders-status-updated-at'
+
+
+def _has_index(table, name):
+    # Work before a kill stays committed (see run_in_migration), so a re-run may find these
+    if op.get_context().as_sql:
+        return False
+    return name in {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade():
+    # Rows from before status_updated_at was always set would never sync
+    orders = sa.table('orders', sa.column('id'), sa.column('created_at'), sa.column('status_updated_at'))
+    run_in_migration(op, Backfill(FILL_STATUS_UPDATED_AT, orders,
+                                  values={'status_updated_at': orders.c.created_at},
+                                  where=orders.c.status_updated_at.is_(None)))
+
+    if not _has_index('orders', 'ix_orders_user_sync'):
+        with op.batch_alter_table('orders', schema=None) as batch_op:
+            batch_op.create_index('ix_orders_user_sync', ['user_id', 'status_updated_at', 'id'], unique=False)
+
+    if not _has_index('order_tracking', 'ix_order_tracking_order_created'):
+        with op.batch_alter_table('order_tracking', schema=None) as batch_op:
+            batch_op.create_index('ix_order_tracking_order_created', ['order_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    forget_in_migration(op, FILL_STATUS_UPDATED_AT)
+
+    with op.batch_alter_table('order_tracking', schema=None) as batch_op:
+        batch_op.drop_index('ix_order_tracking_order_created')
+
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_index('ix_orders_user_sync')
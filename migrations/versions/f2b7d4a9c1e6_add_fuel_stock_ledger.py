@@ -0,0 +1,57 @@
+"""Add fuel stock ledger
+
+Revision ID: f2b7d4a9c1e6
+Revises: e3a9c6f1b742
+Create Date: 2026-10-19 14:05:37.902114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b7d4a9c1e6'
+down_revision = 'e3a9c6f1b742'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('fuel_stock',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('fuel_type_id', sa.Integer(), nullable=False),
+    sa.Column('station_id', sa.Integer(), nullable=True),
+    sa.Column('available_liters', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['fuel_type_id'], ['fuel_types.id'], ),
+    sa.ForeignKeyConstraint(['station_id'], ['fuel_stations.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('fuel_type_id')
+    )
+    with op.batch_alter_table('fuel_stock', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_fuel_stock_station_id'), ['station_id'], unique=False)
+
+    op.create_table('stock_movements',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('fuel_type_id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=True),
+    sa.Column('change_liters', sa.Float(), nullable=False),
+    sa.Column('reason', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['fuel_type_id'], ['fuel_types.id'], ),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('order_id', 'reason', name='uq_stock_movements_order_reason')
+    )
+    with op.batch_alter_table('stock_movements', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_stock_movements_fuel_type_id'), ['fuel_type_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('stock_movements', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_stock_movements_fuel_type_id'))
+    op.drop_table('stock_movements')
+
+    with op.batch_alter_table('fuel_stock', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_fuel_stock_station_id'))
+    op.drop_table('fuel_stock')
@@ -8,6 +8,7 @@ Create Date: 2025-08-22 16:54:41.527948
 from alembic import op
 import sqlalchemy as sa
 from sqlalchemy.dialects import mysql
+from app.utils.backfill import Backfill, forget_in_migration, run_in_migration
 
 # revision identifiers, used by Alembic.
 revision = 'fbf97020fe54'
@@ -16,23 +17,50 @@ branch_labels = None
 depends_on = None
 
 
+orders = sa.table('orders', sa.column('id'), sa.column('customer_id'), sa.column('user_id'))
+
+COPY_USER_ID = 'fbf97020fe54-orders-user-id'
+COPY_CUSTOMER_ID = 'fbf97020fe54-orders-customer-id'
+
+
+def _has_column(name):
+    # The column is committed before the backfill runs, so a killed run
+    # leaves it behind without stamping the revision
+    if op.get_context().as_sql:
+        return False
+    return name in {column['name'] for column in sa.inspect(op.get_bind()).get_columns('orders')}
+
+
 def upgrade():
-    # ### commands auto generated by Alembic - please adjust! ###
+    # Add the column nullable, copy it over in key ranges, then tighten it:
+    # a NOT NULL column can't be added to a populated table, and one big
+    # UPDATE would lock every order while it runs
+    if not _has_column('user_id'):
+        with op.batch_alter_table('orders', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('user_id', sa.Integer(), nullable=True))
+
+    forget_in_migration(op, COPY_CUSTOMER_ID)
+    run_in_migration(op, Backfill(COPY_USER_ID, orders, values={'user_id': orders.c.customer_id},
+                                  where=orders.c.user_id.is_(None)))
+
     with op.batch_alter_table('orders', schema=None) as batch_op:
-        batch_op.add_column(sa.Column('user_id', sa.Integer(), nullable=False))
+        batch_op.alter_column('user_id', existing_type=sa.Integer(), nullable=False)
         batch_op.drop_constraint(batch_op.f('orders_ibfk_1'), type_='foreignkey')
         batch_op.create_foreign_key(None, 'users', ['user_id'], ['id'])
         batch_op.drop_column('customer_id')
 
-    # ### end Alembic commands ###
-
 
 def downgrade():
-    # ### commands auto generated by Alembic - please adjust! ###
+    if not _has_column('customer_id'):
+        with op.batch_alter_table('orders', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('customer_id', mysql.INTEGER(), autoincrement=False, nullable=True))
+
+    forget_in_migration(op, COPY_USER_ID)
+    run_in_migration(op, Backfill(COPY_CUSTOMER_ID, orders,
+                                  values={'customer_id': orders.c.user_id}, where=orders.c.customer_id.is_(None)))
+
     with op.batch_alter_table('orders', schema=None) as batch_op:
-        batch_op.add_column(sa.Column('customer_id', mysql.INTEGER(), autoincrement=False, nullable=False))
+        batch_op.alter_column('customer_id', existing_type=mysql.INTEGER(), nullable=False)
         batch_op.drop_constraint(None, type_='foreignkey')
         batch_op.create_foreign_key(batch_op.f('orders_ibfk_1'), 'users', ['customer_id'], ['id'])
         batch_op.drop_column('user_id')
-
-    # ### end Alembic commands ###
@@ -1,6 +1,7 @@
 import os
+import click
 from flask.cli import with_appcontext
-from app import create_app, db
+from app import create_app, db, shards
 
 # Set environment variables for Flask
 os.environ.setdefault('FLASK_APP', 'run.py')
@@ -18,7 +19,155 @@ def make_shell_context():
 def create_tables():
     """Create database tables."""
     db.create_all()
+    shards.create_all()
     print("Database tables created!")
 
+@app.cli.command('generate-data')
+@click.option('--users', default=100000, help='Customers to create.')
+@click.option('--orders', default=1000000, help='Orders to create across all customers.')
+@click.option('--stations', default=200, help='Stations (each with an owner, fuels and stock).')
+@click.option('--partners-per-station', default=3, help='Delivery partners per station.')
+@click.option('--addresses-per-user', default=1.3, help='Average addresses per customer (at least 1).')
+@click.option('--days', default=365, help='Spread order times over this many past days.')
+@click.option('--order-skew', default=1.0, help='Sigma of the lognormal orders-per-customer activity.')
+@click.option('--status-mix', help='Statuses of orders already due, e.g. delivered=0.92,cancelled=0.08.')
+@click.option('--payment-mix', help='Payment modes, e.g. cod=0.55,online=0.45.')
+@click.option('--city-weight', 'city_weights', multiple=True, help='CITY_OR_STATE=WEIGHT (repeatable), default 1 per pincode.')
+@click.option('--workers', type=int, help='Generator processes (default: one per CPU).')
+@click.option('--chunk-size', default=5000, help='Customers per worker transaction.')
+@click.option('--seed', default=1, help='Random seed.')
+@with_appcontext
+def generate_data(users, orders, stations, partners_per_station, addresses_per_user, days, order_skew,
+                  status_mix, payment_mix, city_weights, workers, chunk_size, seed):
+    """Fill the database with synthetic customers, stations and orders."""
+    from app.models import OrderStatus
+    from app.utils.datagen import generate, parse_mix
+
+    def progress(done, totals):
+        print(f"  {done:,}/{users:,} customers, {totals['orders']:,} orders", end='\r', flush=True)
+
+    try:
+        result = generate(
+            users=users, orders=orders, stations=stations, partners_per_station=partners_per_station,
+            addresses_per_user=addresses_per_user, days=days, order_skew=order_skew,
+            status_mix=parse_mix(status_mix, [s.value for s in OrderStatus]) if status_mix else None,
+            payment_mix=parse_mix(payment_mix, ['cod', 'online']) if payment_mix else None,
+            city_weights={key: float(value) for key, _, value in (w.partition('=') for w in city_weights)},
+            workers=workers, chunk_size=chunk_size, seed=seed, progress=progress,
+        )
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    print()
+    print(f"Created {result['users']:,} customers, {result['addresses']:,} addresses, {result['stations']:,} stations, "
+          f"{result['partners']:,} partners, {result['orders']:,} orders, {result['tracking']:,} tracking rows and "
+          f"{result['payments']:,} payments in {result['seconds']}s.")
+
+@app.cli.command('build-assets')
+def build_assets_command():
+    """Minify, fingerprint and gzip static CSS/JS."""
+    from app.utils.assets import build_assets
+    manifest = build_assets(app)
+    for logical, hashed in sorted(manifest.items()):
+        print(f"{logical} -> {hashed}")
+    print(f"Built {len(manifest)} assets.")
+
+@app.cli.command('reconcile-payments')
+@click.argument('settlement_file', type=click.Path(exists=True, dir_okay=False))
+@click.option('--report', default='reconciliation_report.csv', help='Where to write mismatches.')
+@click.option('--chunk-size', default=5000, help='Rows matched per database round trip.')
+@click.option('--since', type=click.DateTime(formats=['%Y-%m-%d']), help='Expect our online payments created from this day...')
+@click.option('--until', type=click.DateTime(formats=['%Y-%m-%d']), help='...up to (not including) this day.')
+@with_appcontext
+def reconcile_payments(settlement_file, report, chunk_size, since, until):
+    """Reconcile payments against a gateway settlement file."""
+    from app.utils.reconciliation import Reconciler
+    counts = Reconciler(chunk_size=chunk_size).run(settlement_file, report, since=since, until=until)
+    for key, value in counts.items():
+        print(f"{key}: {value}")
+    print(f"Report written to {report}")
+
+@app.cli.command('payment-gateway-stub')
+@click.option('--port', default=8765, help='Port for the stub gateway.')
+@click.option('--webhook-url', default='http://127.0.0.1:5000/payment/webhook', help='Where to deliver webhooks.')
+def payment_gateway_stub(port, webhook_url):
+    """Run the local stand-in payment gateway."""
+    from app.utils.gateway_stub import StubGateway
+    gateway = StubGateway(webhook_url, app.config['PAYMENT_WEBHOOK_SECRET'], port=port)
+    print(f"Stub gateway listening on {gateway.url}, webhooks -> {webhook_url}")
+    gateway.server.serve_forever()
+
+@app.cli.command('assign-deliveries')
+@click.option('--date', 'delivery_date', type=click.DateTime(formats=['%Y-%m-%d']), help='Delivery day (default: today).')
+@click.option('--station', 'station_ids', type=int, multiple=True, help='Only these stations (repeatable).')
+@with_appcontext
+def assign_deliveries(delivery_date, station_ids):
+    """Assign unassigned orders to delivery partners, per station and slot."""
+    from datetime import date
+    from app.utils.assignment import assign_date
+    day = delivery_date.date() if delivery_date else date.today()
+    results = assign_date(day, station_ids=list(station_ids) or None,
+                          load_weight=app.config['ASSIGNMENT_LOAD_WEIGHT'])
+    for (station_id, slot), written in sorted(results.items()):
+        print(f"station {station_id} {slot}: {written} assigned")
+    print(f"Assigned {sum(results.values())} orders for {day}.")
+
+@app.cli.command('monthly-statements')
+@click.option('--month', type=click.DateTime(formats=['%Y-%m']), help='Statement month (default: last month).')
+@click.option('--workers', type=int, help='Render processes (default: one per CPU).')
+@click.option('--format', 'formats', type=click.Choice(['html', 'pdf']), multiple=True, help='Formats (default: both).')
+@with_appcontext
+def monthly_statements(month, workers, formats):
+    """Render every customer's statement for a month into the invoice cache."""
+    from datetime import date, timedelta
+    from app import invoicer
+    if month is None:
+        month = date.today().replace(day=1) - timedelta(days=1)
+    result = invoicer.run_month(month.year, month.month, formats=formats or ('html', 'pdf'), workers=workers)
+    print(f"{month.year:04d}-{month.month:02d}: {result['customers']} customers, {result['rendered']} rendered, "
+          f"{result['cached']} already cached in {result['seconds']}s")
+
+@app.cli.command('backfill')
+@click.argument('table')
+@click.option('--set', 'assignments', multiple=True, required=True, help='COLUMN=SQL expression (repeatable).')
+@click.option('--where', help='Only rows matching this SQL condition (keep it false for rows already done).')
+@click.option('--name', help='Checkpoint name (default: derived from the table and assignments).')
+@click.option('--key', default='id', help='Integer primary key column to walk.')
+@click.option('--batch-size', type=int, help='Keys per transaction (default: BACKFILL_BATCH_SIZE).')
+@click.option('--sleep', type=float, help='Seconds between batches (default: BACKFILL_SLEEP).')
+@click.option('--shard', help='Run against this shard instead of the primary.')
+@click.option('--restart', is_flag=True, help='Ignore any checkpoint and start from the lowest key.')
+@with_appcontext
+def backfill(table, assignments, where, name, key, batch_size, sleep, shard, restart):
+    """Update a large table in checkpointed primary-key ranges."""
+    import hashlib
+    import sqlalchemy as sa
+    from app.utils.backfill import Backfill
+    from app.utils.sharding import bind_key
+    engine = db.engines[bind_key(shard)] if shard else db.engine
+    target = sa.Table(table, sa.MetaData(), autoload_with=engine)
+    values = {}
+    for assignment in assignments:
+        column, _, expression = assignment.partition('=')
+        if column.strip() not in target.c or not expression.strip():
+            raise click.UsageError(f"Expected COLUMN=EXPRESSION with a column of {table}, got '{assignment}'")
+        values[column.strip()] = sa.text(expression.strip())
+    if name is None:
+        spec = '|'.join([table, *assignments, where or ''])
+        name = f"{table}-{hashlib.sha1(spec.encode('utf-8')).hexdigest()[:12]}"
+    job = Backfill(name, target, values=values, where=sa.text(where) if where else None, key=key,
+                   batch_size=batch_size, sleep=sleep)
+
+    def progress(stats):
+        print(f"  {name}: {job.key.name} {stats['last_key']:,} of {stats['end_key']:,}, {stats['rows']:,} rows, "
+              f"{stats['rows_per_second']:,.0f} rows/s", end='\r', flush=True)
+
+    result = job.run(engine, restart=restart, progress=progress)
+    if not result['batches']:
+        print(f"{name}: nothing to do (finished before?); pass --restart to run it again.")
+        return
+    print()
+    print(f"{name}: {result['rows']:,} rows in {result['batches']:,} batches, {result['seconds']}s "
+          f"({result['rows_per_second']:,.0f} rows/s).")
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file